@@ -0,0 +1,119 @@
+"""
+Offline batch analysis, without the web server:
+
+    python -m app.cli analyze transactions.parquet --out results/
+    python -m app.cli analyze big.csv.zst --out results/ --shards 16 --shard-by account
+    python -m app.cli analyze year.parquet --out results/ --window-hours 168 --step-hours 24
+    python -m app.cli ingest history.parquet --store transactions.sqlite3
+
+Reads CSV (plain, gzip, zstd), Parquet or Arrow IPC from local disk and
+writes suspicious accounts, fraud rings and the summary as JSON and
+Parquet, or bulk-loads it into the SQLite transaction store that
+/store/analyze reads. Run from the backend/ directory.
+"""
+import argparse
+import sqlite3
+import sys
+
+from .config import BATCH_WORKERS, CSV_CHUNK_SIZE, TRANSACTION_STORE_PATH, ANALYSIS_WINDOW_STEP_HOURS
+from .services.batch_analysis import (
+    OUTPUT_FORMATS,
+    SHARD_MODES,
+    analyze_path,
+    write_results,
+)
+from .services.detector_registry import parse_detector_names, resolve_detectors
+from .services.transaction_store import TransactionStore
+
+
+def _formats(value):
+    formats = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"formats must be from: {', '.join(OUTPUT_FORMATS)}")
+    return formats
+
+
+def analyze_command(args):
+    detectors = [d.name for d in resolve_detectors(parse_detector_names(args.detectors))]
+
+    response = analyze_path(
+        args.input,
+        shards=args.shards,
+        shard_by=args.shard_by,
+        workers=args.workers,
+        chunked=args.chunked,
+        detectors=detectors,
+        budget=args.budget,
+        chunksize=args.chunksize,
+        work_dir=args.work_dir,
+        window_hours=args.window_hours,
+        step_hours=args.step_hours,
+        prune_hubs=args.prune_hubs or None,
+    )
+
+    for path in write_results(response, args.out, args.formats):
+        print(path)
+
+    summary = response["summary"]
+    print(
+        f"{summary['total_accounts_analyzed']} accounts, "
+        f"{summary['suspicious_accounts_flagged']} flagged, "
+        f"{summary['fraud_rings_detected']} rings in "
+        f"{summary['processing_time_seconds']}s",
+        file=sys.stderr,
+    )
+
+
+def ingest_command(args):
+    store = TransactionStore(args.store)
+    result = store.ingest(args.input, args.chunksize)
+    stats = store.stats()
+
+    print(
+        f"{result['inserted']} of {result['rows']} rows inserted "
+        f"({result['skipped']} already stored); store holds {stats['transactions']} "
+        f"transactions, {stats['first_timestamp']} .. {stats['last_timestamp']}",
+        file=sys.stderr,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    analyze = commands.add_parser("analyze", help="analyse a local transactions file")
+    analyze.add_argument("input", help="CSV (optionally gzip/zstd), Parquet or Arrow IPC file")
+    analyze.add_argument("--out", required=True, help="output directory")
+    analyze.add_argument("--formats", type=_formats, default=OUTPUT_FORMATS, help="json,parquet")
+    analyze.add_argument("--detectors", help="comma-separated registry names")
+    analyze.add_argument("--budget", type=float, help="detection time budget in seconds")
+    analyze.add_argument("--chunked", action="store_true", help="chunked ingestion (lower peak memory)")
+    analyze.add_argument("--shards", type=int, default=1, help="split the input into this many shards")
+    analyze.add_argument("--shard-by", choices=SHARD_MODES, default="account")
+    analyze.add_argument("--workers", type=int, default=BATCH_WORKERS, help="shards (or windows) analysed at once")
+    analyze.add_argument("--chunksize", type=int, default=CSV_CHUNK_SIZE, help="rows per read while sharding")
+    analyze.add_argument("--work-dir", help="where shard files are written (default: system temp)")
+    analyze.add_argument("--window-hours", type=float, help="analyse sliding time windows of this length")
+    analyze.add_argument("--step-hours", type=float, default=ANALYSIS_WINDOW_STEP_HOURS, help="hours between window starts")
+    analyze.add_argument("--prune-hubs", action="store_true", help="drop hub accounts' edges before cycle/shell search")
+    analyze.set_defaults(run=analyze_command)
+
+    ingest = commands.add_parser("ingest", help="bulk-load a file into the transaction store")
+    ingest.add_argument("input", help="CSV (optionally gzip/zstd), Parquet or Arrow IPC file")
+    ingest.add_argument("--store", default=TRANSACTION_STORE_PATH, required=TRANSACTION_STORE_PATH is None,
+                        help="SQLite file (default: TRANSACTION_STORE_PATH)")
+    ingest.add_argument("--chunksize", type=int, default=CSV_CHUNK_SIZE, help="rows per insert batch")
+    ingest.set_defaults(run=ingest_command)
+
+    args = parser.parse_args(argv)
+
+    try:
+        args.run(args)
+    except (ValueError, OSError, sqlite3.Error) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
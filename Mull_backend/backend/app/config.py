@@ -1,12 +1,125 @@
+import os
+
 # Detection thresholds
 CYCLE_MIN_LENGTH = 3
 CYCLE_MAX_LENGTH = 5
 SMURFING_THRESHOLD = 10
 SHELL_MAX_DEGREE = 3
 
+# Cycle detection: "static" ignores time; "temporal" only follows transfers
+# with non-decreasing timestamps spanning at most CYCLE_WINDOW_HOURS
+# (incremental sessions always use "static")
+CYCLE_DETECTOR = "static"
+CYCLE_WINDOW_HOURS = 72
+
+# Shell detection: "components" groups low-degree accounts ignoring
+# direction; "chains" finds directed source -> intermediaries -> sink paths
+# (incremental sessions always use "components")
+SHELL_DETECTOR = "components"
+SHELL_CHAIN_MAX_IN_DEGREE = 1
+SHELL_CHAIN_MAX_OUT_DEGREE = 1
+SHELL_CHAIN_MIN_INTERMEDIARIES = 2
+SHELL_CHAIN_MAX_INTERMEDIARIES = 10
+
+# Rapid pass-through: an account's next outgoing transfer forwards most of
+# what it just received (opt-in detector "pass_through")
+PASS_THROUGH_WINDOW_HOURS = 24
+PASS_THROUGH_MIN_RATIO = 0.9  # forwarded share of the incoming amount
+PASS_THROUGH_MIN_EVENTS = 3
+
+# Round-amount structuring (opt-in detector "round_amounts")
+ROUND_AMOUNT_UNIT = 1000
+ROUND_AMOUNT_MIN_TRANSFERS = 5
+ROUND_AMOUNT_MIN_SHARE = 0.8  # of the sender's transfers
+
+# Detector registry: detectors run when a request does not pick its own,
+# per-detector time limits and an overall detection budget (None = none)
+DEFAULT_DETECTORS = ["cycles", "smurfing", "shells"]
+DETECTOR_TIMEOUT_SECONDS = {}  # e.g. {"cycles": 30}
+DETECTION_BUDGET_SECONDS = None
+
+# Hub pruning: before cycle and shell search, drop the edges of accounts
+# in the top percentiles by counterparties or volume (payment processors,
+# payroll, exchanges) and of allowlisted accounts (one ID per line)
+PRUNE_HUBS = False
+HUB_DEGREE_PERCENTILE = 99.9
+HUB_VOLUME_PERCENTILE = 99.9
+HUB_MIN_DEGREE = 100  # fewer counterparties than this is never a hub
+HUB_ALLOWLIST_PATH = os.environ.get("HUB_ALLOWLIST_PATH")
+
 # Scoring weights
 WEIGHT_CYCLE = 40
 WEIGHT_SMURFING = 25
 WEIGHT_SHELL = 20
+WEIGHT_PASS_THROUGH = 20
+WEIGHT_ROUND_AMOUNT = 10
 
 MAX_SCORE = 100
+
+# Ring consolidation: merge rings that share members into one network
+# ring. A ring joins a network when it shares at least RING_MERGE_MIN_SHARED
+# accounts with it and at least RING_MERGE_MIN_OVERLAP of its own members.
+CONSOLIDATE_RINGS = False
+RING_MERGE_MIN_SHARED = 1
+RING_MERGE_MIN_OVERLAP = 0.0
+
+# CSV ingestion
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+CSV_CHUNK_SIZE = 250_000  # rows per chunk in chunked mode
+CSV_ENGINE = "c"  # "c" or "pyarrow" (requires pyarrow)
+
+# Background analysis jobs
+JOB_WORKERS = 2  # processes in the analysis pool
+JOB_QUEUE_DEPTH = 8  # queued + running jobs before /jobs answers 429
+JOB_RESULT_TTL_SECONDS = 3600  # finished jobs are forgotten after this
+
+# Parallel detection
+DETECTION_WORKERS = os.cpu_count() or 1  # detector processes (1 = serial)
+PARALLEL_DETECTION_MIN_EDGES = 200_000  # smaller graphs run serially
+
+# Batch CLI (python -m app.cli analyze): shard files analysed at once
+BATCH_WORKERS = os.cpu_count() or 1
+
+# Windowed analysis (?window_hours=...): overlapping time windows, each
+# analysed on its own graph by a pool of WINDOW_WORKERS processes
+ANALYSIS_WINDOW_HOURS = 7 * 24
+ANALYSIS_WINDOW_STEP_HOURS = 24
+WINDOW_WORKERS = os.cpu_count() or 1
+MAX_WINDOWS = 1000  # more windows than this is a 400
+
+# Incremental analysis sessions
+SESSION_MAX = 16  # open sessions before POST /sessions answers 429
+SESSION_IDLE_TTL_SECONDS = 6 * 3600  # idle sessions are dropped after this
+
+# Result cache (keyed by upload content + result-affecting settings)
+RESULT_CACHE_MAX_ENTRIES = 32
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # memory tier
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR")  # unset = no disk tier
+RESULT_CACHE_DISK_MAX_BYTES = 2 * 1024 ** 3
+
+# Embedded transaction store (SQLite file) for POST /store/transactions and
+# /store/analyze; unset = disabled
+TRANSACTION_STORE_PATH = os.environ.get("TRANSACTION_STORE_PATH")
+STORE_CACHE_MIB = 256  # SQLite page cache per connection
+
+# Stored analyses for paginated GET /analyses/{id}/transactions and the
+# account / neighbourhood lookups
+ANALYSIS_STORE_MAX_ENTRIES = 8
+ANALYSIS_STORE_TTL_SECONDS = 1800
+ANALYSIS_STORE_MAX_BYTES = 2 * 1024 ** 3  # graph arrays + kept transactions
+TRANSACTIONS_PAGE_SIZE = 10_000
+TRANSACTIONS_MAX_PAGE_SIZE = 100_000
+ACCOUNT_PAGE_SIZE = 1_000  # transactions / counterparties per account lookup
+NEIGHBORHOOD_HOPS = 1
+NEIGHBORHOOD_MAX_HOPS = 3
+NEIGHBORHOOD_MAX_NODES = 1_000
+
+# /visualize level of detail
+VIS_HOPS = 1  # neighbourhood drawn around fraud rings
+VIS_MAX_NODES = 2000
+
+# Instrumentation: per-stage timings/counts in every /upload summary (they
+# are always on /metrics), and the ?profile=1 sampling profiler
+METRICS_IN_SUMMARY = False
+PROFILE_INTERVAL_SECONDS = 0.005
+PROFILE_TOP = 25
@@ -13,8 +13,28 @@ if __package__ in (None, ""):
 
     sys.path.insert(0, backend_dir)
     from app.routes.upload import router as upload_router
+    from app.routes.jobs import router as jobs_router
+    from app.routes.sessions import router as sessions_router
+    from app.routes.cache import router as cache_router
+    from app.routes.analyses import router as analyses_router
+    from app.routes.detectors import router as detectors_router
+    from app.routes.metrics import router as metrics_router
+    from app.routes.store import router as store_router
+    from app.services.graph_visualizer import router as visualize_router
+    from app.services.job_manager import job_manager
+    from app.services import detection_orchestrator, window_analysis
 else:
     from .routes.upload import router as upload_router
+    from .routes.jobs import router as jobs_router
+    from .routes.sessions import router as sessions_router
+    from .routes.cache import router as cache_router
+    from .routes.analyses import router as analyses_router
+    from .routes.detectors import router as detectors_router
+    from .routes.metrics import router as metrics_router
+    from .routes.store import router as store_router
+    from .services.graph_visualizer import router as visualize_router
+    from .services.job_manager import job_manager
+    from .services import detection_orchestrator, window_analysis
 
 app = FastAPI(title="Money Muling Detection Engine")
 
@@ -29,6 +49,19 @@ app.add_middleware(
 
 # Include your upload route
 app.include_router(upload_router)
+app.include_router(jobs_router)
+app.include_router(sessions_router)
+app.include_router(cache_router)
+app.include_router(analyses_router)
+app.include_router(detectors_router)
+app.include_router(metrics_router)
+app.include_router(store_router)
+app.include_router(visualize_router)
+
+# Stop the analysis process pools with the server
+app.add_event_handler("shutdown", job_manager.shutdown)
+app.add_event_handler("shutdown", detection_orchestrator.shutdown)
+app.add_event_handler("shutdown", window_analysis.shutdown)
 
 # Root endpoint (so / does not show Not Found)
 @app.get("/")
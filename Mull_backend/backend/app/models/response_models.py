@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Any, Dict, List, Optional
 
 
 class SuspiciousAccount(BaseModel):
@@ -14,6 +14,12 @@ class FraudRing(BaseModel):
     member_accounts: List[str]
     pattern_type: str
     risk_score: float
+    amount_retained: Optional[float] = None
+    retention_ratio: Optional[float] = None
+    patterns: Optional[Dict[str, int]] = None
+    window_start: Optional[str] = None
+    window_end: Optional[str] = None
+    windows: Optional[int] = None
 
 
 class Summary(BaseModel):
@@ -21,6 +27,11 @@ class Summary(BaseModel):
     suspicious_accounts_flagged: int
     fraud_rings_detected: int
     processing_time_seconds: float
+    detector_timings: Optional[Dict[str, float]] = None
+    detectors_timed_out: Optional[List[str]] = None
+    stages: Optional[Dict[str, Dict[str, Optional[float]]]] = None
+    counts: Optional[Dict[str, Any]] = None
+    profile: Optional[Dict[str, Any]] = None
 
 
 class FinalResponse(BaseModel):
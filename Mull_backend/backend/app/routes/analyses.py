@@ -0,0 +1,126 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from ..config import (
+    TRANSACTIONS_PAGE_SIZE,
+    TRANSACTIONS_MAX_PAGE_SIZE,
+    ACCOUNT_PAGE_SIZE,
+    NEIGHBORHOOD_HOPS,
+    NEIGHBORHOOD_MAX_HOPS,
+    NEIGHBORHOOD_MAX_NODES,
+)
+from ..services.analysis_store import analysis_store
+from ..services.response_encoder import (
+    ARROW_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    wants_arrow,
+    encode_json,
+    encode_arrow,
+    flagged_mask,
+    transaction_records,
+)
+
+router = APIRouter()
+
+SUBSETS = ["all", "flagged", "unflagged"]
+
+
+def _analysis(analysis_id):
+    entry = analysis_store.get(analysis_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired")
+    return entry
+
+
+@router.get("/analyses/{analysis_id}/transactions")
+def get_transactions(
+    analysis_id: str,
+    request: Request,
+    offset: int = 0,
+    limit: int = TRANSACTIONS_PAGE_SIZE,
+    subset: str = "all",
+):
+
+    entry = _analysis(analysis_id)
+    if entry["transactions"] is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Transactions are only kept for uploads with transactions=flagged or none",
+        )
+
+    if subset not in SUBSETS:
+        raise HTTPException(
+            status_code=400, detail=f"subset must be one of: {', '.join(SUBSETS)}"
+        )
+    if offset < 0 or not 0 < limit <= TRANSACTIONS_MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"offset must be >= 0 and limit in 1..{TRANSACTIONS_MAX_PAGE_SIZE}",
+        )
+
+    df = entry["transactions"]
+    if subset != "all":
+        mask = flagged_mask(df, entry["flagged_accounts"])
+        df = df[mask if subset == "flagged" else ~mask]
+
+    page = df.iloc[offset:offset + limit]
+    next_offset = offset + len(page) if offset + len(page) < len(df) else None
+
+    meta = {
+        "analysis_id": analysis_id,
+        "subset": subset,
+        "offset": offset,
+        "limit": limit,
+        "total": len(df),
+        "next_offset": next_offset,
+    }
+
+    if wants_arrow(request.headers.get("accept")):
+        try:
+            content = encode_arrow(meta, page)
+        except RuntimeError as exc:
+            raise HTTPException(status_code=406, detail=str(exc)) from exc
+        return Response(content=content, media_type=ARROW_MEDIA_TYPE)
+
+    meta["transactions"] = transaction_records(page)
+    return Response(content=encode_json(meta), media_type=JSON_MEDIA_TYPE)
+
+
+@router.get("/analyses/{analysis_id}/accounts/{account_id}")
+def get_account(analysis_id: str, account_id: str, offset: int = 0, limit: int = ACCOUNT_PAGE_SIZE):
+
+    index = _analysis(analysis_id)["index"]
+
+    if offset < 0 or not 0 < limit <= TRANSACTIONS_MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"offset must be >= 0 and limit in 1..{TRANSACTIONS_MAX_PAGE_SIZE}",
+        )
+
+    account = index.account(account_id, offset, limit)
+    if account is None:
+        raise HTTPException(status_code=404, detail="Account not found in this analysis")
+
+    account["analysis_id"] = analysis_id
+    return Response(content=encode_json(account), media_type=JSON_MEDIA_TYPE)
+
+
+@router.get("/analyses/{analysis_id}/accounts/{account_id}/neighborhood")
+def get_neighborhood(
+    analysis_id: str,
+    account_id: str,
+    hops: int = NEIGHBORHOOD_HOPS,
+    max_nodes: int = NEIGHBORHOOD_MAX_NODES,
+):
+
+    index = _analysis(analysis_id)["index"]
+
+    if not 0 <= hops <= NEIGHBORHOOD_MAX_HOPS:
+        raise HTTPException(status_code=400, detail=f"hops must be in 0..{NEIGHBORHOOD_MAX_HOPS}")
+    if not 0 < max_nodes <= NEIGHBORHOOD_MAX_NODES:
+        raise HTTPException(status_code=400, detail=f"max_nodes must be in 1..{NEIGHBORHOOD_MAX_NODES}")
+
+    neighborhood = index.neighborhood(account_id, hops, max_nodes)
+    if neighborhood is None:
+        raise HTTPException(status_code=404, detail="Account not found in this analysis")
+
+    neighborhood["analysis_id"] = analysis_id
+    return Response(content=encode_json(neighborhood), media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Response
+from ..services.result_cache import result_cache
+
+router = APIRouter()
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    return result_cache.stats()
+
+
+@router.delete("/cache", status_code=204)
+def clear_cache():
+    result_cache.clear()
+    return Response(status_code=204)
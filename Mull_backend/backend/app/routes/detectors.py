@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from ..services.detector_registry import DETECTORS
+
+router = APIRouter()
+
+
+@router.get("/detectors")
+def list_detectors():
+    # Registered detectors; pick some per request with ?detectors=a,b
+    return [detector.info() for detector in DETECTORS.values()]
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+
+from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from ..services.job_manager import job_manager, QueueFullError
+from ..services.detector_registry import parse_detector_names, resolve_detectors
+
+router = APIRouter()
+
+
+def _spool_to_disk(file):
+    # The pool process reads the upload from disk instead of a pickled copy
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".upload") as tmp:
+        try:
+            shutil.copyfileobj(file.file, tmp)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+        return tmp.name
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(
+    file: UploadFile = File(...),
+    chunked: bool = False,
+    detectors: str = None,
+    budget: float = None,
+    consolidate: bool = None,
+    prune_hubs: bool = None,
+):
+
+    try:
+        names = [d.name for d in resolve_detectors(parse_detector_names(detectors))]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    if job_manager.is_saturated():
+        raise HTTPException(status_code=429, detail="Analysis queue is full, retry later")
+
+    path = await run_in_threadpool(_spool_to_disk, file)
+
+    # From here on the job manager removes the spool, accepted or not
+    try:
+        job_id = job_manager.submit(
+            path,
+            chunked=chunked,
+            detectors=names,
+            budget=budget,
+            consolidate=consolidate,
+            prune_hubs=prune_hubs,
+        )
+    except QueueFullError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+    except RuntimeError as exc:
+        # Pool shut down or broken (BrokenProcessPool is a RuntimeError)
+        raise HTTPException(status_code=503, detail=f"Analysis pool unavailable: {exc}") from exc
+
+    return job_manager.status(job_id)
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+
+    status = job_manager.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return status
+
+
+@router.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    future = job["future"]
+    if not future.done():
+        raise HTTPException(status_code=409, detail="Job has not finished yet")
+    if future.cancelled():
+        raise HTTPException(status_code=409, detail="Job was cancelled")
+
+    error = future.exception()
+    if isinstance(error, ValueError):
+        raise HTTPException(status_code=400, detail=str(error))
+    if error is not None:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {error}")
+
+    return job_manager.result(job_id)
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Response
+from ..services.metrics import metrics, resident_bytes
+from ..services.result_cache import result_cache
+from ..services.job_manager import job_manager
+from ..services.session_manager import session_manager
+from ..services.analysis_store import analysis_store
+
+router = APIRouter()
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _refresh_gauges():
+    # Cache, queue and store state is read at scrape time
+    stats = result_cache.stats()
+    for result in ("hits", "disk_hits", "misses"):
+        metrics.set("mull_cache_lookups_total", stats[result], result=result)
+    metrics.set("mull_cache_evictions_total", stats["evictions"])
+    metrics.set("mull_cache_entries", stats["entries"])
+    metrics.set("mull_cache_bytes", stats["bytes"])
+
+    metrics.set("mull_jobs_active", job_manager.active_count())
+    metrics.set("mull_jobs_queue_limit", job_manager.queue_depth)
+    metrics.set("mull_sessions_open", session_manager.count())
+    metrics.set("mull_analysis_store_entries", analysis_store.count())
+    metrics.set("mull_analysis_store_bytes", analysis_store.nbytes())
+
+    rss = resident_bytes()
+    if rss is not None:
+        metrics.set("mull_process_resident_bytes", rss)
+
+
+@router.get("/metrics")
+def prometheus_metrics():
+    _refresh_gauges()
+    return Response(content=metrics.render(), media_type=PROMETHEUS_MEDIA_TYPE)
@@ -0,0 +1,69 @@
+import time
+
+from fastapi import APIRouter, UploadFile, File, HTTPException, Response
+from ..services.input_reader import read_transactions
+from ..services.session_manager import session_manager, SessionLimitError
+
+router = APIRouter()
+
+
+def _get_session(session_id):
+    session = session_manager.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+
+@router.post("/sessions", status_code=201)
+def create_session():
+
+    try:
+        session = session_manager.create()
+    except SessionLimitError as exc:
+        raise HTTPException(status_code=429, detail=str(exc)) from exc
+
+    return session.info()
+
+
+@router.post("/sessions/{session_id}/transactions")
+def append_transactions(session_id: str, file: UploadFile = File(...)):
+
+    session = _get_session(session_id)
+    start_time = time.time()
+
+    try:
+        df = read_transactions(file)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    # Batches for one session are applied one at a time
+    with session.lock:
+        batch = session.add_transactions(df)
+        response = session.response(time.time() - start_time)
+
+    response["batch"] = batch
+    response["session"] = session.info()
+
+    return response
+
+
+@router.get("/sessions/{session_id}")
+def get_session(session_id: str):
+
+    session = _get_session(session_id)
+
+    with session.lock:
+        response = session.response()
+
+    response["session"] = session.info()
+
+    return response
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+def delete_session(session_id: str):
+
+    if not session_manager.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    return Response(status_code=204)
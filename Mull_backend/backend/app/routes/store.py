@@ -0,0 +1,125 @@
+import time
+import uuid
+
+from fastapi import APIRouter, UploadFile, File, HTTPException, Response
+from ..services.transaction_store import transaction_store, StoreNotConfiguredError
+from ..services.graph_builder import build_graph
+from ..services.pipeline import analyze
+from ..services.analysis_store import analysis_store
+from ..services.account_index import AccountIndex
+from ..services.detector_registry import parse_detector_names, resolve_detectors
+from ..services.metrics import StageRecorder, metrics
+from ..services.response_encoder import (
+    JSON_MEDIA_TYPE,
+    TRANSACTION_MODES,
+    encode_json,
+    validated_result,
+    select_transactions,
+    transaction_records,
+)
+
+router = APIRouter()
+
+
+def _store_call(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except StoreNotConfiguredError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/store")
+def store_stats():
+    return _store_call(transaction_store.stats)
+
+
+@router.post("/store/transactions")
+def ingest_transactions(file: UploadFile = File(...)):
+
+    start_time = time.time()
+    result = _store_call(transaction_store.ingest, file)
+
+    result["seconds"] = round(time.time() - start_time, 2)
+    result["store"] = transaction_store.stats()
+
+    return result
+
+
+@router.post("/store/analyze")
+def analyze_stored(
+    start: str = None,
+    end: str = None,
+    accounts: str = None,
+    transactions: str = "none",
+    detectors: str = None,
+    budget: float = None,
+    consolidate: bool = None,
+    prune_hubs: bool = None,
+):
+    # Stored transactions in [start, end) and/or those sent or received by
+    # `accounts` (comma-separated), analysed like an upload
+    start_time = time.time()
+
+    if transactions not in TRANSACTION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"transactions must be one of: {', '.join(TRANSACTION_MODES)}",
+        )
+
+    try:
+        names = [d.name for d in resolve_detectors(parse_detector_names(detectors))]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    selected_accounts = (
+        [acc.strip() for acc in accounts.split(",") if acc.strip()] if accounts else None
+    )
+
+    recorder = StageRecorder()
+    recorder.stage("query")
+    df = _store_call(transaction_store.transactions, start, end, selected_accounts)
+    if not len(df):
+        raise HTTPException(status_code=404, detail="No stored transactions match")
+
+    recorder.stage("build_graph")
+    G = build_graph(df, intern=True)
+
+    response = validated_result(
+        analyze(
+            df,
+            G,
+            start_time=start_time,
+            detectors=names,
+            budget=budget,
+            recorder=recorder,
+            consolidate=consolidate,
+            prune_hubs=prune_hubs,
+        )
+    )
+
+    analysis_id = f"store-{uuid.uuid4().hex}"
+    response["analysis_id"] = analysis_id
+    response["transactions_total"] = len(df)
+    response["summary"]["window"] = {
+        "start": start,
+        "end": end,
+        "accounts": len(selected_accounts) if selected_accounts is not None else None,
+    }
+
+    flagged = [acc["account_id"] for acc in response["suspicious_accounts"]]
+    analysis_store.put(
+        analysis_id,
+        AccountIndex(G, response),
+        df if transactions != "all" else None,
+        flagged,
+    )
+
+    recorder.stage("encode")
+    response["transactions"] = transaction_records(select_transactions(df, transactions, flagged))
+    content = encode_json(response)
+
+    metrics.record("store_analyze", recorder.finish())
+
+    return Response(content=content, media_type=JSON_MEDIA_TYPE)
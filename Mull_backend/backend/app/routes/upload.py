@@ -1,53 +1,203 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 import time
-import json
-from ..services.csv_parser import parse_csv
-from ..services.graph_builder import build_graph
-from ..services.cycle_detector import detect_cycles
-from ..services.smurfing_detector import detect_smurfing
-from ..services.shell_detector import detect_shells
-from ..services.scoring_engine import score_accounts
-from ..services.json_formatter import format_response
+from ..config import METRICS_IN_SUMMARY, CONSOLIDATE_RINGS, PRUNE_HUBS, ANALYSIS_WINDOW_STEP_HOURS
+from ..services.pipeline import load_transactions, analyze, stream_analysis
+from ..services.result_cache import result_cache, hash_upload, cache_key
+from ..services.analysis_store import analysis_store
+from ..services.account_index import AccountIndex
+from ..services.window_analysis import analyze_windows
+from ..services.detector_registry import parse_detector_names, resolve_detectors
+from ..services.metrics import StageRecorder, metrics
+from ..services.sampling_profiler import SamplingProfiler
+from ..services.response_encoder import (
+    JSON_MEDIA_TYPE,
+    ARROW_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    TRANSACTION_MODES,
+    wants_arrow,
+    encode_json,
+    encode_arrow,
+    encode_ndjson,
+    validated_result,
+    select_transactions,
+    transaction_records,
+)
 
 router = APIRouter()
 
+
+def _detector_names(detectors):
+    # ?detectors=cycles,pass_through -> registry names, 400 when unknown
+    try:
+        return [d.name for d in resolve_detectors(parse_detector_names(detectors))]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _recorded(events, recorder):
+    # Publish the stream's stage timings once the last event is sent
+    yield from events
+    metrics.record("upload_stream", recorder.finish())
+
+
 @router.post("/upload")
-async def upload_csv(file: UploadFile = File(...)):
+def upload_csv(
+    request: Request,
+    file: UploadFile = File(...),
+    chunked: bool = False,
+    transactions: str = "all",
+    detectors: str = None,
+    budget: float = None,
+    profile: bool = False,
+    consolidate: bool = None,
+    window_hours: float = None,
+    step_hours: float = ANALYSIS_WINDOW_STEP_HOURS,
+    prune_hubs: bool = None,
+):
 
     start_time = time.time()
 
+    if transactions not in TRANSACTION_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"transactions must be one of: {', '.join(TRANSACTION_MODES)}",
+        )
+    if window_hours is not None and (window_hours <= 0 or step_hours <= 0):
+        raise HTTPException(status_code=400, detail="window_hours and step_hours must be positive")
+
+    names = _detector_names(detectors)
+    if consolidate is None:
+        consolidate = CONSOLIDATE_RINGS
+    if prune_hubs is None:
+        prune_hubs = PRUNE_HUBS
+    # ?window_hours=168&step_hours=24 analyses sliding windows
+    windows = f"-windows{window_hours:g}h-step{step_hours:g}h" if window_hours is not None else ""
+
+    arrow = wants_arrow(request.headers.get("accept"))
+    media_type = ARROW_MEDIA_TYPE if arrow else JSON_MEDIA_TYPE
+
+    # Identical upload + settings -> serve the stored response. Its analysis
+    # may have left analysis_store since; /analyses/{id} then answers 404.
+    analysis_id = cache_key(
+        hash_upload(file),
+        f"{'chunked' if chunked else 'full'}-{'+'.join(names)}{'-networks' if consolidate else ''}{'-pruned' if prune_hubs else ''}{windows}",
+    )
+    key = f"{analysis_id}-{transactions}-{'arrow' if arrow else 'json'}"
+
+    # ?profile=1 always runs the analysis (and is never cached)
+    cached = None if profile else result_cache.get(key)
+    if cached is not None:
+        return Response(content=cached, media_type=media_type)
+
+    recorder = StageRecorder()
+    profiler = SamplingProfiler().start() if profile else None
+
     try:
-        df = parse_csv(file)
+        df, G = load_transactions(file, chunked=chunked, recorder=recorder)
+        # Too many windows for the file's time span is a 400 as well
+        if window_hours is not None:
+            response = analyze_windows(
+                df,
+                G,
+                window_hours,
+                step_hours,
+                start_time=start_time,
+                detectors=names,
+                budget=budget,
+                recorder=recorder,
+                consolidate=consolidate,
+                prune_hubs=prune_hubs,
+            )
     except ValueError as exc:
+        if profiler is not None:
+            profiler.stop()
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    # Build graph
-    G = build_graph(df)
+    if window_hours is None:
+        response = analyze(
+            df,
+            G,
+            start_time=start_time,
+            detectors=names,
+            budget=budget,
+            recorder=recorder,
+            consolidate=consolidate,
+            prune_hubs=prune_hubs,
+        )
 
-    # Detection modules
-    cycles = detect_cycles(G)
-    smurfing = detect_smurfing(df)
-    shells = detect_shells(G)
+    response = validated_result(response)
 
-    # Scoring
-    suspicious_data = score_accounts(G, cycles, smurfing, shells)
+    # The summary copy covers the pipeline; "encode" below only reaches /metrics
+    if profile or METRICS_IN_SUMMARY:
+        response["summary"].update(recorder.finish())
+    if profiler is not None:
+        response["summary"]["profile"] = profiler.stop()
 
-    # Format response
-    response = format_response(
-        suspicious_data,
-        G,
-        time.time() - start_time,
-        cycles=cycles,
-        smurfing=smurfing,
-        shells=shells,
+    response["analysis_id"] = analysis_id
+    response["transactions_total"] = len(df)
+
+    flagged = [acc["account_id"] for acc in response["suspicious_accounts"]]
+    selected = select_transactions(df, transactions, flagged)
+
+    analysis_store.put(
+        analysis_id,
+        AccountIndex(G, response),
+        df if transactions != "all" else None,
+        flagged,
     )
 
-    # 🔴 FIX TIMESTAMP ISSUE
-    df_copy = df.copy()
+    recorder.stage("encode")
+    if arrow:
+        try:
+            content = encode_arrow(response, selected)
+        except RuntimeError as exc:
+            raise HTTPException(status_code=406, detail=str(exc)) from exc
+    else:
+        response["transactions"] = transaction_records(selected)
+        content = encode_json(response)
+
+    metrics.record("upload", recorder.finish())
+
+    # A detector cut short by its time limit is not the complete answer
+    if not profile and not response["summary"].get("detectors_timed_out"):
+        result_cache.put(key, content)
 
-    if "timestamp" in df_copy.columns:
-        df_copy["timestamp"] = df_copy["timestamp"].astype(str)
+    return Response(content=content, media_type=media_type)
 
-    response["transactions"] = df_copy.to_dict(orient="records")
 
-    return response
\ No newline at end of file
+@router.post("/upload/stream")
+def upload_csv_stream(
+    file: UploadFile = File(...),
+    chunked: bool = False,
+    detectors: str = None,
+    budget: float = None,
+    consolidate: bool = None,
+    prune_hubs: bool = None,
+):
+
+    start_time = time.time()
+    names = _detector_names(detectors)
+    recorder = StageRecorder()
+
+    # Parse before streaming so a bad file still gets a plain 400
+    try:
+        df, G = load_transactions(file, chunked=chunked, recorder=recorder)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    events = stream_analysis(
+        df,
+        G,
+        start_time=start_time,
+        detectors=names,
+        budget=budget,
+        recorder=recorder,
+        consolidate=consolidate,
+        prune_hubs=prune_hubs,
+    )
+
+    return StreamingResponse(
+        encode_ndjson(_recorded(events, recorder)),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
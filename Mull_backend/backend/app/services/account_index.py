@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+
+from ..config import ACCOUNT_PAGE_SIZE, NEIGHBORHOOD_HOPS, NEIGHBORHOOD_MAX_NODES
+from .graph_builder import concat_ranges
+from .graph_layout import k_hop_layers
+from .response_encoder import transaction_records
+
+
+def _timestamp_strings(ns):
+    # int64 ns -> strings formatted like transaction_records
+    return pd.DatetimeIndex(ns.view("datetime64[ns]")).astype(str).tolist()
+
+
+def _graph_bytes(G):
+    arrays = [value for value in vars(G).values() if isinstance(value, np.ndarray)]
+    # Reverse adjacency, built by the first query: indices, edge ids, indptr
+    return sum(a.nbytes for a in arrays) + G.indices.nbytes * 3 + G.indptr.nbytes
+
+
+class AccountIndex:
+    """
+    Per-analysis account lookups over the analysed TransactionGraph: an
+    account's CSR rows in both directions (and through txn_indptr its
+    transactions), its rings and its entry in the response.
+
+    The ID -> position hash table and the reverse adjacency are built on
+    the first query; after that a lookup only touches the account's own
+    rows, so it stays fast on million-account graphs.
+    """
+
+    def __init__(self, G, response):
+        self.G = G
+
+        self.suspicious = {acc["account_id"]: acc for acc in response["suspicious_accounts"]}
+        self.rings = {}
+        self.ring_ids = {}
+        for ring in response["fraud_rings"]:
+            self.rings[ring["ring_id"]] = {
+                "ring_id": ring["ring_id"],
+                "pattern_type": ring["pattern_type"],
+                "risk_score": ring["risk_score"],
+                "member_count": len(ring["member_accounts"]),
+            }
+            for acc in ring["member_accounts"]:
+                self.ring_ids.setdefault(acc, []).append(ring["ring_id"])
+
+        self._positions = None
+        self.nbytes = _graph_bytes(G)
+
+    def position(self, account_id):
+        # Index of `account_id` in G.accounts, or None
+        if self._positions is None:
+            self._positions = pd.Index(self.G.accounts)
+        try:
+            return int(self._positions.get_loc(account_id))
+        except KeyError:
+            return None
+
+    def _edges(self, i):
+        # Edge ids touching account i with their counterparties and
+        # direction (True = sent); a self-loop is listed once, as sent
+        G = self.G
+        rev_indptr, rev_indices, rev_edge = G.reverse()
+
+        out_edges = np.arange(G.indptr[i], G.indptr[i + 1])
+        in_slice = slice(rev_indptr[i], rev_indptr[i + 1])
+        in_peers = rev_indices[in_slice]
+        in_edges = rev_edge[in_slice][in_peers != i]
+
+        edges = np.concatenate((out_edges, in_edges))
+        peers = np.concatenate((G.indices[out_edges], in_peers[in_peers != i]))
+        sent = np.repeat([True, False], [len(out_edges), len(in_edges)])
+
+        return edges, peers.astype(np.int64), sent
+
+    def account(self, account_id, offset=0, limit=ACCOUNT_PAGE_SIZE):
+        """
+        Everything known about one account: score and patterns, rings,
+        totals, counterparties (one per edge, largest amount first) and its
+        transactions in time order, both paged by `offset` / `limit`.
+        Returns None for an unknown account.
+        """
+
+        i = self.position(account_id)
+        if i is None:
+            return None
+
+        G = self.G
+        edges, peers, sent = self._edges(i)
+        accounts = G.accounts
+
+        counts = G.edge_count[edges]
+        amounts = G.edge_amount[edges]
+
+        by_amount = np.argsort(-amounts, kind="stable")[offset:offset + limit]
+        counterparties = [
+            {
+                "account_id": peer,
+                "direction": "sent" if out else "received",
+                "transactions": count,
+                "amount": round(amount, 2),
+                "first_timestamp": first,
+                "last_timestamp": last,
+            }
+            for peer, out, count, amount, first, last in zip(
+                accounts[peers[by_amount]].tolist(),
+                sent[by_amount].tolist(),
+                counts[by_amount].tolist(),
+                amounts[by_amount].tolist(),
+                _timestamp_strings(G.edge_first_ts[edges[by_amount]]),
+                _timestamp_strings(G.edge_last_ts[edges[by_amount]]),
+            )
+        ]
+
+        # Transactions of every edge, in time order
+        rows = concat_ranges(G.txn_indptr[edges], G.txn_indptr[edges + 1])
+        row_edge = np.repeat(np.arange(len(edges)), counts)
+        order = np.argsort(G.txn_timestamps[rows], kind="stable")[offset:offset + limit]
+        rows, row_edge = rows[order], row_edge[order]
+
+        own = np.full(len(rows), i, dtype=np.int64)
+        other = peers[row_edge]
+        outgoing = sent[row_edge]
+
+        page = pd.DataFrame(
+            {
+                "transaction_id": G.txn_ids[rows],
+                "sender_id": accounts[np.where(outgoing, own, other)],
+                "receiver_id": accounts[np.where(outgoing, other, own)],
+                "amount": G.txn_amounts[rows],
+                "timestamp": G.txn_timestamps[rows].view("datetime64[ns]"),
+            }
+        )
+
+        entry = self.suspicious.get(account_id)
+
+        return {
+            "account_id": account_id,
+            "suspicious": entry is not None,
+            "suspicion_score": entry["suspicion_score"] if entry else 0.0,
+            "detected_patterns": entry["detected_patterns"] if entry else [],
+            "rings": [self.rings[ring_id] for ring_id in self.ring_ids.get(account_id, [])],
+            "sent": {
+                "counterparties": int(sent.sum()),
+                "transactions": int(counts[sent].sum()),
+                "amount": round(float(amounts[sent].sum()), 2),
+            },
+            "received": {
+                "counterparties": int((~sent).sum()),
+                "transactions": int(counts[~sent].sum()),
+                "amount": round(float(amounts[~sent].sum()), 2),
+            },
+            "offset": offset,
+            "limit": limit,
+            "counterparties_total": len(edges),
+            "counterparties": counterparties,
+            "transactions_total": int(counts.sum()),
+            "transactions": transaction_records(page),
+        }
+
+    def neighborhood(self, account_id, hops=NEIGHBORHOOD_HOPS, max_nodes=NEIGHBORHOOD_MAX_NODES):
+        """
+        Accounts within `hops` undirected steps of `account_id`, nearest
+        first (at most `max_nodes`), and the edges among them. Returns None
+        for an unknown account.
+        """
+
+        i = self.position(account_id)
+        if i is None:
+            return None
+
+        G = self.G
+        layers = k_hop_layers(G, [i], hops, max_nodes)
+        nodes = np.concatenate(layers)
+        hop = np.repeat(np.arange(len(layers)), [len(layer) for layer in layers])
+        truncated = len(nodes) > max_nodes
+        nodes, hop = nodes[:max_nodes], hop[:max_nodes]
+
+        kept = np.zeros(G.number_of_nodes(), dtype=bool)
+        kept[nodes] = True
+
+        # Out-edges of the kept nodes whose target was kept too
+        edges = concat_ranges(G.indptr[nodes], G.indptr[nodes + 1])
+        sources = np.repeat(nodes, G.indptr[nodes + 1] - G.indptr[nodes])
+        keep = kept[G.indices[edges]]
+        edges, sources = edges[keep], sources[keep]
+
+        accounts = G.accounts
+
+        return {
+            "account_id": account_id,
+            "hops": hops,
+            "truncated": bool(truncated),
+            "nodes": [
+                {
+                    "account_id": acc,
+                    "hop": h,
+                    "suspicion_score": self.suspicious[acc]["suspicion_score"] if acc in self.suspicious else 0.0,
+                    "ring_ids": self.ring_ids.get(acc, []),
+                }
+                for acc, h in zip(accounts[nodes].tolist(), hop.tolist())
+            ],
+            "edges": [
+                {"source": u, "target": v, "transactions": count, "amount": round(amount, 2)}
+                for u, v, count, amount in zip(
+                    accounts[sources].tolist(),
+                    accounts[G.indices[edges]].tolist(),
+                    G.edge_count[edges].tolist(),
+                    G.edge_amount[edges].tolist(),
+                )
+            ],
+        }
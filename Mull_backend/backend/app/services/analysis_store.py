@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+
+from ..config import (
+    ANALYSIS_STORE_MAX_ENTRIES,
+    ANALYSIS_STORE_TTL_SECONDS,
+    ANALYSIS_STORE_MAX_BYTES,
+)
+
+
+class AnalysisStore:
+    """
+    Keeps recent analyses so clients can page through their transactions
+    after an /upload that returned only part (or none) of them, and look
+    up accounts and neighbourhoods through their AccountIndex.
+
+    Holds at most `max_entries` analyses and about `max_bytes` of graph
+    arrays and kept transactions (oldest dropped first; the newest is
+    always kept), each for `ttl` seconds after it was last stored.
+    """
+
+    def __init__(
+        self,
+        max_entries=ANALYSIS_STORE_MAX_ENTRIES,
+        ttl=ANALYSIS_STORE_TTL_SECONDS,
+        max_bytes=ANALYSIS_STORE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def _drop(self, analysis_id):
+        self._bytes -= self._entries.pop(analysis_id)["bytes"]
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            analysis_id
+            for analysis_id, entry in self._entries.items()
+            if now - entry["stored_at"] > self.ttl
+        ]
+        for analysis_id in expired:
+            self._drop(analysis_id)
+
+    def put(self, analysis_id, index, transactions=None, flagged_accounts=()):
+        # `transactions` (the frame to page through) is only kept when the
+        # upload did not return all of them; storing the same analysis
+        # again without a frame keeps the earlier one
+        with self._lock:
+            previous = self._entries.get(analysis_id)
+            if previous is not None:
+                if transactions is None:
+                    transactions = previous["transactions"]
+                    flagged_accounts = previous["flagged_accounts"]
+                self._drop(analysis_id)
+
+            size = index.nbytes
+            if transactions is not None:
+                size += int(transactions.memory_usage(index=False).sum())
+
+            self._entries[analysis_id] = {
+                "index": index,
+                "transactions": transactions,
+                "flagged_accounts": set(flagged_accounts),
+                "stored_at": time.time(),
+                "bytes": size,
+            }
+            self._bytes += size
+
+            self._purge_expired()
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def get(self, analysis_id):
+        with self._lock:
+            self._purge_expired()
+            return self._entries.get(analysis_id)
+
+    def count(self):
+        with self._lock:
+            self._purge_expired()
+            return len(self._entries)
+
+    def nbytes(self):
+        with self._lock:
+            self._purge_expired()
+            return self._bytes
+
+
+analysis_store = AnalysisStore()
@@ -1,4 +1,5 @@
 import pandas as pd
+from ..config import TIMESTAMP_FORMAT, CSV_CHUNK_SIZE, CSV_ENGINE
 
 REQUIRED_COLUMNS = [
     "transaction_id",
@@ -8,18 +9,157 @@ REQUIRED_COLUMNS = [
     "timestamp"
 ]
 
-def parse_csv(file):
-    try:
-        df = pd.read_csv(file.file)
-    except (pd.errors.EmptyDataError, pd.errors.ParserError) as exc:
-        raise ValueError("Invalid or empty CSV file") from exc
+CSV_DTYPES = {
+    "transaction_id": str,
+    "sender_id": str,
+    "receiver_id": str,
+    "amount": "float64",
+    "timestamp": str,
+}
+
+# Chunked mode keeps only what the graph builder needs, as compactly as
+# possible. IDs stay plain strings here: the C parser infers categoricals
+# slowly and the graph builder encodes them per chunk anyway (the pyarrow
+# engine dictionary-encodes them natively).
+CHUNK_DTYPES = {
+    **CSV_DTYPES,
+    "amount": "float32",
+}
+
+# pyarrow reads by byte blocks rather than rows; rough size of one CSV row
+ARROW_BYTES_PER_ROW = 64
+
 
+def _stream(file):
+    return getattr(file, "file", file)
+
+
+def _validate_columns(columns):
     for col in REQUIRED_COLUMNS:
-        if col not in df.columns:
+        if col not in columns:
             raise ValueError(f"Missing column: {col}")
 
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-    if df["timestamp"].isna().any():
+
+def _validate_accounts(df):
+    if df["sender_id"].isna().any() or df["receiver_id"].isna().any():
+        raise ValueError("Missing account IDs in CSV")
+
+
+def _parse_timestamps(values):
+    # Fixed format first (fast path); rows in any other format fall back to
+    # per-value inference so older exports keep working.
+    timestamps = pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors="coerce")
+
+    unparsed = timestamps.isna()
+    if unparsed.any():
+        timestamps[unparsed] = pd.to_datetime(
+            values[unparsed], format="mixed", errors="coerce"
+        )
+
+    if timestamps.isna().any():
         raise ValueError("Invalid timestamp values in CSV")
 
+    return timestamps
+
+
+def parse_csv(file, engine=None):
+    try:
+        df = pd.read_csv(_stream(file), dtype=CSV_DTYPES, engine=engine or CSV_ENGINE)
+    except (pd.errors.EmptyDataError, pd.errors.ParserError) as exc:
+        raise ValueError("Invalid or empty CSV file") from exc
+
+    _validate_columns(df.columns)
+    _validate_accounts(df)
+
+    df["timestamp"] = _parse_timestamps(df["timestamp"])
+
     return df
+
+
+def _iter_c_chunks(stream, chunksize, exact_amounts=False):
+    try:
+        reader = pd.read_csv(
+            stream,
+            chunksize=chunksize,
+            dtype=CSV_DTYPES if exact_amounts else CHUNK_DTYPES,
+            usecols=lambda col: col in REQUIRED_COLUMNS,
+        )
+
+        for chunk in reader:
+            yield chunk
+
+    except (pd.errors.EmptyDataError, pd.errors.ParserError) as exc:
+        raise ValueError("Invalid or empty CSV file") from exc
+
+
+def _iter_arrow_chunks(stream, chunksize, exact_amounts=False):
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError as exc:
+        raise RuntimeError("CSV engine 'pyarrow' requires the pyarrow package") from exc
+
+    column_types = {
+        "transaction_id": pa.string(),
+        "sender_id": pa.string(),
+        "receiver_id": pa.string(),
+        "amount": pa.float64() if exact_amounts else pa.float32(),
+        "timestamp": pa.timestamp("ns"),
+    }
+
+    try:
+        reader = pa_csv.open_csv(
+            stream,
+            read_options=pa_csv.ReadOptions(block_size=chunksize * ARROW_BYTES_PER_ROW),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=column_types,
+                timestamp_parsers=[TIMESTAMP_FORMAT, pa_csv.ISO8601],
+            ),
+        )
+
+        _validate_columns(reader.schema.names)
+
+        for batch in reader:
+            columns = {col: batch.column(col) for col in REQUIRED_COLUMNS}
+            columns["sender_id"] = columns["sender_id"].dictionary_encode()
+            columns["receiver_id"] = columns["receiver_id"].dictionary_encode()
+            yield pa.RecordBatch.from_pydict(columns).to_pandas()
+
+    except pa.ArrowInvalid as exc:
+        raise ValueError(f"Invalid or empty CSV file: {exc}") from exc
+
+
+def iter_csv_chunks(file, chunksize=None, engine=None, exact_amounts=False):
+    """
+    Read an upload in fixed-size chunks with explicit dtypes.
+
+    REQUIRED_COLUMNS are validated on the first chunk, before anything else
+    is parsed. Each yielded chunk has only the required columns and parsed
+    timestamps, so peak memory follows the chunk size, not the file size.
+    Amounts are float32 unless `exact_amounts` is set.
+    """
+
+    chunksize = chunksize or CSV_CHUNK_SIZE
+    engine = engine or CSV_ENGINE
+    stream = _stream(file)
+
+    if engine == "pyarrow":
+        chunks = _iter_arrow_chunks(stream, chunksize, exact_amounts)
+    else:
+        chunks = _iter_c_chunks(stream, chunksize, exact_amounts)
+
+    validated = False
+
+    for chunk in chunks:
+        if not validated:
+            _validate_columns(chunk.columns)
+            validated = True
+
+        _validate_accounts(chunk)
+
+        if not pd.api.types.is_datetime64_any_dtype(chunk["timestamp"]):
+            chunk["timestamp"] = _parse_timestamps(chunk["timestamp"])
+        elif chunk["timestamp"].isna().any():
+            raise ValueError("Invalid timestamp values in CSV")
+
+        yield chunk
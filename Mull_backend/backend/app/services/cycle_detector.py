@@ -1,13 +1,501 @@
-import networkx as nx
-from ..config import CYCLE_MIN_LENGTH, CYCLE_MAX_LENGTH
+from bisect import bisect_left
+from collections import deque
 
-def detect_cycles(G):
-    cycles = []
+import numpy as np
+from ..config import CYCLE_MIN_LENGTH, CYCLE_MAX_LENGTH, CYCLE_DETECTOR, CYCLE_WINDOW_HOURS
 
-    simple_cycles = list(nx.simple_cycles(G))
 
-    for cycle in simple_cycles:
-        if CYCLE_MIN_LENGTH <= len(cycle) <= CYCLE_MAX_LENGTH:
-            cycles.append(cycle)
+def strongly_connected_components(indptr, indices):
+    """
+    Iterative Tarjan over CSR adjacency.
 
-    return cycles
+    Returns an int array labelling every node with its component id.
+    """
+
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    n = len(indptr) - 1
+
+    labels = [-1] * n
+    low = [0] * n
+    order = [-1] * n
+    on_stack = [False] * n
+    stack = []
+    counter = 0
+    num_components = 0
+
+    for root in range(n):
+        if order[root] != -1:
+            continue
+
+        work = [(root, indptr[root])]
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        while work:
+            node, pos = work[-1]
+            end = indptr[node + 1]
+
+            if pos < end:
+                work[-1] = (node, pos + 1)
+                nxt = indices[pos]
+
+                if order[nxt] == -1:
+                    order[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack[nxt] = True
+                    work.append((nxt, indptr[nxt]))
+                elif on_stack[nxt] and order[nxt] < low[node]:
+                    low[node] = order[nxt]
+                continue
+
+            work.pop()
+
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+
+            if low[node] == order[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    labels[member] = num_components
+                    if member == node:
+                        break
+                num_components += 1
+
+    return np.asarray(labels, dtype=np.int64)
+
+
+def component_adjacency(indptr, indices, members, labels):
+    # Local adjacency lists restricted to one component, keyed by node index
+    members = members.tolist()
+    label = labels[members[0]]
+    succ = {}
+    pred = {m: [] for m in members}
+
+    for m in members:
+        targets = indices[indptr[m]:indptr[m + 1]]
+        targets = targets[labels[targets] == label].tolist()
+        succ[m] = targets
+        for t in targets:
+            pred[t].append(m)
+
+    return succ, pred
+
+
+def _distances_to_start(pred, start, max_hops):
+    # Backward BFS: how many hops each node needs to get back to `start`
+    # without passing through nodes numbered below it.
+    dist = {start: 0}
+    queue = deque([start])
+
+    while queue:
+        node = queue.popleft()
+        hops = dist[node] + 1
+
+        if hops > max_hops:
+            continue
+
+        for prev in pred[node]:
+            if prev not in dist and prev > start:
+                dist[prev] = hops
+                queue.append(prev)
+
+    return dist
+
+
+def _bounded_cycles_from(succ, pred, start, min_length, max_length):
+
+    dist = _distances_to_start(pred, start, max_length - 1)
+
+    path = [start]
+    on_path = {start}
+    stack = [iter(succ[start])]
+
+    while stack:
+        nxt = next(stack[-1], None)
+
+        if nxt is None:
+            stack.pop()
+            on_path.discard(path.pop())
+            continue
+
+        if nxt == start:
+            if len(path) >= min_length:
+                yield list(path)
+            continue
+
+        # Prune: already used, numbered below the start (the cycle would be
+        # emitted from a different rotation), or too far to close in time.
+        if nxt in on_path or nxt < start:
+            continue
+
+        if nxt not in dist or len(path) + dist[nxt] > max_length:
+            continue
+
+        path.append(nxt)
+        on_path.add(nxt)
+        stack.append(iter(succ[nxt]))
+
+
+def candidate_components(labels, min_length=CYCLE_MIN_LENGTH):
+    """
+    Group node indices by SCC label, keeping only components large enough
+    to hold a cycle of min_length. Returned in label order.
+    """
+
+    sizes = np.bincount(labels) if len(labels) else np.zeros(0, dtype=np.int64)
+
+    candidates = np.flatnonzero(sizes[labels] >= min_length)
+    candidates = candidates[np.argsort(labels[candidates], kind="stable")]
+    bounds = np.flatnonzero(np.diff(labels[candidates])) + 1
+
+    return [members for members in np.split(candidates, bounds) if len(members)]
+
+
+def cycles_in_components(
+    indptr,
+    indices,
+    labels,
+    components,
+    min_length=CYCLE_MIN_LENGTH,
+    max_length=CYCLE_MAX_LENGTH,
+):
+    # Bounded search restricted to the given SCC member arrays
+    for members in components:
+        succ, pred = component_adjacency(indptr, indices, members, labels)
+        yield from cycles_from_starts(succ, pred, members.tolist(), min_length, max_length)
+
+
+def cycles_from_starts(
+    succ,
+    pred,
+    starts,
+    min_length=CYCLE_MIN_LENGTH,
+    max_length=CYCLE_MAX_LENGTH,
+):
+    # Cycles whose lowest-numbered member is one of `starts`. Different
+    # start sets never overlap, so they can be searched independently.
+    for start in starts:
+        yield from _bounded_cycles_from(succ, pred, start, min_length, max_length)
+
+
+# -------------------------
+# Temporal cycles
+# -------------------------
+def component_timelines(indptr, txn_indptr, txn_receivers, txn_timestamps, txn_amounts, labels, members):
+    """
+    Per-sender transfer lists inside one SCC, sorted by time:
+    {node: (timestamps, receivers, amounts)}.
+    """
+
+    members = np.sort(members)
+    lo = txn_indptr[indptr[members]]
+    counts = txn_indptr[indptr[members + 1]] - lo
+
+    rows = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    senders = np.repeat(members, counts)
+    receivers = txn_receivers[rows]
+
+    keep = labels[receivers] == labels[senders]
+    rows, senders, receivers = rows[keep], senders[keep], receivers[keep]
+
+    order = np.lexsort((txn_timestamps[rows], senders))
+    rows, senders, receivers = rows[order], senders[order], receivers[order]
+
+    bounds = np.searchsorted(senders, np.append(members, members[-1] + 1)).tolist()
+    timestamps = txn_timestamps[rows].tolist()
+    amounts = txn_amounts[rows].tolist()
+    receivers = receivers.tolist()
+
+    return {
+        m: (
+            timestamps[bounds[k]:bounds[k + 1]],
+            receivers[bounds[k]:bounds[k + 1]],
+            amounts[bounds[k]:bounds[k + 1]],
+        )
+        for k, m in enumerate(members.tolist())
+    }
+
+
+def _next_hops(timeline, time, deadline):
+    # Earliest transfer to each receiver within [time, deadline]: the
+    # earliest hop leaves every later hop possible, so it is the only one
+    # worth following
+    timestamps, receivers, amounts = timeline
+    seen = set()
+
+    for i in range(bisect_left(timestamps, time), len(timestamps)):
+        if timestamps[i] > deadline:
+            break
+        if receivers[i] not in seen:
+            seen.add(receivers[i])
+            yield receivers[i], timestamps[i], amounts[i]
+
+
+def temporal_cycles_from_starts(
+    timelines,
+    starts,
+    window_ns,
+    min_length=CYCLE_MIN_LENGTH,
+    max_length=CYCLE_MAX_LENGTH,
+):
+    """
+    Cycles whose transfers have non-decreasing timestamps spanning at most
+    window_ns, beginning at one of `starts`. The window prunes the search
+    (only transfers inside it are followed), so every rotation can be tried
+    without the lowest-start rule of the static search.
+
+    Returns {canonical rotation: (first timestamp, path, hop amounts)},
+    keeping the earliest occurrence of each cycle. Results for disjoint
+    start sets merge with merge_cycle_parts.
+    """
+
+    found = {}
+
+    for start in starts:
+        timestamps, receivers, amounts = timelines[start]
+
+        for i in range(len(timestamps)):
+            first = receivers[i]
+            if first == start:
+                continue
+
+            start_time = timestamps[i]
+            deadline = start_time + window_ns
+
+            path = [start, first]
+            on_path = {start, first}
+            hop_amounts = [amounts[i]]
+            stack = [_next_hops(timelines[first], start_time, deadline)]
+
+            while stack:
+                step = next(stack[-1], None)
+
+                if step is None:
+                    stack.pop()
+                    on_path.discard(path.pop())
+                    hop_amounts.pop()
+                    continue
+
+                nxt, time, amount = step
+
+                if nxt == start:
+                    if len(path) >= min_length:
+                        low = path.index(min(path))
+                        key = tuple(path[low:] + path[:low])
+                        if key not in found or start_time < found[key][0]:
+                            found[key] = (start_time, list(path), hop_amounts + [amount])
+                    continue
+
+                if nxt in on_path or len(path) >= max_length:
+                    continue
+
+                path.append(nxt)
+                on_path.add(nxt)
+                hop_amounts.append(amount)
+                stack.append(_next_hops(timelines[nxt], time, deadline))
+
+    return found
+
+
+def temporal_cycles_in_components(
+    indptr,
+    txn_indptr,
+    txn_receivers,
+    txn_timestamps,
+    txn_amounts,
+    labels,
+    components,
+    window_hours=CYCLE_WINDOW_HOURS,
+    min_length=CYCLE_MIN_LENGTH,
+    max_length=CYCLE_MAX_LENGTH,
+):
+    # Yields (path in time order, hop amounts), by component then rotation
+    window_ns = int(window_hours * 3600 * 10**9)
+
+    for members in components:
+        timelines = component_timelines(
+            indptr, txn_indptr, txn_receivers, txn_timestamps, txn_amounts, labels, members
+        )
+        found = temporal_cycles_from_starts(
+            timelines, members.tolist(), window_ns, min_length, max_length
+        )
+        for key in sorted(found):
+            _, path, amounts = found[key]
+            yield path, amounts
+
+
+def retention(amounts):
+    # What came back to the origin, absolute and as a share of what left
+    return {
+        "amount_retained": round(float(amounts[-1]), 2),
+        "retention_ratio": round(float(amounts[-1] / amounts[0]), 4) if amounts[0] else 0.0,
+    }
+
+
+def iter_cycle_indices(G, min_length=CYCLE_MIN_LENGTH, max_length=CYCLE_MAX_LENGTH):
+    """
+    Yield every simple directed cycle of G whose length is within
+    [min_length, max_length], exactly once, as lists of account indices.
+
+    Each cycle starts at its lowest-numbered member, so rotations of the
+    same ring are never emitted twice. The search runs per strongly
+    connected component and never extends a path beyond max_length.
+    """
+
+    labels = strongly_connected_components(G.indptr, G.indices)
+
+    yield from cycles_in_components(
+        G.indptr,
+        G.indices,
+        labels,
+        candidate_components(labels, min_length),
+        min_length,
+        max_length,
+    )
+
+
+def iter_temporal_cycle_indices(G, window_hours=CYCLE_WINDOW_HOURS):
+    # Yields (account indices in time order, retention details)
+    labels = strongly_connected_components(G.indptr, G.indices)
+
+    for path, amounts in temporal_cycles_in_components(
+        G.indptr,
+        G.txn_indptr,
+        G.transaction_endpoints()[1],
+        G.txn_timestamps,
+        G.txn_amounts,
+        labels,
+        candidate_components(labels),
+        window_hours,
+    ):
+        yield path, retention(amounts)
+
+
+# -------------------------
+# Split search (parallel workers)
+# -------------------------
+def cycle_work_units(components, parts):
+    """
+    Split SCCs into (component position, offset, stride) units of roughly
+    equal size. Components larger than an even share are split by strided
+    start nodes (cycles are owned by their lowest member, so start sets are
+    independent); the units are then packed greedily into `parts` buckets.
+    """
+
+    total = sum(len(members) for members in components)
+    share = max(1, total // parts)
+
+    units = []
+    for pos, members in enumerate(components):
+        stride = min(parts, -(-len(members) // share))
+        for offset in range(stride):
+            units.append((pos, offset, stride, len(members) / stride))
+
+    buckets = [[] for _ in range(parts)]
+    loads = [0] * parts
+
+    for unit in sorted(units, key=lambda u: -u[3]):
+        target = loads.index(min(loads))
+        buckets[target].append(unit[:3])
+        loads[target] += unit[3]
+
+    return [bucket for bucket in buckets if bucket]
+
+
+def cycle_parts(G, parts, detector=None):
+    """
+    The configured cycle search on G as at most `parts` independent work
+    lists of (component position, members, offset, stride) units, for
+    iter_cycle_part_results; merge_cycle_parts restores the serial order.
+    """
+
+    labels = strongly_connected_components(G.indptr, G.indices)
+    components = candidate_components(labels)
+    mode = detector or CYCLE_DETECTOR
+
+    return [
+        (mode, [(pos, components[pos], offset, stride) for pos, offset, stride in bucket])
+        for bucket in cycle_work_units(components, parts)
+    ]
+
+
+def iter_cycle_part_results(G, part):
+    # One cycle_parts work list as (account indices, details or None);
+    # temporal details also carry "first_ns" for merge_cycle_parts
+    mode, units = part
+
+    # Only equality within a component matters, so labels for the units'
+    # own members (-1 elsewhere) stand in for the full SCC labelling
+    labels = np.full(G.number_of_nodes(), -1, dtype=np.int64)
+    for pos, members, _, _ in units:
+        labels[members] = pos
+
+    if mode == "temporal":
+        window_ns = int(CYCLE_WINDOW_HOURS * 3600 * 10**9)
+        receivers = G.transaction_endpoints()[1]
+
+        for _, members, offset, stride in units:
+            timelines = component_timelines(
+                G.indptr, G.txn_indptr, receivers, G.txn_timestamps, G.txn_amounts, labels, members
+            )
+            found = temporal_cycles_from_starts(timelines, members[offset::stride].tolist(), window_ns)
+            for first_ns, path, amounts in found.values():
+                yield path, {**retention(amounts), "first_ns": first_ns}
+        return
+
+    for _, members, offset, stride in units:
+        succ, pred = component_adjacency(G.indptr, G.indices, members, labels)
+        for cycle in cycles_from_starts(succ, pred, members[offset::stride].tolist()):
+            yield cycle, None
+
+
+def merge_cycle_parts(parts, results):
+    """
+    Combine iter_cycle_part_results lists (results[i] for parts[i]) into
+    the order of the serial search: by component, then by start node in
+    discovery order (static), or by canonical rotation keeping each
+    temporal cycle's earliest occurrence.
+    """
+
+    component = {}
+    for _, units in parts:
+        for pos, members, _, _ in units:
+            component.update(dict.fromkeys(members.tolist(), pos))
+
+    found = [result for part in results for result in part]
+
+    if not parts or parts[0][0] != "temporal":
+        # A start's cycles all come from one unit, already in discovery order
+        found.sort(key=lambda result: (component[result[0][0]], result[0][0]))
+        return found
+
+    best = {}
+    for path, details in found:
+        low = path.index(min(path))
+        key = tuple(path[low:] + path[:low])
+        details = dict(details)
+        first_ns = details.pop("first_ns")
+        if key not in best or (first_ns, path) < best[key][:2]:
+            best[key] = (first_ns, path, details)
+
+    return [
+        (best[key][1], best[key][2])
+        for key in sorted(best, key=lambda key: (component[key[0]], key))
+    ]
+
+
+def iter_cycle_index_results(G, detector=None):
+    # The configured cycle detector as (account indices, details or None)
+    if (detector or CYCLE_DETECTOR) == "temporal":
+        yield from iter_temporal_cycle_indices(G)
+        return
+
+    for cycle in iter_cycle_indices(G):
+        yield cycle, None
@@ -0,0 +1,360 @@
+import pickle
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+
+from ..config import DETECTION_WORKERS, PARALLEL_DETECTION_MIN_EDGES
+from .graph_builder import TransactionGraph
+from .detector_registry import budget_deadline, detector_deadline
+
+# TransactionGraph columns that detector processes map from shared memory
+GRAPH_ARRAYS = (
+    "indptr",
+    "indices",
+    "edge_count",
+    "edge_amount",
+    "edge_first_ts",
+    "edge_last_ts",
+    "txn_indptr",
+    "txn_amounts",
+    "txn_timestamps",
+)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=DETECTION_WORKERS, mp_context=get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# -------------------------
+# Shared memory
+# -------------------------
+class SharedArrays:
+    """
+    Copies NumPy arrays into shared memory once so worker processes can map
+    them by name instead of receiving a pickled copy per task.
+    """
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self.descriptors = {}
+
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+            self._blocks.append(shm)
+            self.descriptors[name] = (shm.name, arr.shape, arr.dtype.str)
+
+    def release(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+
+def _map_shared(descriptors):
+    # Worker side of SharedArrays: (blocks to close, name -> array)
+    blocks = []
+    arrays = {}
+
+    for name, (shm_name, shape, dtype) in descriptors.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    return blocks, arrays
+
+
+def _close_shared(blocks, arrays):
+    arrays.clear()
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            # A traceback still points into the block; exit releases it
+            pass
+
+
+def _shared_graph(arrays, accounts=None, txn_ids=None):
+    # A TransactionGraph over mapped arrays. Without the real IDs, accounts
+    # and transaction IDs are positions (detector results are indices anyway)
+    if accounts is None:
+        accounts = np.arange(len(arrays["indptr"]) - 1)
+    if txn_ids is None:
+        txn_ids = np.arange(len(arrays["txn_amounts"]))
+
+    return TransactionGraph(
+        accounts,
+        arrays["indptr"],
+        arrays["indices"],
+        arrays["edge_count"],
+        arrays["edge_amount"],
+        arrays["edge_first_ts"],
+        arrays["edge_last_ts"],
+        arrays["txn_indptr"],
+        txn_ids,
+        arrays["txn_amounts"],
+        arrays["txn_timestamps"],
+    )
+
+
+def _share_graph(G):
+    return SharedArrays({name: getattr(G, name) for name in GRAPH_ARRAYS})
+
+
+def _picklable(run):
+    # Only module-level callables reach another process
+    try:
+        pickle.dumps(run)
+    except Exception:
+        return False
+    return True
+
+
+# -------------------------
+# Time-limited runs
+# -------------------------
+def _child_run(conn, run, names, descriptors, extras, df):
+    # Child process entry point: run one detector over the shared graph and
+    # send its findings as they come; the parent stops us at the deadline
+    blocks, arrays = _map_shared(descriptors)
+    inputs = {}
+
+    try:
+        inputs = {"graph": _shared_graph(arrays, **extras), "transactions": df}
+        for finding in run(**{name: inputs[name] for name in names}):
+            conn.send(("finding", finding))
+        conn.send(("done", None))
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+        inputs.clear()
+        _close_shared(blocks, arrays)
+
+
+def _checked_run(detector, inputs, deadline, timed_out):
+    # In-process fallback: the deadline is only seen between findings
+    for finding in detector.run(**{name: inputs[name] for name in detector.inputs}):
+        yield finding
+
+        if time.perf_counter() >= deadline:
+            timed_out.append(detector.name)
+            return
+
+
+def _deadline_run(detector, inputs, deadline, timed_out):
+    graph = inputs["graph"]
+    df = None
+    extras = {}
+    if "transactions" in detector.inputs:
+        df = inputs["transactions"]
+        extras = {"accounts": graph.accounts, "txn_ids": graph.txn_ids}
+
+    context = get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    shared = _share_graph(graph)
+    child = context.Process(
+        target=_child_run,
+        args=(sender, detector.run, detector.inputs, shared.descriptors, extras, df),
+        daemon=True,
+    )
+
+    try:
+        child.start()
+        sender.close()
+
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not receiver.poll(remaining):
+                timed_out.append(detector.name)
+                return
+
+            try:
+                kind, value = receiver.recv()
+            except EOFError:
+                raise RuntimeError(f"Detector {detector.name} exited without finishing") from None
+
+            if kind == "done":
+                return
+            if kind == "error":
+                raise RuntimeError(f"Detector {detector.name} failed:\n{value}")
+            yield value
+    finally:
+        if child.pid is not None:
+            child.terminate()
+            child.join()
+        sender.close()
+        receiver.close()
+        shared.release()
+
+
+def run_detector(detector, inputs, budget_end=None, timed_out=None):
+    """
+    Yield `detector`'s findings (`inputs` maps input names to values). With
+    a deadline, the earlier of its own time limit and `budget_end`, the run
+    happens in a child process that is terminated when the deadline passes,
+    keeping what was found, and the detector's name is appended to
+    `timed_out`; so is a detector reached after `budget_end`.
+    """
+
+    deadline = detector_deadline(detector, budget_end)
+    if deadline is None:
+        yield from detector.run(**{name: inputs[name] for name in detector.inputs})
+        return
+
+    if time.perf_counter() >= deadline:
+        timed_out.append(detector.name)
+        return
+
+    if _picklable(detector.run):
+        yield from _deadline_run(detector, inputs, deadline, timed_out)
+    else:
+        yield from _checked_run(detector, inputs, deadline, timed_out)
+
+
+# -------------------------
+# Worker pool
+# -------------------------
+def _run_task(run, descriptors, part):
+    # Pool entry point: map the shared graph and run one detector (or one
+    # part of a split detector). Findings are pickled here, while the
+    # arrays they may still view are mapped.
+    blocks, arrays = _map_shared(descriptors)
+    graph = None
+
+    try:
+        graph = _shared_graph(arrays)
+        findings = run(graph=graph) if part is None else run(graph=graph, part=part)
+        return pickle.dumps(list(findings))
+    finally:
+        graph = findings = None
+        _close_shared(blocks, arrays)
+
+
+def _run_pooled(detectors, graph_for):
+    """
+    Run `detectors` on the worker pool, each graph's arrays shared once.
+    Split detectors submit one task per part and merge them. Returns
+    ({name: findings}, {name: seconds from dispatch until finished}).
+    """
+
+    executor = _get_executor()
+    shared = {}
+    submitted = []
+    finished = {}
+
+    def mark_done(name):
+        # Completion callbacks run as each future settles, not when collected
+        def callback(_):
+            finished[name] = max(finished.get(name, 0), time.perf_counter())
+        return callback
+
+    try:
+        dispatched = time.perf_counter()
+
+        # Whole runs go first so they are busy while split detectors
+        # prepare their parts here
+        for detector in sorted(detectors, key=lambda d: d.split is not None):
+            graph = graph_for(detector)
+            if id(graph) not in shared:
+                shared[id(graph)] = _share_graph(graph)
+            descriptors = shared[id(graph)].descriptors
+
+            parts = detector.split(graph, DETECTION_WORKERS) if detector.split else [None]
+            futures = []
+            for part in parts:
+                future = executor.submit(_run_task, detector.run, descriptors, part)
+                future.add_done_callback(mark_done(detector.name))
+                futures.append(future)
+            submitted.append((detector, parts, futures))
+
+        found = {}
+        for detector, parts, futures in submitted:
+            results = [pickle.loads(future.result()) for future in futures]
+            found[detector.name] = detector.merge(parts, results) if detector.split else results[0]
+            # A split detector with no parts at all
+            finished.setdefault(detector.name, time.perf_counter())
+
+    finally:
+        for arrays in shared.values():
+            arrays.release()
+
+    timings = {name: finished[name] - dispatched for name in found}
+    return found, timings
+
+
+# -------------------------
+# Detection
+# -------------------------
+def detect(G, df, detectors, budget=None, parallel=None, pruned=None):
+    """
+    Run registry `detectors` on G (df is passed to detectors that ask for
+    the transactions). Returns (results, timings, timed_out): results pairs
+    each detector with its list of findings, in registry order. `pruned`
+    (hub_pruning.prune_hubs) replaces G for detectors with prune_hubs.
+
+    Every detector runs through its registered `run`. On large graphs
+    (or with `parallel`), those that only read the graph run concurrently
+    on a worker pool mapping the graph from shared memory, split detectors
+    across several workers. With a time limit or `budget` a detector runs
+    through run_detector instead and is listed in timed_out when stopped
+    at its deadline or reached after the budget is spent.
+    """
+
+    if parallel is None:
+        parallel = (
+            DETECTION_WORKERS > 1
+            and G.number_of_edges() >= PARALLEL_DETECTION_MIN_EDGES
+        )
+
+    budget_end = budget_deadline(budget)
+
+    def graph_for(detector):
+        return pruned if pruned is not None and detector.prune_hubs else G
+
+    found, timings, timed_out = {}, {}, []
+
+    pooled = [
+        detector
+        for detector in detectors
+        if parallel
+        and budget_end is None
+        and detector.time_limit() is None
+        and detector.inputs == ("graph",)
+        and _picklable(detector.run)
+    ]
+    if pooled:
+        found, timings = _run_pooled(pooled, graph_for)
+
+    for detector in detectors:
+        if detector.name in found:
+            continue
+
+        inputs = {"graph": graph_for(detector), "transactions": df}
+
+        start = time.perf_counter()
+        found[detector.name] = list(run_detector(detector, inputs, budget_end, timed_out))
+        timings[detector.name] = time.perf_counter() - start
+
+    results = [(detector, found[detector.name]) for detector in detectors]
+    timings = {detector.name: round(timings[detector.name], 3) for detector in detectors}
+
+    return results, timings, timed_out
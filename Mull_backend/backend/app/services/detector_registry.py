@@ -0,0 +1,237 @@
+import time
+
+import numpy as np
+
+from ..config import (
+    DEFAULT_DETECTORS,
+    DETECTOR_TIMEOUT_SECONDS,
+    DETECTION_BUDGET_SECONDS,
+    WEIGHT_CYCLE,
+    WEIGHT_SMURFING,
+    WEIGHT_SHELL,
+    WEIGHT_PASS_THROUGH,
+    WEIGHT_ROUND_AMOUNT,
+)
+from .cycle_detector import (
+    iter_cycle_index_results,
+    iter_cycle_part_results,
+    cycle_parts,
+    merge_cycle_parts,
+)
+from .smurfing_detector import smurfing_hubs
+from .shell_detector import find_shells
+from .pass_through_detector import pass_through_accounts
+from .round_amount_detector import round_amount_senders
+
+# Inputs a detector may ask for: "graph" is the TransactionGraph (CSR
+# arrays and per-transaction columns), "transactions" the parsed DataFrame
+INPUTS = ["graph", "transactions"]
+
+
+class Detector:
+    """
+    A registered pattern detector.
+
+    `run(**inputs)` yields findings as (members, scored, details) tuples:
+    `members` form the fraud ring, every account in `scored` gains `weight`
+    and `pattern_type`, and `details` (a dict or None) is merged into the
+    ring. Accounts are indices into graph.accounts (graph.index maps IDs
+    back for detectors that read the transactions frame); they are only
+    translated to IDs when the response is built.
+
+    With `prune_hubs`, hub pruning (when enabled) hands the detector a graph
+    without hub accounts' edges, same account indices. A detector that is
+    not `windowed` runs once over the whole history in windowed analysis:
+    its thresholds count counterparties, which a window graph understates.
+
+    A time-limited run (`timeout` in seconds, which DETECTOR_TIMEOUT_SECONDS
+    overrides by name, or a detection budget) happens in a child process
+    that is stopped at the deadline; findings sent until then are kept. So
+    is every run on a worker pool: `run` should be picklable (a module-level
+    function) and may see a graph whose accounts and transaction IDs are
+    plain positions. A `run` that cannot be pickled stays in-process and
+    only sees its deadline between findings.
+
+    A detector with `split(graph, parts)` can be spread over the pool:
+    `run(graph=..., part=p)` searches one of the returned parts and
+    `merge(parts, findings per part)` joins them in the order of a whole
+    run.
+    """
+
+    def __init__(
+        self,
+        name,
+        pattern_type,
+        weight,
+        run,
+        inputs=("graph",),
+        timeout=None,
+        prune_hubs=False,
+        windowed=True,
+        split=None,
+        merge=None,
+    ):
+        self.name = name
+        self.pattern_type = pattern_type
+        self.weight = weight
+        self.run = run
+        self.inputs = tuple(inputs)
+        self.timeout = timeout
+        self.prune_hubs = prune_hubs
+        self.windowed = windowed
+        self.split = split
+        self.merge = merge
+
+    def time_limit(self):
+        # Configured override, else the detector's own default
+        return DETECTOR_TIMEOUT_SECONDS.get(self.name, self.timeout)
+
+    def info(self):
+        return {
+            "name": self.name,
+            "pattern_type": self.pattern_type,
+            "weight": self.weight,
+            "inputs": list(self.inputs),
+            "default": self.name in DEFAULT_DETECTORS,
+            "timeout_seconds": self.time_limit(),
+            "prune_hubs": self.prune_hubs,
+            "windowed": self.windowed,
+        }
+
+
+# name -> Detector, in registration order (which is also ring priority)
+DETECTORS = {}
+
+
+def register_detector(
+    name,
+    pattern_type,
+    weight,
+    run,
+    inputs=("graph",),
+    timeout=None,
+    prune_hubs=False,
+    windowed=True,
+    split=None,
+    merge=None,
+):
+    if name in DETECTORS:
+        raise ValueError(f"Detector already registered: {name}")
+
+    unknown = [i for i in inputs if i not in INPUTS]
+    if unknown:
+        raise ValueError(f"Unknown detector inputs: {', '.join(unknown)}")
+    if (split is None) != (merge is None):
+        raise ValueError("A detector needs both split and merge, or neither")
+
+    detector = Detector(
+        name, pattern_type, weight, run, inputs, timeout, prune_hubs, windowed, split, merge
+    )
+    DETECTORS[name] = detector
+    return detector
+
+
+def parse_detector_names(value):
+    # "cycles,pass_through" -> ["cycles", "pass_through"]; None stays None
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def resolve_detectors(names=None):
+    """
+    Registered detectors for `names` (default: DEFAULT_DETECTORS), in
+    registration order. Raises ValueError for unknown names.
+    """
+
+    names = DEFAULT_DETECTORS if names is None else names
+    if not names:
+        raise ValueError("At least one detector is required")
+
+    unknown = [name for name in names if name not in DETECTORS]
+    if unknown:
+        raise ValueError(
+            f"Unknown detectors: {', '.join(unknown)} "
+            f"(available: {', '.join(DETECTORS)})"
+        )
+
+    return [detector for name, detector in DETECTORS.items() if name in names]
+
+
+def budget_deadline(budget=None):
+    # perf_counter time at which a detection budget (default
+    # DETECTION_BUDGET_SECONDS) runs out; None means unlimited
+    budget = DETECTION_BUDGET_SECONDS if budget is None else budget
+    return None if budget is None else time.perf_counter() + budget
+
+
+def detector_deadline(detector, budget_end=None):
+    # perf_counter time at which `detector` must stop: the earlier of its
+    # own time limit and `budget_end`; None means unlimited
+    limit = detector.time_limit()
+    if limit is None:
+        return budget_end
+
+    own = time.perf_counter() + limit
+    return own if budget_end is None else min(own, budget_end)
+
+
+# -------------------------
+# Built-in detectors
+# -------------------------
+def _cycles(graph, part=None):
+    if part is None:
+        results = iter_cycle_index_results(graph)
+    else:
+        results = iter_cycle_part_results(graph, part)
+
+    for cycle, details in results:
+        yield cycle, cycle, details
+
+
+def _merge_cycles(parts, found):
+    results = [[(members, details) for members, _, details in findings] for findings in found]
+    return [(cycle, cycle, details) for cycle, details in merge_cycle_parts(parts, results)]
+
+
+def _hub_findings(hubs):
+    # Hub-style detectors score the hub; its counterparties join the ring
+    for hub, peers in hubs.items():
+        yield np.append(peers, hub), [hub], None
+
+
+def _smurfing(graph):
+    senders, receivers = graph.transaction_endpoints()
+    yield from _hub_findings(smurfing_hubs(senders, receivers, graph.txn_timestamps))
+
+
+def _shells(graph):
+    for chain in find_shells(graph.indptr, graph.indices, graph.edge_first_ts, graph.edge_last_ts):
+        yield chain, chain, None
+
+
+def _pass_through(graph):
+    senders, receivers = graph.transaction_endpoints()
+    yield from _hub_findings(
+        pass_through_accounts(senders, receivers, graph.txn_timestamps, graph.txn_amounts)
+    )
+
+
+def _round_amounts(graph):
+    senders, receivers = graph.transaction_endpoints()
+    yield from _hub_findings(round_amount_senders(senders, receivers, graph.txn_amounts))
+
+
+register_detector(
+    "cycles",
+    "cycle",
+    WEIGHT_CYCLE,
+    _cycles,
+    prune_hubs=True,
+    split=cycle_parts,
+    merge=_merge_cycles,
+)
+register_detector("smurfing", "smurfing", WEIGHT_SMURFING, _smurfing)
+register_detector("shells", "shell", WEIGHT_SHELL, _shells, prune_hubs=True, windowed=False)
+register_detector("pass_through", "pass_through", WEIGHT_PASS_THROUGH, _pass_through)
+register_detector("round_amounts", "round_amount", WEIGHT_ROUND_AMOUNT, _round_amounts)
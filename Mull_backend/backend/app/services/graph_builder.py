@@ -1,15 +1,344 @@
-import networkx as nx
+import numpy as np
+import pandas as pd
 
-def build_graph(df):
-    G = nx.DiGraph()
 
-    for _, row in df.iterrows():
-        G.add_edge(
-            row["sender_id"],
-            row["receiver_id"],
-            amount=row["amount"],
-            timestamp=row["timestamp"],
-            transaction_id=row["transaction_id"]
+class TransactionGraph:
+    """
+    Columnar directed transaction graph.
+
+    Accounts are integer-encoded (0..n-1, in order of first appearance) and
+    `accounts[i]` holds the original ID. Distinct sender -> receiver pairs
+    are stored as CSR arrays: the receivers of account i are
+    `indices[indptr[i]:indptr[i + 1]]`, sorted ascending.
+
+    Every edge carries its transaction count, total amount and first/last
+    timestamp (int64 ns). The individual transactions of edge e are rows
+    `txn_indptr[e]:txn_indptr[e + 1]` of `txn_ids`, `txn_amounts` and
+    `txn_timestamps`, in time order, so parallel transfers are preserved.
+    """
+
+    def __init__(
+        self,
+        accounts,
+        indptr,
+        indices,
+        edge_count,
+        edge_amount,
+        edge_first_ts,
+        edge_last_ts,
+        txn_indptr,
+        txn_ids,
+        txn_amounts,
+        txn_timestamps,
+    ):
+        self.accounts = accounts
+        self.indptr = indptr
+        self.indices = indices
+        self.edge_count = edge_count
+        self.edge_amount = edge_amount
+        self.edge_first_ts = edge_first_ts
+        self.edge_last_ts = edge_last_ts
+        self.txn_indptr = txn_indptr
+        self.txn_ids = txn_ids
+        self.txn_amounts = txn_amounts
+        self.txn_timestamps = txn_timestamps
+
+        self._index = None
+        self._reverse = None
+
+    # -------------------------
+    # Size / node access (networkx-compatible subset)
+    # -------------------------
+    def number_of_nodes(self):
+        return len(self.accounts)
+
+    def number_of_edges(self):
+        return len(self.indices)
+
+    def nodes(self):
+        return self.accounts.tolist()
+
+    @property
+    def index(self):
+        # account id -> integer index, built on first use
+        if self._index is None:
+            self._index = {acc: i for i, acc in enumerate(self.accounts.tolist())}
+        return self._index
+
+    # -------------------------
+    # Adjacency
+    # -------------------------
+    @property
+    def edge_sources(self):
+        return np.repeat(
+            np.arange(self.number_of_nodes(), dtype=np.int32),
+            np.diff(self.indptr),
+        )
+
+    def successors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def reverse(self):
+        """
+        Return (rev_indptr, rev_indices, rev_edge) describing predecessors in
+        CSR form. `rev_edge` maps each reversed entry back to its edge id.
+        """
+        if self._reverse is None:
+            n = self.number_of_nodes()
+            rev_edge = np.argsort(self.indices, kind="stable")
+            rev_indices = self.edge_sources[rev_edge]
+            rev_indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=n), out=rev_indptr[1:])
+            self._reverse = (rev_indptr, rev_indices, rev_edge)
+
+        return self._reverse
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        return np.bincount(self.indices, minlength=self.number_of_nodes())
+
+    def degree(self):
+        return self.out_degree() + self.in_degree()
+
+    def transaction_endpoints(self):
+        # (sender index, receiver index) per preserved transaction
+        return (
+            np.repeat(self.edge_sources, self.edge_count),
+            np.repeat(self.indices, self.edge_count),
         )
 
+    def transactions(self):
+        """
+        Every preserved transaction as a DataFrame, grouped by edge. Account
+        columns are categoricals over `accounts`, so IDs are not duplicated.
+        """
+        sources, targets = self.transaction_endpoints()
+        categories = pd.Index(self.accounts)
+
+        return pd.DataFrame(
+            {
+                "transaction_id": self.txn_ids,
+                "sender_id": pd.Categorical.from_codes(sources, categories),
+                "receiver_id": pd.Categorical.from_codes(targets, categories),
+                "amount": self.txn_amounts,
+                "timestamp": self.txn_timestamps.view("datetime64[ns]"),
+            }
+        )
+
+    def edges(self, data=False):
+        sources = self.edge_sources
+        accounts = self.accounts
+
+        for e in range(self.number_of_edges()):
+            u = accounts[sources[e]]
+            v = accounts[self.indices[e]]
+
+            if not data:
+                yield u, v
+                continue
+
+            lo, hi = self.txn_indptr[e], self.txn_indptr[e + 1]
+            yield u, v, {
+                "amount": float(self.edge_amount[e]),
+                "count": int(self.edge_count[e]),
+                "first_timestamp": pd.Timestamp(self.edge_first_ts[e]),
+                "last_timestamp": pd.Timestamp(self.edge_last_ts[e]),
+                "transaction_id": ", ".join(map(str, self.txn_ids[lo:hi])),
+            }
+
+
+def graph_from_arrays(accounts, src, dst, timestamps, amounts, txn_ids):
+    """
+    TransactionGraph of per-transaction columns: `src` / `dst` are integer
+    codes into `accounts`, timestamps int64 ns.
+    """
+
+    n = len(src)
+
+    # One sort groups transactions by edge and orders each edge by time
+    order = np.lexsort((timestamps, dst, src))
+    src = src[order]
+    dst = dst[order]
+    timestamps = timestamps[order]
+    amounts = amounts[order]
+
+    new_edge = np.ones(n, dtype=bool)
+    new_edge[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+    starts = np.flatnonzero(new_edge)
+    ends = np.append(starts[1:], n)[:len(starts)]
+
+    num_accounts = len(accounts)
+    edge_src = src[starts]
+
+    indptr = np.zeros(num_accounts + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_src, minlength=num_accounts), out=indptr[1:])
+
+    txn_indptr = np.append(starts, n).astype(np.int64)
+
+    return TransactionGraph(
+        accounts=np.asarray(accounts, dtype=object),
+        indptr=indptr,
+        indices=dst[starts],
+        edge_count=(ends - starts).astype(np.int64),
+        edge_amount=(
+            np.add.reduceat(amounts, starts, dtype=np.float64)
+            if n
+            else amounts.astype(np.float64)
+        ),
+        edge_first_ts=timestamps[starts],
+        edge_last_ts=timestamps[ends - 1],
+        txn_indptr=txn_indptr,
+        txn_ids=txn_ids[order],
+        txn_amounts=amounts,
+        txn_timestamps=timestamps,
+    )
+
+
+def concat_ranges(starts, ends):
+    # Concatenated aranges [starts[i], ends[i])
+    counts = ends - starts
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(counts.sum())
+
+
+def timestamps_ns(df):
+    # A frame's timestamp column as int64 ns
+    return df["timestamp"].to_numpy().astype("datetime64[ns]").view(np.int64)
+
+
+def interleaved_accounts(df):
+    # Interleave sender/receiver so account numbering follows the order in
+    # which accounts first appear in the file.
+    senders = df["sender_id"].to_numpy(dtype=object)
+    receivers = df["receiver_id"].to_numpy(dtype=object)
+    return np.column_stack((senders, receivers)).ravel()
+
+
+def build_graph(df, intern=False):
+    """
+    TransactionGraph of a parsed frame. With `intern`, the frame's account
+    columns are replaced in place by categoricals over G.accounts (integer
+    codes of at most 32 bits), so each ID string is held once for as long
+    as df is kept.
+    """
+
+    codes, accounts = pd.factorize(interleaved_accounts(df))
+    if len(codes) and codes.min() < 0:
+        # pd.factorize codes missing values as -1
+        raise ValueError("Missing account IDs in input")
+    codes = codes.astype(np.int32)
+
+    G = graph_from_arrays(
+        accounts,
+        codes[0::2],
+        codes[1::2],
+        timestamps_ns(df),
+        df["amount"].to_numpy(dtype=np.float64),
+        df["transaction_id"].to_numpy(dtype=object),
+    )
+
+    if intern:
+        dtype = pd.CategoricalDtype(pd.Index(G.accounts))
+        df["sender_id"] = pd.Categorical.from_codes(codes[0::2], dtype=dtype)
+        df["receiver_id"] = pd.Categorical.from_codes(codes[1::2], dtype=dtype)
+
     return G
+
+
+class GraphBuilder:
+    """
+    Incremental counterpart of build_graph for chunked ingestion.
+
+    Each chunk is integer-encoded against the accounts seen so far and kept
+    only as compact column arrays, so the parsed chunk DataFrame can be
+    released before the next one is read.
+    """
+
+    def __init__(self):
+        self._codes = {}
+        self._accounts = []
+        self._parts = []
+
+    def encode(self, df):
+        # Global account codes of a chunk's rows, interleaved as sender,
+        # receiver; new IDs are registered. The chunk is encoded against its
+        # own (small) category sets first, then each distinct ID is mapped
+        # to a global code once, in order of first appearance, instead of
+        # hashing every row.
+        values, local = [], []
+        offset = 0
+
+        for col in ("sender_id", "receiver_id"):
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                uniques = series.cat.categories.to_numpy(dtype=object)
+            else:
+                codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+            values.append(uniques)
+            local.append(codes.astype(np.int64) + offset)
+            offset += len(uniques)
+
+        values = np.concatenate(values)
+        local = np.column_stack(local).ravel()
+
+        seen, first = np.unique(local, return_index=True)
+        mapping = np.empty(len(values), dtype=np.int32)
+
+        for loc in seen[np.argsort(first)].tolist():
+            acc = values[loc]
+            code = self._codes.get(acc)
+            if code is None:
+                code = len(self._accounts)
+                self._codes[acc] = code
+                self._accounts.append(acc)
+            mapping[loc] = code
+
+        return mapping[local]
+
+    def number_of_accounts(self):
+        return len(self._accounts)
+
+    def add(self, df):
+        codes = self.encode(df)
+
+        self._parts.append(
+            (
+                codes[0::2],
+                codes[1::2],
+                timestamps_ns(df),
+                df["amount"].to_numpy(),
+                # Fixed-width strings: no per-row Python objects to keep alive
+                df["transaction_id"].to_numpy(dtype=str),
+            )
+        )
+        return self
+
+    def finalize(self):
+        if not self._parts:
+            empty = np.empty(0, dtype=np.int32)
+            self._parts.append(
+                (
+                    empty,
+                    empty,
+                    np.empty(0, dtype=np.int64),
+                    np.empty(0, dtype=np.float64),
+                    np.empty(0, dtype=str),
+                )
+            )
+
+        columns = [np.concatenate(col) for col in zip(*self._parts)]
+        self._parts = []
+
+        return graph_from_arrays(self._accounts, *columns)
+
+
+def build_graph_from_chunks(chunks):
+    builder = GraphBuilder()
+
+    for chunk in chunks:
+        builder.add(chunk)
+
+    return builder.finalize()
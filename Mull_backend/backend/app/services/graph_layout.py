@@ -0,0 +1,177 @@
+import numpy as np
+
+LAYOUT_ITERATIONS = 50
+LAYOUT_SCALE = 60  # pixels per layout unit
+REPULSION_SAMPLE = 256  # larger components use sampled repulsion
+
+
+# -------------------------
+# Level of detail
+# -------------------------
+def _neighbors(indptr, indices, nodes):
+    # Concatenated CSR rows of `nodes`
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return indices[offsets + np.arange(counts.sum())]
+
+
+def k_hop_layers(G, seeds, hops, max_nodes=None):
+    """
+    Breadth-first layers of accounts around `seeds` (layer 0), following
+    edges in both directions, for up to `hops` steps. Stops expanding once
+    more than `max_nodes` accounts have been reached.
+    """
+
+    rev_indptr, rev_indices, _ = G.reverse()
+
+    seeds = np.unique(np.asarray(seeds, dtype=np.int64))
+    visited = np.zeros(G.number_of_nodes(), dtype=bool)
+    visited[seeds] = True
+
+    layers = [seeds]
+    frontier = seeds
+    reached_total = len(seeds)
+
+    for _ in range(hops):
+        if not len(frontier) or (max_nodes is not None and reached_total > max_nodes):
+            break
+
+        reached = np.concatenate(
+            (
+                _neighbors(G.indptr, G.indices, frontier),
+                _neighbors(rev_indptr, rev_indices, frontier),
+            )
+        )
+        frontier = np.unique(reached[~visited[reached]])
+        visited[frontier] = True
+        layers.append(frontier)
+        reached_total += len(frontier)
+
+    return layers
+
+
+def k_hop_nodes(G, seeds, hops, max_nodes):
+    """
+    Accounts within `hops` undirected steps of `seeds`, nearest first, at
+    most `max_nodes` of them. Returns (node indices, truncated).
+    """
+
+    nodes = np.concatenate(k_hop_layers(G, seeds, hops, max_nodes))
+    truncated = len(nodes) > max_nodes
+
+    return nodes[:max_nodes], truncated
+
+
+# -------------------------
+# Layout
+# -------------------------
+def _root(parent, node):
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
+
+
+def _component_roots(n, src, dst):
+    # Undirected connected components of a small edge list (union-find)
+    parent = list(range(n))
+
+    for u, v in zip(src.tolist(), dst.tolist()):
+        ru, rv = _root(parent, u), _root(parent, v)
+        if ru != rv:
+            parent[rv] = ru
+
+    return np.array([_root(parent, node) for node in range(n)], dtype=np.int64)
+
+
+def _force_layout(n, src, dst, iterations, rng):
+    """
+    Vectorized Fruchterman-Reingold on one component. Attraction runs over
+    the edge list; repulsion is exact up to REPULSION_SAMPLE nodes and is
+    estimated from a fresh random sample of that size each iteration on
+    larger components. Returns positions in the unit square.
+    """
+
+    pos = rng.random((n, 2))
+    if n == 1:
+        return pos * 0
+
+    k = np.sqrt(1.0 / n)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    sample = min(n, REPULSION_SAMPLE)
+
+    for _ in range(iterations):
+        others = pos if sample == n else pos[rng.choice(n, sample, replace=False)]
+
+        delta = pos[:, None, :] - others[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=-1), 0.01)
+        displacement = np.einsum("ijk,ij->ik", delta, k * k / distance ** 2)
+        displacement *= n / sample
+
+        edge_delta = pos[src] - pos[dst]
+        edge_length = np.maximum(np.linalg.norm(edge_delta, axis=-1), 0.01)
+        pull = edge_delta * (edge_length / k)[:, None]
+        np.subtract.at(displacement, src, pull)
+        np.add.at(displacement, dst, pull)
+
+        length = np.linalg.norm(displacement, axis=-1)
+        length = np.where(length < 0.01, 0.1, length)
+        pos += displacement * (temperature / length)[:, None]
+
+        temperature -= cooling
+
+    pos -= pos.min(axis=0)
+    return pos / max(pos.max(), 1e-9)
+
+
+def layout(n, src, dst, iterations=LAYOUT_ITERATIONS, seed=0):
+    """
+    Positions for n nodes joined by (src, dst) edges, in pixels. Each
+    connected component is laid out on its own (cost is the sum of squared
+    component sizes, not n squared) and the components are packed in rows,
+    largest first.
+    """
+
+    rng = np.random.default_rng(seed)
+    positions = np.zeros((n, 2))
+    if n == 0:
+        return positions
+
+    roots = _component_roots(n, src, dst)
+    order = np.argsort(roots, kind="stable")
+    bounds = np.flatnonzero(np.diff(roots[order])) + 1
+    groups = sorted(np.split(order, bounds), key=len, reverse=True)
+
+    # Local node numbering per component
+    local = np.empty(n, dtype=np.int64)
+    for members in groups:
+        local[members] = np.arange(len(members))
+
+    # Edges grouped by component
+    edge_order = np.argsort(roots[src], kind="stable")
+    edge_roots = roots[src][edge_order]
+
+    row_width = np.sqrt(n) * 2.0
+    x = y = row_height = 0.0
+
+    for members in groups:
+        root = roots[members[0]]
+        lo, hi = np.searchsorted(edge_roots, [root, root + 1])
+        edges = edge_order[lo:hi]
+
+        pos = _force_layout(
+            len(members), local[src[edges]], local[dst[edges]], iterations, rng
+        )
+
+        size = np.sqrt(len(members)) * 1.5 + 1
+        if x + size > row_width and x > 0:
+            x, y = 0.0, y + row_height
+            row_height = 0.0
+
+        positions[members] = pos * (size - 1) + (x, y)
+        x += size
+        row_height = max(row_height, size)
+
+    return positions * LAYOUT_SCALE
@@ -1,41 +1,104 @@
+import time
+
+import numpy as np
 from pyvis.network import Network
-from fastapi import APIRouter, File, UploadFile
-from fastapi.responses import HTMLResponse
-from ..services.csv_parser import parse_csv
-from ..services.graph_builder import build_graph
-from ..services.cycle_detector import detect_cycles
-from ..services.smurfing_detector import detect_smurfing
-from ..services.shell_detector import detect_shells
-from ..services.scoring_engine import score_accounts
-from ..services.json_formatter import format_response
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.responses import HTMLResponse, Response
+from .. import config
+from ..config import VIS_HOPS, VIS_MAX_NODES
+from ..services.pipeline import load_transactions, analyze
+from ..services.graph_layout import k_hop_nodes, layout
 from ..services.ring_table_generator import generate_ring_summary_table
+from ..services.result_cache import result_cache, hash_upload, cache_key
+from ..services.response_encoder import encode_json, JSON_MEDIA_TYPE
+from ..services.metrics import StageRecorder, metrics
 
 router = APIRouter()
 
+RING_COLORS = [
+    "#FF5733", "#33FF57", "#3357FF",
+    "#F1C40F", "#9B59B6", "#E67E22"
+]
+
+
+def build_view(G, response, hops=VIS_HOPS, max_nodes=VIS_MAX_NODES):
+    """
+    Level-of-detail view of G for rendering: the `hops` neighbourhood of
+    every fraud ring (at most `max_nodes` accounts) with precomputed
+    positions, plus counts for everything left out. Node and edge data are
+    columnar; edges reference nodes by position.
+    """
+
+    index = G.index
+    fraud_rings = response["fraud_rings"]
+
+    seeds = [index[acc] for ring in fraud_rings for acc in ring["member_accounts"]]
+    nodes, truncated = k_hop_nodes(G, seeds, hops, max_nodes)
+
+    local = np.full(G.number_of_nodes(), -1, dtype=np.int64)
+    local[nodes] = np.arange(len(nodes))
+
+    sources, targets = local[G.edge_sources], local[G.indices]
+    keep = (sources >= 0) & (targets >= 0)
+    src, dst = sources[keep], targets[keep]
+
+    shown_degree = np.bincount(np.concatenate((src, dst)), minlength=len(nodes))
+    positions = layout(len(nodes), src, dst)
+
+    scores = {acc["account_id"]: acc["suspicion_score"] for acc in response["suspicious_accounts"]}
+    ring_of = {acc["account_id"]: acc["ring_id"] for acc in response["suspicious_accounts"]}
+    for ring in fraud_rings:
+        for acc in ring["member_accounts"]:
+            ring_of.setdefault(acc, ring["ring_id"])
 
-def generate_interactive_graph(G, suspicious_accounts, fraud_rings):
+    accounts = G.accounts[nodes].tolist()
+
+    return {
+        "nodes": {
+            "id": accounts,
+            "x": positions[:, 0].round(1),
+            "y": positions[:, 1].round(1),
+            "score": [scores.get(acc, 0.0) for acc in accounts],
+            "suspicious": [acc in scores for acc in accounts],
+            "ring_id": [ring_of.get(acc) for acc in accounts],
+            "hidden_degree": G.degree()[nodes] - shown_degree,
+        },
+        "edges": {
+            "source": src,
+            "target": dst,
+            "amount": G.edge_amount[keep].round(2),
+            "count": G.edge_count[keep],
+        },
+        "fraud_rings": fraud_rings,
+        "summary": {
+            "hops": hops,
+            "truncated": bool(truncated),
+            "total_accounts": G.number_of_nodes(),
+            "shown_accounts": len(nodes),
+            "hidden_accounts": G.number_of_nodes() - len(nodes),
+            "total_edges": G.number_of_edges(),
+            "shown_edges": int(keep.sum()),
+            "hidden_edges": int(G.number_of_edges() - keep.sum()),
+            "hidden_transactions": int(G.edge_count[~keep].sum()),
+        },
+    }
+
+
+def generate_interactive_graph(view):
 
     net = Network(
         height="850px",
         width="100%",
         directed=True,
-        notebook=False
+        notebook=False,
+        cdn_resources="remote"
     )
 
-    # Physics tuning for large graphs
-    net.barnes_hut(
-        gravity=-8000,
-        central_gravity=0.3,
-        spring_length=120,
-        spring_strength=0.01,
-        damping=0.09
-    )
-
-    # Must be valid JSON
+    # Positions come from the server-side layout, so physics stays off
     net.set_options("""
     {
       "physics": {
-        "stabilization": true
+        "enabled": false
       },
       "edges": {
         "width": 0.5,
@@ -55,95 +118,146 @@ def generate_interactive_graph(G, suspicious_accounts, fraud_rings):
     }
     """)
 
-    suspicious_set = {acc["account_id"] for acc in suspicious_accounts}
+    ring_colors = {
+        ring["ring_id"]: RING_COLORS[i % len(RING_COLORS)]
+        for i, ring in enumerate(view["fraud_rings"])
+    }
+
+    nodes = view["nodes"]
 
-    # Add nodes
-    for node in G.nodes():
+    # Add nodes (ids are view positions; pyvis scans ids linearly)
+    for i, (account, x, y, score, is_suspicious, ring_id, hidden) in enumerate(
+        zip(
+            nodes["id"],
+            nodes["x"].tolist(),
+            nodes["y"].tolist(),
+            nodes["score"],
+            nodes["suspicious"],
+            nodes["ring_id"],
+            nodes["hidden_degree"].tolist(),
+        )
+    ):
 
-        is_suspicious = node in suspicious_set
+        if is_suspicious:
+            color = "red"
+        else:
+            color = ring_colors.get(ring_id, "#A9CCE3")
 
         net.add_node(
-            node,
+            i,
             label="",
+            x=x,
+            y=y,
+            physics=False,
             shape="star" if is_suspicious else "dot",
-            color="red" if is_suspicious else "#A9CCE3",
+            color=color,
             size=28 if is_suspicious else 10,
-            borderWidth=4 if is_suspicious else 1,
+            borderWidth=5 if is_suspicious and ring_id else 1,
             title=(
-                f"<b>{node}</b><br>"
+                f"<b>{account}</b><br>"
                 f"{'Suspicious Account' if is_suspicious else 'Normal Account'}"
+                + (f"<br>Score: {score}" if is_suspicious else "")
+                + (f"<br>Ring: {ring_id}" if ring_id else "")
+                + (f"<br>{hidden} neighbours not shown" if hidden else "")
             )
         )
 
     # Add edges
-    for source, target, data in G.edges(data=True):
+    edges = view["edges"]
+    for source, target, amount, count in zip(
+        edges["source"].tolist(),
+        edges["target"].tolist(),
+        edges["amount"].tolist(),
+        edges["count"].tolist(),
+    ):
         net.add_edge(
             source,
             target,
-            title=(
-                f"Amount: {data.get('amount')}<br>"
-                f"Txn: {data.get('transaction_id')}"
-            )
+            title=f"Amount: {amount}<br>Transactions: {count}"
         )
 
-    # Highlight fraud rings
-    ring_colors = [
-        "#FF5733", "#33FF57", "#3357FF",
-        "#F1C40F", "#9B59B6", "#E67E22"
-    ]
+    return net
 
-    for i, ring in enumerate(fraud_rings):
-        color = ring_colors[i % len(ring_colors)]
 
-        for acc in ring["member_accounts"]:
-            if acc in net.node_ids:
-                node_data = net.get_node(acc)
+def _summary_html(summary):
+    return (
+        f"<p>Showing {summary['shown_accounts']} of {summary['total_accounts']} accounts "
+        f"({summary['hops']}-hop neighbourhood of fraud rings"
+        f"{', truncated' if summary['truncated'] else ''}). "
+        f"{summary['hidden_accounts']} accounts, {summary['hidden_edges']} links and "
+        f"{summary['hidden_transactions']} transactions are not drawn.</p>"
+    )
 
-                if acc in suspicious_set:
-                    node_data["borderWidth"] = 5
-                    node_data["borderWidthSelected"] = 6
-                else:
-                    node_data["color"] = color
 
-    return net
+def _view_key(file, kind, hops, max_nodes):
+    # Names the analysis defaults the way /upload names its settings, read
+    # at call time like the cache fingerprint
+    analysis = "+".join(config.DEFAULT_DETECTORS)
+    if config.CONSOLIDATE_RINGS:
+        analysis += "-networks"
+    if config.PRUNE_HUBS:
+        analysis += "-pruned"
+    return cache_key(hash_upload(file), f"{kind}-{analysis}-{hops}-{max_nodes}")
 
 
-@router.post("/visualize", response_class=HTMLResponse)
-async def visualize_csv(file: UploadFile = File(...)):
+def _analyze_upload(file, hops, max_nodes, recorder):
+    if hops < 0 or max_nodes < 1:
+        raise HTTPException(status_code=400, detail="hops must be >= 0 and max_nodes >= 1")
 
-    df = parse_csv(file)
-    G = build_graph(df)
+    start_time = time.time()
 
-    cycles = detect_cycles(G)
-    smurfing = detect_smurfing(df)
-    shells = detect_shells(G)
+    try:
+        df, G = load_transactions(file, recorder=recorder)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    suspicious_data = score_accounts(G, cycles, smurfing, shells)
+    return G, analyze(df, G, start_time=start_time, recorder=recorder)
 
-    response = format_response(
-        suspicious_data,
-        G,
-        0,
-        cycles=cycles,
-        smurfing=smurfing,
-        shells=shells,
-    )
 
-    net = generate_interactive_graph(
-        G,
-        response["suspicious_accounts"],
-        response["fraud_rings"]
-    )
+@router.post("/visualize", response_class=HTMLResponse)
+def visualize_csv(file: UploadFile = File(...), hops: int = VIS_HOPS, max_nodes: int = VIS_MAX_NODES):
 
-    net.save_graph("graph.html")
+    key = _view_key(file, "visualize", hops, max_nodes)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return HTMLResponse(content=cached)
 
-    with open("graph.html", "r", encoding="utf-8") as f:
-        graph_html = f.read()
+    recorder = StageRecorder()
+    G, response = _analyze_upload(file, hops, max_nodes, recorder)
+
+    recorder.stage("render")
+    view = build_view(G, response, hops, max_nodes)
+
+    # Rendered in memory (no shared graph.html between requests)
+    graph_html = generate_interactive_graph(view).generate_html()
 
     # Generate Fraud Ring Summary Table
     table_html = generate_ring_summary_table(response["fraud_rings"])
 
     # SAFELY append table after graph
-    full_html = graph_html + "<br><br>" + table_html
+    full_html = graph_html + _summary_html(view["summary"]) + "<br><br>" + table_html
+
+    content = full_html.encode("utf-8")
+    metrics.record("visualize", recorder.finish())
+    result_cache.put(key, content)
+
+    return HTMLResponse(content=content)
+
+
+@router.post("/visualize/data")
+def visualize_data(file: UploadFile = File(...), hops: int = VIS_HOPS, max_nodes: int = VIS_MAX_NODES):
+
+    key = _view_key(file, "visualize-data", hops, max_nodes)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return Response(content=cached, media_type=JSON_MEDIA_TYPE)
+
+    recorder = StageRecorder()
+    G, response = _analyze_upload(file, hops, max_nodes, recorder)
+
+    recorder.stage("render")
+    content = encode_json(build_view(G, response, hops, max_nodes))
+    metrics.record("visualize_data", recorder.finish())
+    result_cache.put(key, content)
 
-    return HTMLResponse(content=full_html)
+    return Response(content=content, media_type=JSON_MEDIA_TYPE)
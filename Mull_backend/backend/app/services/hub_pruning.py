@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+from ..config import (
+    HUB_DEGREE_PERCENTILE,
+    HUB_VOLUME_PERCENTILE,
+    HUB_MIN_DEGREE,
+    HUB_ALLOWLIST_PATH,
+)
+from .graph_builder import TransactionGraph, concat_ranges
+
+
+def load_allowlist(path=HUB_ALLOWLIST_PATH):
+    # One account ID per line; blank lines and "#" comments are skipped
+    if not path:
+        return set()
+
+    with open(path, encoding="utf-8") as f:
+        lines = (line.split("#", 1)[0].strip() for line in f)
+        return {line for line in lines if line}
+
+
+def hub_accounts(
+    G,
+    degree_percentile=HUB_DEGREE_PERCENTILE,
+    volume_percentile=HUB_VOLUME_PERCENTILE,
+    min_degree=HUB_MIN_DEGREE,
+):
+    """
+    Boolean mask of hub accounts: at least `min_degree` counterparties
+    (edges in either direction) and in the top percentiles by
+    counterparties or by amount sent plus received.
+    """
+
+    n = G.number_of_nodes()
+    if not n:
+        return np.zeros(0, dtype=bool)
+
+    degree = G.degree()
+    volume = np.bincount(G.edge_sources, weights=G.edge_amount, minlength=n) + np.bincount(
+        G.indices, weights=G.edge_amount, minlength=n
+    )
+
+    return (degree >= min_degree) & (
+        (degree >= np.percentile(degree, degree_percentile))
+        | (volume >= np.percentile(volume, volume_percentile))
+    )
+
+
+def without_accounts(G, drop):
+    """
+    G without the edges (and transactions) touching accounts where `drop`
+    is set. Accounts keep their indices, so findings on the result need no
+    translation; dropped accounts are simply isolated.
+    """
+
+    n = G.number_of_nodes()
+    sources = G.edge_sources
+    kept = np.flatnonzero(~(drop[sources] | drop[G.indices]))
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources[kept], minlength=n), out=indptr[1:])
+
+    counts = G.edge_count[kept]
+    txn_indptr = np.zeros(len(kept) + 1, dtype=np.int64)
+    np.cumsum(counts, out=txn_indptr[1:])
+    rows = concat_ranges(G.txn_indptr[kept], G.txn_indptr[kept + 1])
+
+    return TransactionGraph(
+        accounts=G.accounts,
+        indptr=indptr,
+        indices=G.indices[kept],
+        edge_count=counts,
+        edge_amount=G.edge_amount[kept],
+        edge_first_ts=G.edge_first_ts[kept],
+        edge_last_ts=G.edge_last_ts[kept],
+        txn_indptr=txn_indptr,
+        txn_ids=G.txn_ids[rows],
+        txn_amounts=G.txn_amounts[rows],
+        txn_timestamps=G.txn_timestamps[rows],
+    )
+
+
+def prune_hubs(G, allowlist=None):
+    """
+    Graph for the detectors registered with prune_hubs: G without hub
+    accounts' edges nor those of allowlisted accounts (default: the
+    HUB_ALLOWLIST_PATH file). Returns (pruned graph, report).
+    """
+
+    if allowlist is None:
+        allowlist = load_allowlist()
+
+    hubs = hub_accounts(G)
+
+    allowed = np.zeros(G.number_of_nodes(), dtype=bool)
+    if allowlist:
+        positions = pd.Index(G.accounts).get_indexer(list(allowlist))
+        allowed[positions[positions >= 0]] = True
+
+    drop = hubs | allowed
+    pruned = without_accounts(G, drop)
+
+    return pruned, {
+        "hubs": int(hubs.sum()),
+        "allowlisted": int(allowed.sum()),
+        "nodes_pruned": int(drop.sum()),
+        "edges_pruned": G.number_of_edges() - pruned.number_of_edges(),
+        "transactions_pruned": len(G.txn_ids) - len(pruned.txn_ids),
+    }
@@ -0,0 +1,230 @@
+import os
+
+import pandas as pd
+
+from ..config import CSV_CHUNK_SIZE
+from .csv_parser import (
+    REQUIRED_COLUMNS,
+    parse_csv,
+    iter_csv_chunks,
+    _stream,
+    _validate_columns,
+    _parse_timestamps,
+)
+
+# Leading bytes of each binary input; anything else is read as plain CSV
+MAGIC_BYTES = [
+    (b"PAR1", "parquet"),
+    (b"ARROW1", "arrow"),  # Feather v2 / Arrow IPC file
+    (b"\xff\xff\xff\xff", "arrow_stream"),  # Arrow IPC stream
+    (b"\x1f\x8b", "gzip"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+]
+
+COMPRESSED_CSV = ["gzip", "zstd"]
+
+
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def detect_format(file):
+    """
+    Input format of an upload or local path from its magic bytes:
+    "parquet", "arrow", "arrow_stream", "gzip", "zstd" (compressed CSV)
+    or "csv". File objects are left at their current position.
+    """
+
+    source = _stream(file)
+
+    if _is_path(source):
+        with open(source, "rb") as f:
+            head = f.read(8)
+    else:
+        position = source.tell()
+        head = source.read(8)
+        source.seek(position)
+
+    for magic, fmt in MAGIC_BYTES:
+        if head.startswith(magic):
+            return fmt
+
+    return "csv"
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("Parquet, Arrow and compressed CSV input require the pyarrow package") from exc
+    return pa
+
+
+# -------------------------
+# Parquet / Arrow IPC (only REQUIRED_COLUMNS are read; local files are
+# memory-mapped)
+# -------------------------
+def _sliced(batch, size):
+    for offset in range(0, batch.num_rows, size):
+        yield batch.slice(offset, size)
+
+
+def _open_table(source, fmt):
+    # Returns (schema, read_all, iter_batches(chunksize)) for a binary input
+    pa = _pyarrow()
+
+    if fmt == "parquet":
+        parquet = pa.parquet.ParquetFile(source, memory_map=_is_path(source))
+        return (
+            parquet.schema_arrow,
+            lambda: parquet.read(columns=REQUIRED_COLUMNS),
+            lambda size: parquet.iter_batches(batch_size=size, columns=REQUIRED_COLUMNS),
+        )
+
+    if _is_path(source):
+        source = pa.memory_map(source)
+
+    if fmt == "arrow":
+        schema = pa.ipc.open_file(source).schema
+        _validate_columns(schema.names)
+
+        options = pa.ipc.IpcReadOptions(
+            included_fields=[schema.get_field_index(col) for col in REQUIRED_COLUMNS]
+        )
+        reader = pa.ipc.open_file(source, options=options)
+
+        def batches(size):
+            for i in range(reader.num_record_batches):
+                yield from _sliced(reader.get_batch(i), size)
+
+        return schema, reader.read_all, batches
+
+    reader = pa.ipc.open_stream(source)
+
+    def stream_batches(size):
+        for batch in reader:
+            yield from _sliced(batch.select(REQUIRED_COLUMNS), size)
+
+    return reader.schema, lambda: reader.read_all().select(REQUIRED_COLUMNS), stream_batches
+
+
+def _arrow_frame(table, compact=False):
+    """
+    DataFrame with the columns of parse_csv: string transaction IDs, float
+    amounts and datetime64 timestamps. Account IDs are dictionary-encoded
+    in Arrow, so no Python string is created per row. Timestamps that are
+    already typed in Arrow are used as they are; only string timestamps go
+    through pd.to_datetime. `compact` (chunked mode) keeps float32 amounts,
+    like the pyarrow CSV chunks.
+    """
+
+    pa = _pyarrow()
+    columns = {}
+
+    for col in ("transaction_id", "sender_id", "receiver_id"):
+        values = table.column(col)
+        if pa.types.is_dictionary(values.type):
+            values = values.cast(values.type.value_type)
+        if values.null_count and col != "transaction_id":
+            raise ValueError("Missing account IDs in input")
+        values = values.cast(pa.string())
+        if col != "transaction_id":
+            values = values.dictionary_encode()
+        columns[col] = values
+
+    columns["amount"] = table.column("amount").cast(pa.float32() if compact else pa.float64())
+
+    timestamps = table.column("timestamp")
+    if pa.types.is_timestamp(timestamps.type) or pa.types.is_date(timestamps.type):
+        if timestamps.null_count:
+            raise ValueError("Invalid timestamp values in input")
+        # Time zone aware values become naive UTC, like the CSV path
+        columns["timestamp"] = timestamps.cast(pa.timestamp("ns"))
+    else:
+        columns["timestamp"] = timestamps.cast(pa.string())
+
+    df = pa.table(columns).to_pandas()
+
+    if not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+        df["timestamp"] = _parse_timestamps(df["timestamp"])
+
+    return df
+
+
+def _invalid(fmt, exc):
+    return ValueError(f"Invalid or empty {fmt} file: {exc}")
+
+
+def _compressed(source, fmt):
+    pa = _pyarrow()
+    if _is_path(source):
+        return pa.input_stream(source, compression=fmt)
+    return pa.CompressedInputStream(pa.PythonFile(source, mode="r"), fmt)
+
+
+# -------------------------
+# Entry points
+# -------------------------
+def read_transactions(file):
+    """
+    parse_csv for any supported input: plain, gzip or zstd CSV, Parquet,
+    or Feather/Arrow IPC, detected from the content. `file` is an upload
+    or a local path (binary formats are then memory-mapped).
+    """
+
+    fmt = detect_format(file)
+    source = _stream(file)
+
+    if fmt == "csv":
+        return parse_csv(file)
+
+    if fmt in COMPRESSED_CSV:
+        pa = _pyarrow()
+        try:
+            return parse_csv(_compressed(source, fmt))
+        except (OSError, pa.ArrowInvalid) as exc:
+            raise _invalid(fmt, exc) from exc
+
+    pa = _pyarrow()
+    try:
+        schema, read_all, _ = _open_table(source, fmt)
+        _validate_columns(schema.names)
+        return _arrow_frame(read_all())
+    except (OSError, pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+        raise _invalid(fmt, exc) from exc
+
+
+def iter_transaction_chunks(file, chunksize=None, exact_amounts=False):
+    """
+    iter_csv_chunks for any input read_transactions accepts. Binary formats
+    are read batch by batch (at most `chunksize` rows each).
+    """
+
+    chunksize = chunksize or CSV_CHUNK_SIZE
+    fmt = detect_format(file)
+    source = _stream(file)
+
+    if fmt == "csv":
+        yield from iter_csv_chunks(file, chunksize, exact_amounts=exact_amounts)
+        return
+
+    pa = _pyarrow()
+
+    if fmt in COMPRESSED_CSV:
+        try:
+            yield from iter_csv_chunks(_compressed(source, fmt), chunksize, exact_amounts=exact_amounts)
+        except (OSError, pa.ArrowInvalid) as exc:
+            raise _invalid(fmt, exc) from exc
+        return
+
+    try:
+        schema, _, batches = _open_table(source, fmt)
+        _validate_columns(schema.names)
+
+        for batch in batches(chunksize):
+            yield _arrow_frame(pa.Table.from_batches([batch]), compact=not exact_amounts)
+
+    except (OSError, pa.ArrowInvalid, pa.ArrowNotImplementedError) as exc:
+        raise _invalid(fmt, exc) from exc
@@ -0,0 +1,232 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ..config import JOB_WORKERS, JOB_QUEUE_DEPTH, JOB_RESULT_TTL_SECONDS, METRICS_IN_SUMMARY
+from .pipeline import STAGES, run_file
+from .metrics import StageRecorder, metrics
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _run_job(
+    job_id,
+    path,
+    chunked,
+    progress,
+    detectors=None,
+    budget=None,
+    consolidate=None,
+    prune_hubs=None,
+):
+    # Runs inside a pool process: report each stage through the shared dict.
+    # Returns (response, stage report); the parent publishes the report.
+
+    def on_stage(stage):
+        progress[job_id] = stage
+
+    recorder = StageRecorder()
+
+    # A path, so Parquet/Arrow spools are memory-mapped. The job pool is
+    # already one process per job; a detector pool per job on top of it
+    # would oversubscribe the CPUs.
+    response = run_file(
+        path,
+        chunked=chunked,
+        on_stage=on_stage,
+        detectors=detectors,
+        budget=budget,
+        recorder=recorder,
+        parallel=False,
+        consolidate=consolidate,
+        prune_hubs=prune_hubs,
+    )
+
+    report = recorder.finish()
+    if METRICS_IN_SUMMARY:
+        response["summary"].update(report)
+
+    return response, report
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _job_finished(job, path, future):
+    # Every end state (done, failed, cancelled, worker died) drops the spool
+    job["finished_at"] = time.time()
+    _discard(path)
+
+    if not future.cancelled() and future.exception() is None:
+        metrics.record("jobs", future.result()[1])
+
+
+class JobManager:
+    """
+    Runs uploaded analyses in a process pool (the detectors are CPU-bound
+    and would otherwise hold the event loop and the GIL).
+
+    At most `queue_depth` jobs may be queued or running at once; finished
+    jobs are kept for `ttl` seconds so their result can be fetched.
+
+    submit() takes ownership of the spooled upload at `path`: it is removed
+    when the job ends, however it ends, or at once if the job is rejected.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, queue_depth=JOB_QUEUE_DEPTH, ttl=JOB_RESULT_TTL_SECONDS):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._executor = None
+        self._manager = None
+        self._progress = None
+
+    def _ensure_pool(self):
+        context = multiprocessing.get_context("spawn")
+        if self._manager is None:
+            self._manager = context.Manager()
+            self._progress = self._manager.dict(self._progress or {})
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context
+            )
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job["finished_at"] and now - job["finished_at"] > self.ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._progress.pop(job_id, None)
+
+    def active_count(self):
+        return sum(1 for job in self._jobs.values() if not job["future"].done())
+
+    def is_saturated(self):
+        with self._lock:
+            return self.active_count() >= self.queue_depth
+
+    def submit(
+        self, path, chunked=False, detectors=None, budget=None, consolidate=None, prune_hubs=None
+    ):
+        queued = False
+
+        try:
+            with self._lock:
+                self._ensure_pool()
+                self._purge_expired()
+
+                if self.active_count() >= self.queue_depth:
+                    raise QueueFullError("Analysis queue is full, retry later")
+
+                job_id = uuid.uuid4().hex
+                job = {
+                    "future": None,
+                    "submitted_at": time.time(),
+                    "finished_at": None,
+                }
+
+                try:
+                    future = self._executor.submit(
+                        _run_job,
+                        job_id,
+                        path,
+                        chunked,
+                        self._progress,
+                        detectors,
+                        budget,
+                        consolidate,
+                        prune_hubs,
+                    )
+                except BrokenProcessPool:
+                    # A worker died: the next submit starts a fresh pool
+                    self._executor = None
+                    raise
+
+                # Registered only once it is really queued
+                job["future"] = future
+                self._jobs[job_id] = job
+                future.add_done_callback(lambda f: _job_finished(job, path, f))
+                queued = True
+        finally:
+            if not queued:
+                _discard(path)
+
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def result(self, job_id):
+        # Analysis response of a finished, successful job
+        response, _ = self.get(job_id)["future"].result()
+        return response
+
+    def status(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+
+        future = job["future"]
+        stage = self._progress.get(job_id)
+
+        if not future.done():
+            state = "running" if stage else "queued"
+            completed = STAGES.index(stage) if stage else 0
+        elif future.cancelled():
+            # Dropped from the queue by shutdown()
+            state = "cancelled"
+            completed = STAGES.index(stage) if stage else 0
+        elif future.exception() is None:
+            state, completed = "completed", len(STAGES)
+        else:
+            state = "failed"
+            completed = STAGES.index(stage) if stage else 0
+
+        status = {
+            "job_id": job_id,
+            "status": state,
+            "stage": stage,
+            "progress": {
+                "completed_stages": completed,
+                "total_stages": len(STAGES),
+                "stages": STAGES,
+            },
+            "submitted_at": job["submitted_at"],
+            "finished_at": job["finished_at"],
+        }
+
+        if state == "failed":
+            status["error"] = str(future.exception())
+
+        return status
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            # Keep the last reported stages readable for status()
+            self._progress = dict(self._progress)
+            self._manager.shutdown()
+            self._manager = None
+
+
+job_manager = JobManager()
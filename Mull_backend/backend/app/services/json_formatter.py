@@ -1,72 +1,101 @@
-﻿from .ring_manager import generate_rings
+﻿import numpy as np
 
+RING_DETAIL_FIELDS = [
+    "amount_retained",
+    "retention_ratio",
+    "patterns",
+    "window_start",
+    "window_end",
+    "windows",
+]
 
-def format_response(scores, G, processing_time, cycles=None, smurfing=None, shells=None):
 
-    cycles = cycles or []
-    smurfing = smurfing or []
-    shells = shells or []
+def _ring_details(ring):
+    # Detector extras, e.g. amount retained by a temporal cycle, and the
+    # constituent patterns of a consolidated network or the time windows
+    # that found a ring in windowed analysis
+    return {key: ring[key] for key in RING_DETAIL_FIELDS if key in ring}
 
-    rings = generate_rings(cycles, smurfing, shells)
 
-    suspicious_accounts = []
-    fraud_rings = []
+def ring_record(ring, accounts):
+    # A ring_manager ring with its member indices translated to account IDs
+    return {
+        "ring_id": ring["ring_id"],
+        "member_accounts": accounts[ring["members"]].tolist(),
+        "pattern_type": ring["pattern_type"],
+        **_ring_details(ring),
+    }
+
+
+def format_response(scores, G, processing_time, detector_timings=None, rings=None):
+    # scores: scoring_engine.AccountScores; rings: ring_manager rings, whose
+    # member indices are translated to account IDs only here
+
+    rings = rings or []
 
     # -------------------------
-    # Map account -> ring
+    # Ring membership as flat arrays: member -> ring number, and each
+    # account's last ring (ring numbers only increase along `members`)
     # -------------------------
-    account_ring_map = {}
-    for ring in rings:
-        for acc in ring["member_accounts"]:
-            account_ring_map[acc] = ring["ring_id"]
+    sizes = [len(ring["members"]) for ring in rings]
+    members = (
+        np.concatenate([ring["members"] for ring in rings])
+        if rings
+        else np.empty(0, dtype=np.int64)
+    )
+    ring_of = np.repeat(np.arange(len(rings)), sizes)
+
+    account_ring = np.full(len(scores.score), -1, dtype=np.int64)
+    np.maximum.at(account_ring, members, ring_of)
 
     # -------------------------
     # Build suspicious accounts
     # -------------------------
-    for acc, data in scores.items():
-
-        if data["score"] > 0 and acc in account_ring_map:
-
-            explanation = "Flagged due to: " + ", ".join(sorted(data["patterns"]))
-
-            suspicious_accounts.append(
-                {
-                    "account_id": acc,
-                    "suspicion_score": float(round(data["score"], 2)),
-                    "detected_patterns": list(data["patterns"]),
-                    "ring_id": account_ring_map[acc],
-                    "explanation": explanation
-                }
-            )
-
-    # Sort descending (MANDATORY)
-    suspicious_accounts.sort(
-        key=lambda x: x["suspicion_score"],
-        reverse=True
-    )
+    flagged = np.flatnonzero((scores.score > 0) & (account_ring >= 0))
+
+    # Sort descending (MANDATORY); stable, so ties keep account order
+    flagged = flagged[np.argsort(-scores.score[flagged], kind="stable")]
+
+    suspicious_accounts = []
+    for acc, score, mask, ring in zip(
+        scores.accounts[flagged].tolist(),
+        scores.score[flagged].tolist(),
+        scores.patterns[flagged].tolist(),
+        account_ring[flagged].tolist(),
+    ):
+        patterns = scores.pattern_names(mask)
+
+        suspicious_accounts.append(
+            {
+                "account_id": acc,
+                "suspicion_score": float(round(score, 2)),
+                "detected_patterns": list(patterns),
+                "ring_id": rings[ring]["ring_id"],
+                "explanation": "Flagged due to: " + ", ".join(patterns)
+            }
+        )
 
     # -------------------------
-    # Build fraud ring objects (Dynamic Risk Score)
+    # Build fraud ring objects (Dynamic Risk Score: mean member score)
     # -------------------------
-    for ring in rings:
+    totals = np.bincount(ring_of, weights=scores.score[members], minlength=len(rings))
+    counts = np.bincount(ring_of, minlength=len(rings))
+
+    member_accounts = scores.accounts[members].tolist()
+    bounds = np.cumsum([0] + sizes).tolist()
 
-        member_scores = [
-            scores[acc]["score"]
-            for acc in ring["member_accounts"]
-            if acc in scores
-        ]
+    fraud_rings = []
+    for i, (ring, total, count) in enumerate(zip(rings, totals.tolist(), counts.tolist())):
 
-        if member_scores:
-            risk_score = round(sum(member_scores) / len(member_scores), 2)
-        else:
-            risk_score = 0.0
+        risk_score = round(total / count, 2) if count else 0.0
 
         fraud_rings.append(
             {
                 "ring_id": ring["ring_id"],
-                "member_accounts": ring["member_accounts"],
+                "member_accounts": member_accounts[bounds[i]:bounds[i + 1]],
                 "pattern_type": ring["pattern_type"],
                 "risk_score": float(risk_score),
+                **_ring_details(ring),
             }
         )
 
@@ -80,6 +109,9 @@ def format_response(scores, G, processing_time, cycles=None, smurfing=None, shel
         "processing_time_seconds": round(processing_time, 2),
     }
 
+    if detector_timings is not None:
+        summary["detector_timings"] = detector_timings
+
     return {
         "suspicious_accounts": suspicious_accounts,
         "fraud_rings": fraud_rings,
@@ -0,0 +1,181 @@
+import threading
+import time
+
+# Upper bounds (seconds) of the stage duration histogram buckets
+STAGE_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+# name -> (Prometheus type, help text)
+METRICS = {
+    "mull_analyses_total": ("counter", "Completed analyses by endpoint"),
+    "mull_stage_seconds": ("histogram", "Wall time of each pipeline stage"),
+    "mull_stage_cpu_seconds_total": ("counter", "CPU time of the request thread per stage (excludes detector worker processes)"),
+    "mull_stage_peak_rss_bytes": ("gauge", "Peak process RSS during the most recent run of each stage"),
+    "mull_transactions_total": ("counter", "Transactions analysed"),
+    "mull_accounts_total": ("counter", "Accounts analysed"),
+    "mull_edges_total": ("counter", "Distinct sender -> receiver links analysed"),
+    "mull_findings_total": ("counter", "Detector findings before ring de-duplication"),
+    "mull_rings_total": ("counter", "Fraud rings reported"),
+    "mull_cache_lookups_total": ("counter", "Result cache lookups by outcome"),
+    "mull_cache_evictions_total": ("counter", "Result cache memory-tier evictions"),
+    "mull_cache_entries": ("gauge", "Result cache memory-tier entries"),
+    "mull_cache_bytes": ("gauge", "Result cache memory-tier size"),
+    "mull_jobs_active": ("gauge", "Background jobs queued or running"),
+    "mull_jobs_queue_limit": ("gauge", "Jobs allowed at once before /jobs answers 429"),
+    "mull_sessions_open": ("gauge", "Open incremental analysis sessions"),
+    "mull_analysis_store_entries": ("gauge", "Analyses kept for paging and account lookups"),
+    "mull_analysis_store_bytes": ("gauge", "Approximate size of the kept analyses"),
+    "mull_process_resident_bytes": ("gauge", "Current process RSS"),
+}
+
+
+# -------------------------
+# Process memory (Linux /proc; None elsewhere)
+# -------------------------
+def _status_bytes(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def resident_bytes():
+    return _status_bytes("VmRSS")
+
+
+def _reset_peak_rss():
+    # Restart VmHWM from the current RSS so the next reading is one stage's
+    # peak. The mark is process-wide: concurrent requests share it.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+class StageRecorder:
+    """
+    Times one analysis: `stage(name)` closes the previous stage and opens
+    the next (pass it as a pipeline on_stage callback), `count()` adds
+    totals, and `finish()` returns
+    {"stages": {name: {wall_seconds, cpu_seconds, peak_rss_mib}}, "counts": {...}}.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.counts = {}
+        self._current = None
+
+    def stage(self, name):
+        self._close()
+        _reset_peak_rss()
+        self._current = (name, time.perf_counter(), time.thread_time())
+
+    def count(self, **counts):
+        self.counts.update(counts)
+
+    def _close(self):
+        if self._current is None:
+            return
+
+        name, wall, cpu = self._current
+        peak = _status_bytes("VmHWM")
+
+        self.stages[name] = {
+            "wall_seconds": round(time.perf_counter() - wall, 4),
+            "cpu_seconds": round(time.thread_time() - cpu, 4),
+            "peak_rss_mib": round(peak / 2**20, 1) if peak else None,
+        }
+        self._current = None
+
+    def finish(self):
+        self._close()
+        return {"stages": dict(self.stages), "counts": dict(self.counts)}
+
+
+class Metrics:
+    """
+    In-process metric store rendered in the Prometheus text format.
+    Values are keyed by (name, sorted label pairs).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            buckets, total, count = self._histograms.get(key, ([0] * len(STAGE_BUCKETS), 0.0, 0))
+            buckets = [n + (value <= bound) for n, bound in zip(buckets, STAGE_BUCKETS)]
+            self._histograms[key] = (buckets, total + value, count + 1)
+
+    def record(self, endpoint, report):
+        # Publish a StageRecorder report
+        self.inc("mull_analyses_total", endpoint=endpoint)
+
+        for stage, timing in report["stages"].items():
+            self.observe("mull_stage_seconds", timing["wall_seconds"], stage=stage)
+            self.inc("mull_stage_cpu_seconds_total", timing["cpu_seconds"], stage=stage)
+            if timing["peak_rss_mib"] is not None:
+                self.set("mull_stage_peak_rss_bytes", int(timing["peak_rss_mib"] * 2**20), stage=stage)
+
+        counts = report["counts"]
+        for name in ("transactions", "accounts", "edges", "rings"):
+            if name in counts:
+                self.inc(f"mull_{name}_total", counts[name])
+        for detector, found in counts.get("findings", {}).items():
+            self.inc("mull_findings_total", found, detector=detector)
+
+    def render(self):
+        with self._lock:
+            values = dict(self._values)
+            histograms = dict(self._histograms)
+
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            series = [(labels, v) for (n, labels), v in values.items() if n == name]
+            hists = [(labels, h) for (n, labels), h in histograms.items() if n == name]
+            if not series and not hists:
+                continue
+
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+            for labels, value in sorted(series):
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+            for labels, (buckets, total, count) in sorted(hists):
+                for bound, n in zip(STAGE_BUCKETS, buckets):
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {n}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _number(value):
+    return round(value, 6) if isinstance(value, float) else value
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+metrics = Metrics()
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+from ..config import (
+    PASS_THROUGH_WINDOW_HOURS,
+    PASS_THROUGH_MIN_RATIO,
+    PASS_THROUGH_MIN_EVENTS,
+)
+
+
+def _peer_groups(accounts, peers):
+    # {account: sorted unique peers} from parallel code arrays
+    if len(accounts) == 0:
+        return {}
+
+    pairs = np.unique(np.stack((accounts, peers)), axis=1)
+    starts = np.flatnonzero(np.append(True, pairs[0][1:] != pairs[0][:-1]))
+
+    return {
+        int(pairs[0][start]): group
+        for start, group in zip(starts, np.split(pairs[1], starts[1:]))
+    }
+
+
+def pass_through_accounts(
+    sender_codes,
+    receiver_codes,
+    timestamps,
+    amounts,
+    window_hours=PASS_THROUGH_WINDOW_HOURS,
+    min_ratio=PASS_THROUGH_MIN_RATIO,
+    min_events=PASS_THROUGH_MIN_EVENTS,
+):
+    """
+    Accounts that repeatedly forward what they receive: an incoming
+    transfer whose receiver's next outgoing transfer follows within
+    `window_hours` and moves between min_ratio and 100% of the amount is
+    one pass-through event. Returns {account_code: sorted array of the
+    senders and receivers involved} for accounts with >= min_events.
+    """
+
+    sender_codes = np.asarray(sender_codes, dtype=np.int64)
+    receiver_codes = np.asarray(receiver_codes, dtype=np.int64)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+
+    if len(sender_codes) == 0:
+        return {}
+
+    # Outgoing transfers sorted by (sender, time); dense timestamp ranks
+    # pack (account, rank) into one sortable int64
+    uniq_ts = np.unique(timestamps)
+    stride = len(uniq_ts) + 1
+    rank = np.searchsorted(uniq_ts, timestamps)
+
+    out_order = np.lexsort((timestamps, sender_codes))
+    out_keys = sender_codes[out_order] * stride + rank[out_order]
+
+    # Each incoming transfer -> the receiver's first outgoing one at or after it
+    nxt = np.searchsorted(out_keys, receiver_codes * stride + rank, side="left")
+    found = nxt < len(out_keys)
+    nxt = out_order[np.minimum(nxt, len(out_keys) - 1)]
+
+    window_ns = int(pd.Timedelta(hours=window_hours).value)
+    event = (
+        found
+        & (sender_codes[nxt] == receiver_codes)
+        & (timestamps[nxt] - timestamps <= window_ns)
+        & (amounts[nxt] <= amounts)
+        & (amounts[nxt] >= amounts * min_ratio)
+        & (receiver_codes[nxt] != receiver_codes)
+    )
+
+    account = receiver_codes[event]
+    upstream = sender_codes[event]
+    downstream = receiver_codes[nxt[event]]
+
+    accounts, counts = np.unique(account, return_counts=True)
+    keep = np.isin(account, accounts[counts >= min_events])
+
+    groups = _peer_groups(
+        np.concatenate((account[keep], account[keep])),
+        np.concatenate((upstream[keep], downstream[keep])),
+    )
+
+    return {
+        acc: peers[peers != acc]
+        for acc, peers in groups.items()
+    }
@@ -0,0 +1,278 @@
+import time
+
+from ..config import CONSOLIDATE_RINGS, PRUNE_HUBS
+
+from .input_reader import read_transactions, iter_transaction_chunks
+from .graph_builder import build_graph, build_graph_from_chunks
+from .detection_orchestrator import detect, run_detector
+from .detector_registry import resolve_detectors, budget_deadline
+from .hub_pruning import prune_hubs as prune_graph
+from .scoring_engine import score_accounts
+from .ring_manager import RingAssigner, rings_from_findings, consolidate_rings
+from .json_formatter import format_response, ring_record
+
+# Pipeline stages, in execution order (used for progress reporting)
+STAGES = [
+    "parse",
+    "build_graph",
+    "detection",
+    "scoring",
+    "format",
+]
+
+
+def _noop(stage):
+    pass
+
+
+def stage_callback(on_stage, recorder):
+    # One callback for progress reporting and StageRecorder timing
+    if recorder is None:
+        return on_stage or _noop
+    if on_stage is None:
+        return recorder.stage
+
+    def both(stage):
+        on_stage(stage)
+        recorder.stage(stage)
+
+    return both
+
+
+def _count_findings(recorder, results):
+    if recorder is not None:
+        recorder.count(findings={detector.name: len(found) for detector, found in results})
+
+
+def count_response(recorder, df, G, response):
+    # Input and result sizes of a finished response, for StageRecorder
+    if recorder is not None:
+        recorder.count(
+            transactions=len(df),
+            accounts=G.number_of_nodes(),
+            edges=G.number_of_edges(),
+            suspicious_accounts=len(response["suspicious_accounts"]),
+            rings=len(response["fraud_rings"]),
+        )
+
+
+def load_transactions(file, chunked=False, on_stage=None, recorder=None):
+    """
+    Parse an upload (or local path) and build its graph. Returns (df, G).
+    CSV (plain, gzip or zstd), Parquet and Arrow IPC inputs are accepted.
+
+    Account IDs are interned once: df's account columns are categoricals
+    over G.accounts. In chunked mode the input is streamed straight into the
+    graph builder and df is the graph's compact transaction view.
+    """
+
+    on_stage = stage_callback(on_stage, recorder)
+
+    on_stage("parse")
+
+    if chunked:
+        G = build_graph_from_chunks(iter_transaction_chunks(file))
+        on_stage("build_graph")
+        return G.transactions(), G
+
+    df = read_transactions(file)
+
+    on_stage("build_graph")
+    G = build_graph(df, intern=True)
+
+    return df, G
+
+
+def final_rings(rings, consolidate):
+    # Detector rings, or the networks they form (default CONSOLIDATE_RINGS)
+    if consolidate is None:
+        consolidate = CONSOLIDATE_RINGS
+    return consolidate_rings(rings) if consolidate else rings
+
+
+def _pruned_graph(G, prune_hubs):
+    # (graph for prune_hubs detectors, report), or (None, None) when hub
+    # pruning is off (default PRUNE_HUBS)
+    if prune_hubs is None:
+        prune_hubs = PRUNE_HUBS
+    return prune_graph(G) if prune_hubs else (None, None)
+
+
+def _with_pruning(response, pruning):
+    if pruning is not None:
+        response["summary"]["hub_pruning"] = pruning
+    return response
+
+
+def with_timeouts(response, timed_out):
+    # Names detectors stopped at their deadline in the summary
+    if timed_out:
+        response["summary"]["detectors_timed_out"] = timed_out
+    return response
+
+
+def analyze(
+    df,
+    G,
+    start_time=None,
+    on_stage=None,
+    detectors=None,
+    budget=None,
+    recorder=None,
+    parallel=None,
+    consolidate=None,
+    prune_hubs=None,
+):
+    """
+    Run the registered `detectors` (names; default DEFAULT_DETECTORS) within
+    an optional time `budget`, score accounts and return the
+    format_response payload. A metrics.StageRecorder, when given, times
+    each stage and collects row/graph/finding counts. `parallel` overrides
+    the detection orchestrator's choice of process pool; `consolidate`
+    (default CONSOLIDATE_RINGS) merges overlapping rings into networks and
+    `prune_hubs` (default PRUNE_HUBS) drops hub accounts' edges before the
+    detectors registered with prune_hubs run.
+    """
+
+    on_stage = stage_callback(on_stage, recorder)
+    start_time = start_time or time.time()
+
+    # Detection modules (concurrently on large graphs)
+    on_stage("detection")
+    pruned, pruning = _pruned_graph(G, prune_hubs)
+    results, detector_timings, timed_out = detect(
+        G, df, resolve_detectors(detectors), budget, parallel, pruned
+    )
+    _count_findings(recorder, results)
+
+    # Scoring
+    on_stage("scoring")
+    suspicious_data = score_accounts(G, results)
+
+    # Format response
+    on_stage("format")
+    response = format_response(
+        suspicious_data,
+        G,
+        time.time() - start_time,
+        detector_timings=detector_timings,
+        rings=final_rings(rings_from_findings(results), consolidate),
+    )
+    count_response(recorder, df, G, response)
+
+    return with_timeouts(_with_pruning(response, pruning), timed_out)
+
+
+def run_file(
+    file,
+    chunked=False,
+    on_stage=None,
+    detectors=None,
+    budget=None,
+    recorder=None,
+    parallel=None,
+    consolidate=None,
+    prune_hubs=None,
+):
+    start_time = time.time()
+    df, G = load_transactions(file, chunked=chunked, on_stage=on_stage, recorder=recorder)
+    return analyze(
+        df,
+        G,
+        start_time=start_time,
+        on_stage=on_stage,
+        detectors=detectors,
+        budget=budget,
+        recorder=recorder,
+        parallel=parallel,
+        consolidate=consolidate,
+        prune_hubs=prune_hubs,
+    )
+
+
+def stream_analysis(
+    df,
+    G,
+    start_time=None,
+    detectors=None,
+    budget=None,
+    recorder=None,
+    consolidate=None,
+    prune_hubs=None,
+):
+    """
+    Generator form of analyze: yields event dicts as results appear. Each
+    ring is emitted as soon as its detector reports it; rings are numbered
+    in the same order as analyze, so the closing events match its payload.
+    `consolidate` and `prune_hubs` work as in analyze; only the closing
+    fraud_rings are consolidated.
+    Detectors run one after another (never on the worker pool), so
+    `budget` and the per-detector timeouts apply to every one of them.
+    """
+
+    on_stage = stage_callback(None, recorder)
+    start_time = start_time or time.time()
+    detectors = resolve_detectors(detectors)
+    budget_end = budget_deadline(budget)
+
+    assigner = RingAssigner()
+    results, timings, timed_out = [], {}, []
+
+    yield {
+        "event": "parsed",
+        "transactions": len(df),
+        "accounts": G.number_of_nodes(),
+        "edges": G.number_of_edges(),
+    }
+
+    on_stage("detection")
+    pruned, pruning = _pruned_graph(G, prune_hubs)
+
+    for detector in detectors:
+        start = time.perf_counter()
+        findings = []
+        graph = pruned if pruned is not None and detector.prune_hubs else G
+        inputs = {"graph": graph, "transactions": df}
+
+        for finding in run_detector(detector, inputs, budget_end, timed_out):
+            findings.append(finding)
+            members, _, details = finding
+
+            ring = assigner.add(members, detector.pattern_type, details)
+            if ring is not None:
+                yield {"event": "ring", "ring": ring_record(ring, G.accounts)}
+
+        results.append((detector, findings))
+        timings[detector.name] = round(time.perf_counter() - start, 3)
+        yield {
+            "event": "detector_finished",
+            "detector": detector.name,
+            "found": len(findings),
+            "seconds": timings[detector.name],
+            "timed_out": detector.name in timed_out,
+        }
+
+    _count_findings(recorder, results)
+
+    on_stage("scoring")
+    scores = score_accounts(G, results)
+
+    on_stage("format")
+    response = with_timeouts(
+        _with_pruning(
+            format_response(
+                scores,
+                G,
+                time.time() - start_time,
+                detector_timings=timings,
+                rings=final_rings(assigner.rings, consolidate),
+            ),
+            pruning,
+        ),
+        timed_out,
+    )
+    count_response(recorder, df, G, response)
+
+    yield {"event": "suspicious_accounts", "suspicious_accounts": response["suspicious_accounts"]}
+    yield {"event": "fraud_rings", "fraud_rings": response["fraud_rings"]}
+    yield {"event": "summary", "summary": response["summary"]}
@@ -0,0 +1,88 @@
+import orjson
+import pandas as pd
+
+from ..models.response_models import FinalResponse
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# ?transactions= values accepted by /upload
+TRANSACTION_MODES = ["all", "flagged", "none"]
+
+
+def wants_arrow(accept):
+    return ARROW_MEDIA_TYPE in (accept or "")
+
+
+def encode_json(payload):
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def encode_ndjson(events):
+    for event in events:
+        yield orjson.dumps(event, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+
+
+def validated_result(result):
+    # Fail loudly if the core result drifts from the published model
+    FinalResponse.model_validate(result)
+    return result
+
+
+def flagged_mask(df, flagged_accounts):
+    # Transactions sent or received by a flagged account
+    flagged = list(flagged_accounts)
+    return (df["sender_id"].isin(flagged) | df["receiver_id"].isin(flagged)).to_numpy()
+
+
+def select_transactions(df, mode, flagged_accounts):
+    if mode == "none":
+        return df.iloc[:0]
+    if mode == "flagged":
+        return df[flagged_mask(df, flagged_accounts)]
+    return df
+
+
+def transaction_records(df):
+    """
+    Row dicts as /upload has always returned them (timestamps as strings),
+    built column-wise instead of copying the frame.
+    """
+
+    columns = {
+        name: (
+            df[name].astype(str).tolist()
+            if name == "timestamp"
+            else df[name].tolist()
+        )
+        for name in df.columns
+    }
+    names = list(columns)
+
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def encode_arrow(result, df):
+    """
+    Arrow IPC stream of the transactions, with the core result (JSON) in
+    the schema metadata under "analysis".
+    """
+
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise RuntimeError("Arrow responses require the pyarrow package") from exc
+
+    frame = df.reset_index(drop=True)
+    if "timestamp" in frame.columns:
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"])
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.replace_schema_metadata({"analysis": encode_json(result)})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from .. import config
+from ..config import (
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_DIR,
+    RESULT_CACHE_DISK_MAX_BYTES,
+)
+from . import smurfing_detector
+
+# Bump when a code change alters results for unchanged settings
+CACHE_VERSION = 1
+
+# Settings that change analysis output (read at call time, so edits made
+# after import still invalidate old entries)
+RESULT_SETTINGS = [
+    "CYCLE_MIN_LENGTH",
+    "CYCLE_MAX_LENGTH",
+    "CYCLE_DETECTOR",
+    "CYCLE_WINDOW_HOURS",
+    "SMURFING_THRESHOLD",
+    "SHELL_MAX_DEGREE",
+    "SHELL_DETECTOR",
+    "SHELL_CHAIN_MAX_IN_DEGREE",
+    "SHELL_CHAIN_MAX_OUT_DEGREE",
+    "SHELL_CHAIN_MIN_INTERMEDIARIES",
+    "SHELL_CHAIN_MAX_INTERMEDIARIES",
+    "PASS_THROUGH_WINDOW_HOURS",
+    "PASS_THROUGH_MIN_RATIO",
+    "PASS_THROUGH_MIN_EVENTS",
+    "ROUND_AMOUNT_UNIT",
+    "ROUND_AMOUNT_MIN_TRANSFERS",
+    "ROUND_AMOUNT_MIN_SHARE",
+    "DEFAULT_DETECTORS",
+    "PRUNE_HUBS",
+    "HUB_DEGREE_PERCENTILE",
+    "HUB_VOLUME_PERCENTILE",
+    "HUB_MIN_DEGREE",
+    "HUB_ALLOWLIST_PATH",
+    "WEIGHT_CYCLE",
+    "WEIGHT_SMURFING",
+    "WEIGHT_SHELL",
+    "WEIGHT_PASS_THROUGH",
+    "WEIGHT_ROUND_AMOUNT",
+    "METRICS_IN_SUMMARY",
+    "MAX_SCORE",
+    "CONSOLIDATE_RINGS",
+    "RING_MERGE_MIN_SHARED",
+    "RING_MERGE_MIN_OVERLAP",
+    "TIMESTAMP_FORMAT",
+]
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def settings_fingerprint():
+    settings = {name: getattr(config, name) for name in RESULT_SETTINGS}
+    settings["SMURFING_WINDOW_HOURS"] = smurfing_detector.WINDOW_HOURS
+    settings["DOMINANT_SENDER_RATIO"] = smurfing_detector.DOMINANT_SENDER_RATIO
+    settings["CACHE_VERSION"] = CACHE_VERSION
+    # An edited hub allowlist changes results as well
+    if config.HUB_ALLOWLIST_PATH and os.path.exists(config.HUB_ALLOWLIST_PATH):
+        settings["HUB_ALLOWLIST_MTIME"] = os.path.getmtime(config.HUB_ALLOWLIST_PATH)
+
+    blob = json.dumps(settings, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def hash_upload(file):
+    """
+    SHA-256 of an upload's bytes. The stream is rewound afterwards so it
+    can still be parsed.
+    """
+
+    stream = getattr(file, "file", file)
+    digest = hashlib.sha256()
+
+    stream.seek(0)
+    for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    stream.seek(0)
+
+    return digest.hexdigest()
+
+
+def cache_key(content_hash, kind):
+    # kind names the cached rendering, e.g. "upload" or "visualize"
+    return f"{content_hash}-{settings_fingerprint()}-{kind}"
+
+
+class ResultCache:
+    """
+    Rendered analysis results (JSON or HTML bytes) keyed by upload content.
+
+    The memory tier is an LRU bounded by entry count and total bytes. When
+    `directory` is set, entries are also written there and survive
+    restarts; that tier is trimmed oldest-first to `disk_max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_entries=RESULT_CACHE_MAX_ENTRIES,
+        max_bytes=RESULT_CACHE_MAX_BYTES,
+        directory=RESULT_CACHE_DIR,
+        disk_max_bytes=RESULT_CACHE_DISK_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # -------------------------
+    # Memory tier
+    # -------------------------
+    def _remember(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+
+        self._entries[key] = value
+        self._bytes += len(value)
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    # -------------------------
+    # Disk tier
+    # -------------------------
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                value = f.read()
+        except OSError:
+            return None
+
+        os.utime(self._path(key))  # recently used
+        return value
+
+    def _write_disk(self, key, value):
+        path = self._path(key)
+        tmp = path + ".tmp"
+
+        with open(tmp, "wb") as f:
+            f.write(value)
+        os.replace(tmp, path)
+
+        self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".bin"):
+                stat = os.stat(os.path.join(self.directory, name))
+                files.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, name in sorted(files):
+            if total <= self.disk_max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    # -------------------------
+    # Public interface
+    # -------------------------
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self.directory:
+                value = self._read_disk(key)
+                if value is not None:
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            if self.directory:
+                self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self.directory:
+                for name in os.listdir(self.directory):
+                    if name.endswith(".bin"):
+                        os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "disk_enabled": bool(self.directory),
+            }
+
+
+result_cache = ResultCache()
@@ -1,89 +1,132 @@
-﻿def generate_rings(cycles, smurfing_groups, shell_chains):
+﻿from collections import Counter
 
-    rings = []
-    ring_counter = 1
+import numpy as np
 
-    MIN_RING_SIZE = 2  # false positive buffer
-    seen_member_sets = set()  # prevent duplicate rings
+from ..config import RING_MERGE_MIN_SHARED, RING_MERGE_MIN_OVERLAP
 
-    # -------------------------
-    # Cycles
-    # -------------------------
-    for cycle in cycles:
+MIN_RING_SIZE = 2  # false positive buffer
 
-        members = list(set(cycle))
 
-        if len(members) < MIN_RING_SIZE:
-            continue
-
-        member_key = frozenset(members)
-        if member_key in seen_member_sets:
-            continue
-
-        seen_member_sets.add(member_key)
-
-        rings.append(
-            {
-                "ring_id": f"RING_{ring_counter:03d}",
-                "member_accounts": members,
-                "pattern_type": "cycle",
-            }
-        )
-
-        ring_counter += 1
-
-    # -------------------------
-    # Smurfing (CORRECTED)
-    # -------------------------
-    if isinstance(smurfing_groups, dict):
-
-        for aggregator, smurfs in smurfing_groups.items():
-
-            members = list(set(smurfs + [aggregator]))
+class RingAssigner:
+    """
+    Assigns ring IDs as detector results arrive, in arrival order. Groups
+    that are too small, or whose member set already formed a ring, are
+    skipped. Rings hold "members" as a sorted array of account indices;
+    json_formatter translates them to IDs.
+    """
 
-            if len(members) < MIN_RING_SIZE:
-                continue
+    def __init__(self):
+        self.rings = []
+        self.seen_member_sets = set()  # prevent duplicate rings
 
-            member_key = frozenset(members)
-            if member_key in seen_member_sets:
-                continue
+    def add(self, accounts, pattern_type, details=None):
+        # Returns the new ring, or None when the group was skipped.
+        # `details` (e.g. cycle retention) is merged into the ring.
 
-            seen_member_sets.add(member_key)
-
-            rings.append(
-                {
-                    "ring_id": f"RING_{ring_counter:03d}",
-                    "member_accounts": members,
-                    "pattern_type": "smurfing",
-                }
-            )
-
-            ring_counter += 1
-
-    # -------------------------
-    # Shell chains
-    # -------------------------
-    for chain in shell_chains:
-
-        members = list(set(chain))
+        members = np.unique(np.asarray(accounts, dtype=np.int64))
 
         if len(members) < MIN_RING_SIZE:
-            continue
-
-        member_key = frozenset(members)
-        if member_key in seen_member_sets:
-            continue
-
-        seen_member_sets.add(member_key)
-
-        rings.append(
-            {
-                "ring_id": f"RING_{ring_counter:03d}",
-                "member_accounts": members,
-                "pattern_type": "shell",
-            }
-        )
-
-        ring_counter += 1
+            return None
 
-    return rings
\ No newline at end of file
+        member_key = members.tobytes()
+        if member_key in self.seen_member_sets:
+            return None
+
+        self.seen_member_sets.add(member_key)
+
+        ring = {
+            "ring_id": f"RING_{len(self.rings) + 1:03d}",
+            "members": members,
+            "pattern_type": pattern_type,
+            **(details or {}),
+        }
+        self.rings.append(ring)
+
+        return ring
+
+
+def rings_from_findings(results):
+    # Rings from registry findings, in detector (registration) order
+    assigner = RingAssigner()
+
+    for detector, findings in results:
+        for members, _, details in findings:
+            assigner.add(members, detector.pattern_type, details)
+
+    return assigner.rings
+
+
+def _network_ring(ring_id, group):
+    # One ring standing for a group of overlapping rings
+    if len(group) == 1:
+        return {**group[0], "ring_id": ring_id}
+
+    patterns = Counter(ring["pattern_type"] for ring in group)
+
+    network = {
+        "ring_id": ring_id,
+        "members": np.unique(np.concatenate([ring["members"] for ring in group])),
+        "pattern_type": next(iter(patterns)) if len(patterns) == 1 else "network",
+        "patterns": dict(patterns),
+    }
+
+    # Windowed analysis: the network spans its rings' windows
+    if all("window_start" in ring for ring in group):
+        network["window_start"] = min(ring["window_start"] for ring in group)
+        network["window_end"] = max(ring["window_end"] for ring in group)
+
+    return network
+
+
+def consolidate_rings(rings, min_shared=RING_MERGE_MIN_SHARED, min_overlap=RING_MERGE_MIN_OVERLAP):
+    """
+    Merge overlapping rings into networks, in ring order: a ring joins every
+    network it shares at least `min_shared` members and at least
+    `min_overlap` (fraction) of its own members with, and those networks
+    become one (union-find); otherwise it starts a new network. Each
+    account counts towards the first network it joined.
+
+    Returns the networks renumbered RING_001..., a ring that merged with
+    nothing unchanged apart from its ID. A merged network carries the union
+    of the members, the constituents' pattern type ("network" when they
+    differ) and "patterns": {pattern type: rings merged}.
+    """
+
+    parent = []  # network -> parent network; roots are the oldest network
+    home = {}  # account -> first network it joined
+
+    def find(network):
+        while parent[network] != network:
+            parent[network] = parent[parent[network]]
+            network = parent[network]
+        return network
+
+    ring_network = []
+    for ring in rings:
+        members = ring["members"].tolist()
+        needed = max(min_shared, min_overlap * len(members))
+
+        shared = Counter(find(home[acc]) for acc in members if acc in home)
+        joined = [root for root, count in shared.items() if count >= needed]
+
+        if joined:
+            network = min(joined)
+            for root in joined:
+                parent[root] = network
+        else:
+            network = len(parent)
+            parent.append(network)
+
+        ring_network.append(network)
+        for acc in members:
+            home.setdefault(acc, network)
+
+    # Networks in order of their first ring
+    groups = {}
+    for ring, network in zip(rings, ring_network):
+        groups.setdefault(find(network), []).append(ring)
+
+    return [
+        _network_ring(f"RING_{i:03d}", group)
+        for i, group in enumerate(groups.values(), start=1)
+    ]
@@ -0,0 +1,50 @@
+import numpy as np
+from ..config import (
+    ROUND_AMOUNT_UNIT,
+    ROUND_AMOUNT_MIN_TRANSFERS,
+    ROUND_AMOUNT_MIN_SHARE,
+)
+
+
+def round_amount_senders(
+    sender_codes,
+    receiver_codes,
+    amounts,
+    unit=ROUND_AMOUNT_UNIT,
+    min_transfers=ROUND_AMOUNT_MIN_TRANSFERS,
+    min_share=ROUND_AMOUNT_MIN_SHARE,
+):
+    """
+    Senders that move money in suspiciously round sums: at least
+    `min_transfers` transfers that are whole multiples of `unit`, making up
+    at least `min_share` of everything they sent. Returns
+    {sender_code: sorted array of receivers of the round transfers}.
+    """
+
+    sender_codes = np.asarray(sender_codes, dtype=np.int64)
+    receiver_codes = np.asarray(receiver_codes, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+
+    if len(sender_codes) == 0:
+        return {}
+
+    # Cent tolerance: amounts are float currency values
+    is_round = (amounts >= unit) & (np.abs(amounts - np.round(amounts / unit) * unit) < 0.005)
+
+    size = int(sender_codes.max()) + 1
+    sent = np.bincount(sender_codes, minlength=size)
+    sent_round = np.bincount(sender_codes[is_round], minlength=size)
+
+    flagged = (sent_round >= min_transfers) & (sent_round >= sent * min_share)
+    rows = is_round & flagged[sender_codes]
+
+    if not rows.any():
+        return {}
+
+    pairs = np.unique(np.stack((sender_codes[rows], receiver_codes[rows])), axis=1)
+    starts = np.flatnonzero(np.append(True, pairs[0][1:] != pairs[0][:-1]))
+
+    return {
+        int(pairs[0][start]): receivers[receivers != pairs[0][start]]
+        for start, receivers in zip(starts, np.split(pairs[1], starts[1:]))
+    }
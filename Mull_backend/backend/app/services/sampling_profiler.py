@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from ..config import PROFILE_INTERVAL_SECONDS, PROFILE_TOP
+
+
+def _label(code):
+    # "services/cycle_detector.py:_bounded_cycles_from"
+    parts = code.co_filename.replace("\\", "/").split("/")
+    return f"{'/'.join(parts[-2:])}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a
+    background thread, cheaply enough to run on a live request. Work done
+    in other processes (parallel detection) shows up as time spent waiting
+    on their results.
+    """
+
+    def __init__(self, thread_id=None, interval=PROFILE_INTERVAL_SECONDS):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, top=PROFILE_TOP):
+        self._stop.set()
+        self._thread.join()
+        return self.report(top, time.perf_counter() - self._started)
+
+    def report(self, top, duration):
+        """
+        The `top` functions by own samples (with inclusive counts) and the
+        `top` hottest stacks in folded form ("a;b;c"), which flame graph
+        tools read directly.
+        """
+
+        own = Counter()
+        total = Counter()
+        for stack, n in self.stacks.items():
+            own[stack[-1]] += n
+            for code in set(stack):
+                total[code] += n
+
+        return {
+            "interval_ms": self.interval * 1000,
+            "duration_seconds": round(duration, 3),
+            "samples": self.samples,
+            "pid": os.getpid(),
+            "functions": [
+                {
+                    "function": _label(code),
+                    "self_samples": n,
+                    "total_samples": total[code],
+                }
+                for code, n in own.most_common(top)
+            ],
+            "stacks": [
+                {"stack": ";".join(_label(code) for code in stack), "samples": n}
+                for stack, n in self.stacks.most_common(top)
+            ],
+        }
@@ -1,27 +1,57 @@
-from ..config import WEIGHT_CYCLE, WEIGHT_SMURFING, WEIGHT_SHELL, MAX_SCORE
+from itertools import chain
 
-def score_accounts(G, cycles, smurfing, shells):
+import numpy as np
 
-    scores = {}
+from ..config import MAX_SCORE
 
-    for node in G.nodes():
-        scores[node] = {"score": 0, "patterns": set()}
 
-    for cycle in cycles:
-        for acc in cycle:
-            scores[acc]["score"] += WEIGHT_CYCLE
-            scores[acc]["patterns"].add("cycle")
+class AccountScores:
+    """
+    Columnar account scores: `score[i]` and `patterns[i]` (a bitmask over
+    `pattern_types`) belong to account index i, whose ID is `accounts[i]`.
+    Dicts are only built for the accounts that end up in a response.
+    """
 
-    for acc in smurfing:
-        scores[acc]["score"] += WEIGHT_SMURFING
-        scores[acc]["patterns"].add("smurfing")
+    def __init__(self, accounts, score, patterns, pattern_types):
+        self.accounts = accounts
+        self.score = score
+        self.patterns = patterns
+        self.pattern_types = pattern_types
 
-    for chain in shells:
-        for acc in chain:
-            scores[acc]["score"] += WEIGHT_SHELL
-            scores[acc]["patterns"].add("shell")
+        self._names = {}
 
-    for acc in scores:
-        scores[acc]["score"] = min(MAX_SCORE, scores[acc]["score"])
+    def pattern_names(self, mask):
+        # Sorted pattern types set in `mask`
+        names = self._names.get(mask)
+        if names is None:
+            names = sorted(p for bit, p in enumerate(self.pattern_types) if mask >> bit & 1)
+            self._names[mask] = names
+        return names
+
+
+def score_accounts(G, results):
+    # results: (detector, findings) pairs from detection_orchestrator.detect;
+    # each finding adds the detector's weight to its scored account indices
+
+    scores = AccountScores(
+        G.accounts,
+        np.zeros(G.number_of_nodes(), dtype=np.float64),
+        np.zeros(G.number_of_nodes(), dtype=np.uint64),
+        [],
+    )
+
+    for detector, findings in results:
+        scored = np.fromiter(chain.from_iterable(s for _, s, _ in findings), dtype=np.int64)
+        if not len(scored):
+            continue
+
+        if detector.pattern_type not in scores.pattern_types:
+            scores.pattern_types.append(detector.pattern_type)
+        bit = np.uint64(1 << scores.pattern_types.index(detector.pattern_type))
+
+        scores.score += np.bincount(scored, minlength=len(scores.score)) * detector.weight
+        scores.patterns[scored] |= bit
+
+    np.minimum(scores.score, MAX_SCORE, out=scores.score)
 
     return scores
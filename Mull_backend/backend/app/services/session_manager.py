@@ -0,0 +1,553 @@
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+from ..config import (
+    CYCLE_MIN_LENGTH,
+    CYCLE_MAX_LENGTH,
+    SMURFING_THRESHOLD,
+    SHELL_MAX_DEGREE,
+    WEIGHT_CYCLE,
+    WEIGHT_SMURFING,
+    WEIGHT_SHELL,
+    MAX_SCORE,
+    SESSION_MAX,
+    SESSION_IDLE_TTL_SECONDS,
+)
+from .graph_builder import timestamps_ns
+from .smurfing_detector import hub_peer_groups, FAN_IN, FAN_OUT
+from .scoring_engine import AccountScores
+from .json_formatter import format_response
+
+MIN_RING_SIZE = 2
+MIN_SHELL_SIZE = 3
+
+# Pattern bits of a session's account scores
+PATTERN_TYPES = ["cycle", "smurfing", "shell"]
+RING_PRIORITY = ["cycle", "smurfing", "shell"]
+
+
+class SessionLimitError(Exception):
+    pass
+
+
+class AnalysisSession:
+    """
+    Account graph that grows batch by batch.
+
+    Every append only revisits what the new transactions can change:
+    cycles through the new edges, the smurfing windows of the accounts that
+    sent or received in the batch, and the shell components around the new
+    edges. Scores and rings are kept up to date from those deltas, and ring
+    IDs stay stable across batches.
+    """
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.lock = threading.Lock()
+
+        # Accounts and de-duplicated adjacency (integer codes)
+        self.index = {}
+        self.accounts = []
+        self.succ = []
+        self.pred = []
+        self.edge_total = 0
+        self.txn_seen = set()
+
+        # Per-account transaction rows for the smurfing windows
+        self.in_peers, self.in_ts = [], []
+        self.out_peers, self.out_ts = [], []
+
+        # Detector state
+        self.cycles = {}  # canonical tuple -> None (ordered set)
+        self.cycle_count = []
+        self.smurf_peers = {}  # hub -> {direction: peer array}
+        self.shells = {}  # frozenset -> sorted member list
+        self.shell_of = {}
+
+        # Per-account (score, PATTERN_TYPES bitmask), refreshed for the
+        # accounts a batch touched
+        self.score = []
+        self.patterns = []
+        self._dirty = set()
+
+        # Ring candidates: key -> member set, member set -> keys holding it,
+        # and the rings shown (one per member set) by pattern type
+        self._candidates = {}
+        self._holders = {}
+        self._order = {}
+        self._rings = {pattern_type: {} for pattern_type in RING_PRIORITY}
+        self._ring_ids = {}
+        self.batches = 0
+
+    # -------------------------
+    # Graph interface used by format_response
+    # -------------------------
+    def number_of_nodes(self):
+        return len(self.accounts)
+
+    def number_of_edges(self):
+        return self.edge_total
+
+    def _code(self, account):
+        code = self.index.get(account)
+        if code is None:
+            code = len(self.accounts)
+            self.index[account] = code
+            self.accounts.append(account)
+            self.succ.append(set())
+            self.pred.append(set())
+            self.in_peers.append([])
+            self.in_ts.append([])
+            self.out_peers.append([])
+            self.out_ts.append([])
+            self.cycle_count.append(0)
+            self.score.append(0.0)
+            self.patterns.append(0)
+        return code
+
+    # -------------------------
+    # Append
+    # -------------------------
+    def add_transactions(self, df):
+        """
+        Append a parsed batch and update every detector. Transactions whose
+        ID was already seen are skipped, so re-sending a batch is harmless.
+        Returns batch statistics.
+        """
+
+        start = time.perf_counter()
+        known_accounts = len(self.accounts)
+
+        # Set lookups per row (Series.isin would copy the whole history)
+        seen = self.txn_seen
+        fresh = np.fromiter(
+            (txn_id not in seen for txn_id in df["transaction_id"].tolist()),
+            dtype=bool,
+            count=len(df),
+        )
+        fresh &= ~df["transaction_id"].duplicated().to_numpy()
+        batch = df[fresh]
+
+        self.txn_seen.update(batch["transaction_id"].tolist())
+
+        timestamps = timestamps_ns(batch).tolist()
+        new_edges = []
+        fan_in, fan_out = set(), set()
+
+        for sender, receiver, ts in zip(
+            batch["sender_id"].tolist(), batch["receiver_id"].tolist(), timestamps
+        ):
+            # Codes in first-appearance order, sender before receiver
+            u = self._code(sender)
+            v = self._code(receiver)
+
+            if v not in self.succ[u]:
+                self.succ[u].add(v)
+                self.pred[v].add(u)
+                new_edges.append((u, v))
+
+            self.out_peers[u].append(v)
+            self.out_ts[u].append(ts)
+            self.in_peers[v].append(u)
+            self.in_ts[v].append(ts)
+            fan_out.add(u)
+            fan_in.add(v)
+
+        self.edge_total += len(new_edges)
+
+        new_cycles = self._update_cycles(new_edges)
+        new_hubs = self._update_smurfing(fan_in, fan_out)
+        shell_changes = self._update_shells(new_edges)
+        self._refresh_scores()
+
+        self.batches += 1
+        self.last_used = time.time()
+
+        return {
+            "transactions_added": len(batch),
+            "duplicates_skipped": int(len(df) - len(batch)),
+            "new_accounts": len(self.accounts) - known_accounts,
+            "new_edges": len(new_edges),
+            "new_cycles": new_cycles,
+            "new_smurfing_hubs": new_hubs,
+            "shell_components_changed": shell_changes,
+            "update_seconds": round(time.perf_counter() - start, 3),
+        }
+
+    # -------------------------
+    # Cycles
+    # -------------------------
+    def _distances_to(self, target, max_hops):
+        # Backward BFS: hops each node needs to reach `target`
+        dist = {target: 0}
+        queue = deque([target])
+
+        while queue:
+            node = queue.popleft()
+            hops = dist[node] + 1
+
+            if hops > max_hops:
+                continue
+
+            for prev in self.pred[node]:
+                if prev not in dist:
+                    dist[prev] = hops
+                    queue.append(prev)
+
+        return dist
+
+    def _cycles_through(self, u, v, min_length, max_length):
+        # Simple cycles using edge u -> v: paths v ~> u of bounded length
+        if u == v:
+            return
+
+        dist = self._distances_to(u, max_length - 1)
+        if v not in dist:
+            return
+
+        path = [u, v]
+        on_path = {u, v}
+        stack = [iter(self.succ[v])]
+
+        while stack:
+            nxt = next(stack[-1], None)
+
+            if nxt is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+
+            if nxt == u:
+                if len(path) >= min_length:
+                    yield path
+                continue
+
+            if nxt in on_path or nxt not in dist or len(path) + dist[nxt] > max_length:
+                continue
+
+            path.append(nxt)
+            on_path.add(nxt)
+            stack.append(iter(self.succ[nxt]))
+
+    def _update_cycles(self, new_edges):
+        # Every cycle that did not exist before runs through a new edge
+        added = 0
+
+        for u, v in new_edges:
+            for path in self._cycles_through(u, v, CYCLE_MIN_LENGTH, CYCLE_MAX_LENGTH):
+                low = path.index(min(path))
+                cycle = tuple(path[low:] + path[:low])
+
+                if cycle in self.cycles:
+                    continue
+
+                self.cycles[cycle] = None
+                for acc in cycle:
+                    self.cycle_count[acc] += 1
+                self._dirty.update(cycle)
+                added += 1
+
+                key = ("cycle", frozenset(cycle))
+                if key not in self._candidates:
+                    self._set_candidate(key, cycle)
+
+        return added
+
+    # -------------------------
+    # Smurfing
+    # -------------------------
+    def _update_smurfing(self, fan_in, fan_out):
+        # Re-window only the accounts that received (fan-in) or sent
+        # (fan-out) in this batch, over their own history
+        hubs, peers, timestamps = [], [], []
+        rewindowed = []
+
+        for direction, accounts, rows_peers, rows_ts in (
+            (FAN_IN, fan_in, self.in_peers, self.in_ts),
+            (FAN_OUT, fan_out, self.out_peers, self.out_ts),
+        ):
+            for acc in accounts:
+                # Too few rows to ever reach the peer threshold
+                if len(rows_peers[acc]) < SMURFING_THRESHOLD:
+                    continue
+                rewindowed.append(acc * 2 + direction)
+                hubs.append(np.full(len(rows_peers[acc]), acc * 2 + direction))
+                peers.append(rows_peers[acc])
+                timestamps.append(rows_ts[acc])
+
+        if not hubs:
+            return 0
+
+        groups = hub_peer_groups(
+            np.concatenate(hubs),
+            np.concatenate([np.asarray(p, dtype=np.int64) for p in peers]),
+            np.concatenate([np.asarray(t, dtype=np.int64) for t in timestamps]),
+        )
+
+        # A re-windowed direction missing from `groups` no longer qualifies
+        added = 0
+        changed = {}
+        for key in sorted(rewindowed):
+            hub, direction = divmod(key, 2)
+            group = groups.get(key)
+            current = self.smurf_peers.get(hub)
+
+            if group is not None:
+                if current is None:
+                    current = self.smurf_peers[hub] = {}
+                    added += 1
+                current[direction] = group
+            elif current is not None and direction in current:
+                del current[direction]
+                if not current:
+                    del self.smurf_peers[hub]
+            else:
+                continue
+
+            changed[hub] = None
+
+        for hub in changed:
+            groups = self.smurf_peers.get(hub)
+            members = None
+            if groups:
+                members = set(np.concatenate(list(groups.values())).tolist())
+                members.add(hub)
+            self._set_candidate(("smurfing", hub), members)
+            self._dirty.add(hub)
+
+        return added
+
+    # -------------------------
+    # Shells
+    # -------------------------
+    def _is_shell(self, acc):
+        return len(self.succ[acc]) + len(self.pred[acc]) <= SHELL_MAX_DEGREE
+
+    def _update_shells(self, new_edges):
+        # Only components holding an endpoint of a new edge can change:
+        # degrees there grew (possibly dropping out of the shell set) and
+        # the edge may join two components
+        touched = {acc for edge in new_edges for acc in edge}
+        if not touched:
+            return 0
+
+        seeds = set(touched)
+        retired = {self.shell_of[acc] for acc in touched if acc in self.shell_of}
+
+        for key in retired:
+            for acc in self.shells.pop(key):
+                del self.shell_of[acc]
+            seeds.update(key)
+            self._dirty.update(key)
+            self._set_candidate(("shell", key), None)
+
+        visited = set()
+        formed = set()
+
+        for seed in sorted(seeds):
+            if seed in visited or not self._is_shell(seed):
+                continue
+
+            component = [seed]
+            visited.add(seed)
+            queue = deque([seed])
+
+            while queue:
+                node = queue.popleft()
+                for nxt in self.succ[node] | self.pred[node]:
+                    if nxt not in visited and self._is_shell(nxt):
+                        visited.add(nxt)
+                        component.append(nxt)
+                        queue.append(nxt)
+
+            if len(component) < MIN_SHELL_SIZE:
+                continue
+
+            key = frozenset(component)
+            formed.add(key)
+
+            self.shells[key] = sorted(component)
+            for acc in component:
+                self.shell_of[acc] = key
+            self._dirty.update(component)
+            self._set_candidate(("shell", key), component)
+
+        # Components dropped or newly formed (unchanged ones cancel out)
+        return len(retired ^ formed)
+
+    # -------------------------
+    # Scores and rings
+    # -------------------------
+    def _score(self, acc):
+        # (score, PATTERN_TYPES bitmask)
+        score = 0
+        patterns = 0
+
+        if self.cycle_count[acc]:
+            score += WEIGHT_CYCLE * self.cycle_count[acc]
+            patterns |= 1
+        if acc in self.smurf_peers:
+            score += WEIGHT_SMURFING
+            patterns |= 2
+        if acc in self.shell_of:
+            score += WEIGHT_SHELL
+            patterns |= 4
+
+        return min(MAX_SCORE, score), patterns
+
+    def _refresh_scores(self):
+        for acc in self._dirty:
+            self.score[acc], self.patterns[acc] = self._score(acc)
+        self._dirty.clear()
+
+    def _priority(self, key):
+        # Same priority as the registry: cycles, then smurfing, then shells
+        return RING_PRIORITY.index(key[0]), self._order[key]
+
+    def _set_candidate(self, key, members):
+        # Register, replace or (members=None) drop a ring candidate. Of the
+        # candidates sharing a member set, the highest-priority one is the
+        # ring; ring IDs are assigned on first appearance and kept.
+        if members is not None and len(members) >= MIN_RING_SIZE:
+            members = frozenset(members)
+        else:
+            members = None
+
+        old = self._candidates.pop(key, None)
+        if old == members:
+            if old is not None:
+                self._candidates[key] = old
+            return
+
+        if old is not None:
+            self._holders[old].remove(key)
+            if members is None:
+                self._rings[key[0]].pop(key, None)
+            self._elect(old)
+
+        if members is None:
+            return
+
+        self._order.setdefault(key, len(self._order))
+        self._candidates[key] = members
+        self._holders.setdefault(members, []).append(key)
+        self._elect(members, key)
+
+    def _elect(self, members, changed=None):
+        holders = self._holders[members]
+        if not holders:
+            del self._holders[members]
+            return
+
+        winner = min(holders, key=self._priority)
+        for key in holders:
+            if key != winner:
+                self._rings[key[0]].pop(key, None)
+
+        shown = self._rings[winner[0]]
+        if winner in shown and winner != changed:
+            return
+
+        ring_id = self._ring_ids.get(winner)
+        if ring_id is None:
+            ring_id = f"RING_{len(self._ring_ids) + 1:03d}"
+            self._ring_ids[winner] = ring_id
+
+        # Updating a shown ring keeps its place in the ring order
+        shown[winner] = {
+            "ring_id": ring_id,
+            "members": np.array(sorted(members), dtype=np.int64),
+            "pattern_type": winner[0],
+        }
+
+    def rings(self):
+        """
+        Current rings as ring_manager would build them, with ring IDs
+        that are assigned on first appearance and kept for later batches.
+        """
+
+        return [ring for shown in self._rings.values() for ring in shown.values()]
+
+    def response(self, processing_time=0.0):
+        scores = AccountScores(
+            np.array(self.accounts, dtype=object),
+            np.array(self.score, dtype=np.float64),
+            np.array(self.patterns, dtype=np.uint64),
+            PATTERN_TYPES,
+        )
+
+        return format_response(scores, self, processing_time, rings=self.rings())
+
+    def info(self):
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at,
+            "last_used": self.last_used,
+            "batches": self.batches,
+            "transactions": len(self.txn_seen),
+            "accounts": len(self.accounts),
+            "edges": self.edge_total,
+            "cycles": len(self.cycles),
+            "smurfing_hubs": len(self.smurf_peers),
+            "shell_components": len(self.shells),
+        }
+
+
+class SessionManager:
+    """
+    Keeps analysis sessions in memory. At most `max_sessions` live at once;
+    a session left idle for `ttl` seconds is dropped.
+    """
+
+    def __init__(self, max_sessions=SESSION_MAX, ttl=SESSION_IDLE_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            session_id
+            for session_id, session in self._sessions.items()
+            if now - session.last_used > self.ttl
+        ]
+        for session_id in expired:
+            del self._sessions[session_id]
+
+    def create(self):
+        with self._lock:
+            self._purge_expired()
+
+            if len(self._sessions) >= self.max_sessions:
+                raise SessionLimitError("Too many open sessions, delete one first")
+
+            session_id = uuid.uuid4().hex
+            session = AnalysisSession(session_id)
+            self._sessions[session_id] = session
+
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._purge_expired()
+            return self._sessions.get(session_id)
+
+    def delete(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def count(self):
+        with self._lock:
+            self._purge_expired()
+            return len(self._sessions)
+
+
+session_manager = SessionManager()
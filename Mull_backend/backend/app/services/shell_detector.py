@@ -1,25 +1,163 @@
-from ..config import SHELL_MAX_DEGREE
-import networkx as nx
+from ..config import (
+    SHELL_MAX_DEGREE,
+    SHELL_DETECTOR,
+    SHELL_CHAIN_MAX_IN_DEGREE,
+    SHELL_CHAIN_MAX_OUT_DEGREE,
+    SHELL_CHAIN_MIN_INTERMEDIARIES,
+    SHELL_CHAIN_MAX_INTERMEDIARIES,
+)
+import numpy as np
 
-def detect_shells(G):
 
-    shell_nodes = set()
+def _find(parent, node):
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
+
+
+def shell_components(indptr, indices, max_degree=SHELL_MAX_DEGREE):
+    """
+    Connected components (ignoring direction) of the accounts whose degree
+    is at most max_degree, as lists of account indices.
+    """
+
+    n = len(indptr) - 1
+    out_degree = np.diff(indptr)
+    degree = out_degree + np.bincount(indices, minlength=n)
 
     # Identify shell-like nodes
-    for node in G.nodes():
-        if G.degree(node) <= SHELL_MAX_DEGREE:
-            shell_nodes.add(node)
+    shell_mask = degree <= max_degree
+
+    # Edges whose endpoints are both shell-like (undirected for grouping)
+    sources = np.repeat(np.arange(n), out_degree)
+    keep = shell_mask[sources] & shell_mask[indices]
+
+    parent = list(range(n))
+
+    for u, v in zip(sources[keep].tolist(), indices[keep].tolist()):
+        ru, rv = _find(parent, u), _find(parent, v)
+        if ru != rv:
+            parent[rv] = ru
+
+    components = {}
+    for node in np.flatnonzero(shell_mask).tolist():
+        components.setdefault(_find(parent, node), []).append(node)
+
+    return [
+        component
+        for component in components.values()
+        if len(component) >= 3  # minimum size to be meaningful
+    ]
+
+
+def _grouped(keys, values):
+    # {key: values in order} for parallel arrays already sorted by key
+    starts = np.flatnonzero(np.diff(keys)) + 1
+    return {
+        int(group_keys[0]): group.tolist()
+        for group_keys, group in zip(np.split(keys, starts), np.split(values, starts))
+        if len(group_keys)
+    }
+
+
+def shell_chains(
+    indptr,
+    indices,
+    edge_first_ts,
+    edge_last_ts,
+    max_in=SHELL_CHAIN_MAX_IN_DEGREE,
+    max_out=SHELL_CHAIN_MAX_OUT_DEGREE,
+    min_intermediaries=SHELL_CHAIN_MIN_INTERMEDIARIES,
+    max_intermediaries=SHELL_CHAIN_MAX_INTERMEDIARIES,
+):
+    """
+    Directed layering chains: source -> intermediaries -> sink.
+
+    An intermediary both receives and sends, with in-degree <= max_in and
+    out-degree <= max_out. A hop only counts when money leaves an
+    intermediary no earlier than it first arrived there. Intermediaries
+    joined by such hops are grouped with union-find (one pass over the
+    edges), and every group of min..max intermediaries with at least one
+    source feeding it and one sink draining it is returned as
+    [sources..., intermediaries in arrival order..., sinks...].
+    """
+
+    n = len(indptr) - 1
+    out_degree = np.diff(indptr)
+    in_degree = np.bincount(indices, minlength=n)
+    sources = np.repeat(np.arange(n), out_degree)
+    targets = indices
+    loops = sources == targets
+
+    intermediary = (
+        (in_degree >= 1) & (out_degree >= 1)
+        & (in_degree <= max_in) & (out_degree <= max_out)
+    )
+    intermediary[sources[loops]] = False
+
+    # Time-ordered hops: the edge out of an account carries a transfer made
+    # at or after the account's first incoming transfer
+    first_in = np.full(n, np.iinfo(np.int64).max)
+    np.minimum.at(first_in, targets, edge_first_ts)
+    forward = edge_last_ts >= first_in[sources]
+
+    # Union-find over intermediaries only (compact numbering)
+    members = np.flatnonzero(intermediary)
+    compact = np.full(n, -1)
+    compact[members] = np.arange(len(members))
+
+    link = intermediary[sources] & intermediary[targets] & forward & ~loops
+    parent = list(range(len(members)))
+
+    for u, v in zip(compact[sources[link]].tolist(), compact[targets[link]].tolist()):
+        ru, rv = _find(parent, u), _find(parent, v)
+        if ru != rv:
+            parent[rv] = ru
+
+    roots = np.array([_find(parent, i) for i in range(len(members))], dtype=np.int64)
+    group = np.full(n, -1)
+    group[members] = roots
+
+    # Edges entering a group from outside, and time-ordered edges leaving it
+    entry = (group[targets] >= 0) & (group[sources] != group[targets]) & ~loops
+    leave = (group[sources] >= 0) & (group[targets] != group[sources]) & forward & ~loops
+
+    sizes = np.bincount(roots, minlength=len(members))
+    valid = (sizes >= min_intermediaries) & (sizes <= max_intermediaries)
+    fed = np.zeros(len(members), dtype=bool)
+    fed[group[targets[entry]]] = True
+    drained = np.zeros(len(members), dtype=bool)
+    drained[group[sources[leave]]] = True
+    valid &= fed & drained
+
+    if not valid.any():
+        return []
+
+    # Intermediaries by group, in order of first arrival
+    keep = valid[roots]
+    chain_nodes, chain_roots = members[keep], roots[keep]
+    order = np.lexsort((first_in[chain_nodes], chain_roots))
+    hops = _grouped(chain_roots[order], chain_nodes[order])
 
-    # Create subgraph of only shell-like nodes
-    shell_subgraph = G.subgraph(shell_nodes)
+    def outside_accounts(mask, inside, outside):
+        # {group: distinct outside accounts} over the masked edges
+        owners, accounts = group[inside[mask]], outside[mask]
+        kept = valid[owners]
+        pairs = np.unique(np.stack((owners[kept], accounts[kept])), axis=1)
+        return _grouped(pairs[0], pairs[1])
 
-    # Get connected components (undirected for grouping)
-    components = list(nx.connected_components(shell_subgraph.to_undirected()))
+    feeders = outside_accounts(entry, targets, sources)
+    sinks = outside_accounts(leave, sources, targets)
 
-    suspicious_chains = []
+    return [
+        list(dict.fromkeys(feeders[root] + hops[root] + sinks[root]))
+        for root in hops
+    ]
 
-    for component in components:
-        if len(component) >= 3:  # minimum size to be meaningful
-            suspicious_chains.append(list(component))
 
-    return suspicious_chains
+def find_shells(indptr, indices, edge_first_ts, edge_last_ts, detector=None):
+    # The configured shell detector over CSR arrays
+    if (detector or SHELL_DETECTOR) == "chains":
+        return shell_chains(indptr, indices, edge_first_ts, edge_last_ts)
+    return shell_components(indptr, indices)
@@ -1,62 +1,172 @@
-from datetime import timedelta
+import numpy as np
+import pandas as pd
 from ..config import SMURFING_THRESHOLD
 
 WINDOW_HOURS = 72
 DOMINANT_SENDER_RATIO = 0.7  # 70% from same sender = likely normal
 
+FAN_IN = 0   # many senders -> one aggregator
+FAN_OUT = 1  # one distributor -> many receivers
+
+
+def _group_starts(keys):
+    starts = np.ones(len(keys), dtype=bool)
+    starts[1:] = keys[1:] != keys[:-1]
+    return np.flatnonzero(starts)
 
-def detect_smurfing(df):
 
-    smurfing_groups = {}
+def _hub_windows(hub, peer, timestamps, window_ns, threshold):
+    """
+    For rows already sorted by (hub, timestamp), return a boolean mask of
+    the rows that fall inside at least one window of `window_ns` in which
+    the hub dealt with >= `threshold` distinct peers.
+    """
 
-    df = df.sort_values("timestamp")
+    n = len(hub)
+    positions = np.arange(n)
 
-    for receiver, group in df.groupby("receiver_id"):
+    # Dense group number per hub (rows are sorted by hub)
+    group = np.zeros(n, dtype=np.int64)
+    group[_group_starts(hub)] = 1
+    group = np.cumsum(group) - 1
 
-        timestamps = group["timestamp"].values
-        senders = group["sender_id"].values
+    # -------------------------
+    # Window bounds: first row of the same hub within window_ns before.
+    # Rank timestamps densely so (group, rank) packs into one sorted int64.
+    # -------------------------
+    uniq_ts = np.unique(timestamps)
+    stride = len(uniq_ts) + 1
+    rank = np.searchsorted(uniq_ts, timestamps)
+    lower_rank = np.searchsorted(uniq_ts, timestamps - window_ns, side="left")
 
-        # ------------------------------------------------
-        # 🚀 FALSE POSITIVE PROTECTION (Salary Check)
-        # ------------------------------------------------
-        sender_counts = group["sender_id"].value_counts()
+    keys = group * stride + rank
+    left = np.searchsorted(keys, group * stride + lower_rank, side="left")
 
-        if len(sender_counts) > 0:
-            dominant_ratio = sender_counts.max() / sender_counts.sum()
+    # -------------------------
+    # Distinct peers per window [left, row].
+    # A row is "fresh" if the hub has not seen that peer within window_ns
+    # before it. Fresh rows inside a window are always distinct peers, so
+    # their count is a lower bound; the row count is an upper bound. Only
+    # windows between the two need an exact count.
+    # -------------------------
+    pair_order = np.lexsort((positions, peer, group))
+    pair_group = group[pair_order]
+    pair_peer = peer[pair_order]
+    same_pair = np.zeros(n, dtype=bool)
+    same_pair[1:] = (pair_group[1:] == pair_group[:-1]) & (pair_peer[1:] == pair_peer[:-1])
 
-            if dominant_ratio >= DOMINANT_SENDER_RATIO:
-                # Likely consistent salary / normal inflow
-                continue  # Skip smurfing detection for this account
+    prev = np.full(n, -1)
+    prev[pair_order[1:][same_pair[1:]]] = pair_order[:-1][same_pair[1:]]
 
-        # ------------------------------------------------
-        # Sliding Window Smurfing Detection
-        # ------------------------------------------------
-        left = 0
-        sender_count = {}
+    fresh = (prev < 0) | (timestamps - timestamps[np.maximum(prev, 0)] > window_ns)
+    fresh_before = np.concatenate(([0], np.cumsum(fresh)))
 
-        for right in range(len(group)):
+    lower = fresh_before[positions + 1] - fresh_before[left]
+    upper = positions - left + 1
 
-            # Add right sender
-            sender = senders[right]
-            sender_count[sender] = sender_count.get(sender, 0) + 1
+    qualifies = lower >= threshold
 
-            # Shrink window if outside time range
-            while (timestamps[right] - timestamps[left]) > timedelta(hours=WINDOW_HOURS):
-                left_sender = senders[left]
-                sender_count[left_sender] -= 1
-                if sender_count[left_sender] == 0:
-                    del sender_count[left_sender]
-                left += 1
+    for row in np.flatnonzero(~qualifies & (upper >= threshold)).tolist():
+        if len(np.unique(peer[left[row]:row + 1])) >= threshold:
+            qualifies[row] = True
 
-            # Check threshold
-            if len(sender_count) >= SMURFING_THRESHOLD:
-                if receiver not in smurfing_groups:
-                    smurfing_groups[receiver] = set()
+    # -------------------------
+    # Every row covered by a qualifying window belongs to the group
+    # -------------------------
+    coverage = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(coverage, left[qualifies], 1)
+    np.add.at(coverage, positions[qualifies] + 1, -1)
 
-                smurfing_groups[receiver].update(sender_count.keys())
+    return np.cumsum(coverage[:-1]) > 0
+
+
+def _eligible_hubs(hub, peer, threshold):
+    # Drop hubs dominated by one counterparty (salary, rent, ...) and hubs
+    # that never reach `threshold` distinct counterparties at all.
+    pairs, pair_counts = np.unique(
+        np.stack((hub, peer)), axis=1, return_counts=True
+    )
+    pair_hubs = pairs[0]
+
+    starts = _group_starts(pair_hubs)
+    hubs = pair_hubs[starts]
+    distinct = np.diff(np.append(starts, len(pair_hubs)))
+    dominant = np.maximum.reduceat(pair_counts, starts)
+    total = np.add.reduceat(pair_counts, starts)
+
+    keep = (distinct >= threshold) & (dominant / total < DOMINANT_SENDER_RATIO)
+
+    return hubs[keep]
+
+
+def hub_peer_groups(hub, peer, timestamps, threshold=SMURFING_THRESHOLD, window_hours=WINDOW_HOURS):
+    """
+    One-direction core: rows are (hub, counterparty, int64 ns timestamp).
+    Returns {hub: sorted array of counterparties} for every hub that dealt
+    with >= threshold distinct counterparties inside one window.
+    """
+
+    hub = np.asarray(hub, dtype=np.int64)
+    peer = np.asarray(peer, dtype=np.int64)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+
+    if len(hub) == 0:
+        return {}
+
+    eligible = np.isin(hub, _eligible_hubs(hub, peer, threshold))
+    hub, peer, timestamps = hub[eligible], peer[eligible], timestamps[eligible]
+
+    if len(hub) == 0:
+        return {}
+
+    order = np.lexsort((timestamps, hub))
+    hub, peer, timestamps = hub[order], peer[order], timestamps[order]
+
+    window_ns = int(pd.Timedelta(hours=window_hours).value)
+    covered = _hub_windows(hub, peer, timestamps, window_ns, threshold)
+
+    # Unique (hub, peer) pairs among covered rows
+    flagged = np.unique(np.stack((hub[covered], peer[covered])), axis=1)
+    starts = _group_starts(flagged[0])
 
-    # Convert sets to lists
     return {
-        agg: list(senders)
-        for agg, senders in smurfing_groups.items()
+        int(flagged[0][start]): peers
+        for start, peers in zip(starts, np.split(flagged[1], starts[1:]))
     }
+
+
+def smurfing_hubs(
+    sender_codes,
+    receiver_codes,
+    timestamps,
+    threshold=SMURFING_THRESHOLD,
+    window_hours=WINDOW_HOURS,
+):
+    """
+    Fan-in (many senders -> one aggregator) and fan-out (one distributor ->
+    many receivers) within a sliding time window, in one vectorized pass
+    over both directions. Takes per-transaction account codes and int64 ns
+    timestamps and returns {hub_code: sorted array of peer codes}; an
+    account that does both is listed once with the union of its peers.
+    """
+
+    sender_codes = np.asarray(sender_codes, dtype=np.int64)
+    receiver_codes = np.asarray(receiver_codes, dtype=np.int64)
+
+    # Both directions in one pass: hub key = account * 2 + direction
+    groups = hub_peer_groups(
+        np.concatenate((receiver_codes * 2 + FAN_IN, sender_codes * 2 + FAN_OUT)),
+        np.concatenate((sender_codes, receiver_codes)),
+        np.concatenate((timestamps, timestamps)),
+        threshold,
+        window_hours,
+    )
+
+    hubs = {}
+    for key, peers in groups.items():
+        account = key // 2
+        if account in hubs:
+            peers = np.union1d(hubs[account], peers)
+        hubs[account] = peers
+
+    return hubs
@@ -0,0 +1,212 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ..config import TRANSACTION_STORE_PATH, STORE_CACHE_MIB, CSV_CHUNK_SIZE
+from .graph_builder import interleaved_accounts, timestamps_ns
+from .input_reader import iter_transaction_chunks
+
+# Account IDs are interned once (accounts.id); transactions reference them
+# by integer, with timestamps as int64 ns
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    id INTEGER PRIMARY KEY,
+    account_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    transaction_id TEXT NOT NULL UNIQUE,
+    sender INTEGER NOT NULL REFERENCES accounts(id),
+    receiver INTEGER NOT NULL REFERENCES accounts(id),
+    amount REAL NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_sender ON transactions(sender, timestamp);
+CREATE INDEX IF NOT EXISTS transactions_receiver ON transactions(receiver, timestamp);
+CREATE INDEX IF NOT EXISTS transactions_timestamp ON transactions(timestamp);
+"""
+
+
+class StoreNotConfiguredError(Exception):
+    pass
+
+
+def _timestamp_ns(value):
+    # "2026-01-07", "2026-01-07 03:00:00", ISO 8601 ... -> int64 ns (UTC naive)
+    try:
+        stamp = pd.Timestamp(value)
+    except ValueError as exc:
+        raise ValueError(f"Invalid timestamp: {value}") from exc
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_convert("UTC").tz_localize(None)
+    return stamp.value
+
+
+class TransactionStore:
+    """
+    Embedded SQLite file of ingested transactions, indexed by sender,
+    receiver and timestamp, so an analysis can read just a time window
+    and/or the transactions of some accounts instead of a fresh upload.
+
+    Transaction IDs are unique: rows already stored are skipped, so
+    re-ingesting an overlapping export is safe. Writes are serialized;
+    reads use their own connection (WAL mode) and run alongside them.
+    """
+
+    def __init__(self, path=TRANSACTION_STORE_PATH):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self):
+        if not self.path:
+            raise StoreNotConfiguredError(
+                "Transaction store is not configured (set TRANSACTION_STORE_PATH)"
+            )
+
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL commits need no fsync of the database; a large page cache keeps
+        # the three index b-trees in memory during bulk inserts
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{STORE_CACHE_MIB * 1024}")
+        if not self._ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    # -------------------------
+    # Ingestion
+    # -------------------------
+    def _account_ids(self, conn, accounts):
+        # Store ids for `accounts` (distinct IDs), adding the new ones
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_accounts (pos INTEGER PRIMARY KEY, account_id TEXT)")
+        conn.execute("DELETE FROM batch_accounts")
+        conn.executemany(
+            "INSERT INTO batch_accounts VALUES (?, ?)", enumerate(accounts.tolist())
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO accounts (account_id) SELECT account_id FROM batch_accounts ORDER BY pos"
+        )
+        rows = conn.execute(
+            "SELECT b.pos, a.id FROM batch_accounts b JOIN accounts a USING (account_id)"
+        ).fetchall()
+
+        ids = np.empty(len(accounts), dtype=np.int64)
+        pos, found = zip(*rows) if rows else ((), ())
+        ids[list(pos)] = found
+        return ids
+
+    def _insert(self, conn, df):
+        codes, accounts = pd.factorize(interleaved_accounts(df))
+        ids = self._account_ids(conn, accounts)[codes]
+
+        rows = zip(
+            df["transaction_id"].astype(str).tolist(),
+            ids[0::2].tolist(),
+            ids[1::2].tolist(),
+            df["amount"].tolist(),
+            timestamps_ns(df).tolist(),
+        )
+
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO transactions VALUES (?, ?, ?, ?, ?)", rows)
+        return conn.total_changes - before
+
+    def ingest(self, file, chunksize=CSV_CHUNK_SIZE):
+        """
+        Bulk-load an upload or local path (any input_reader format), read
+        in chunks of `chunksize` rows, each inserted in one statement batch.
+        The whole file is one transaction. Returns {"rows", "inserted",
+        "skipped"}.
+        """
+
+        rows = inserted = 0
+
+        with self._write_lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    for chunk in iter_transaction_chunks(file, chunksize, exact_amounts=True):
+                        rows += len(chunk)
+                        inserted += self._insert(conn, chunk)
+            finally:
+                conn.close()
+
+        return {"rows": rows, "inserted": inserted, "skipped": rows - inserted}
+
+    # -------------------------
+    # Queries
+    # -------------------------
+    def transactions(self, start=None, end=None, accounts=None):
+        """
+        Stored transactions as a parse_csv-style DataFrame, in ingestion
+        order: those with start <= timestamp < end (either bound optional)
+        and, when `accounts` is given, sent or received by one of them.
+        """
+
+        where, params = [], []
+
+        if start is not None:
+            where.append("t.timestamp >= ?")
+            params.append(_timestamp_ns(start))
+        if end is not None:
+            where.append("t.timestamp < ?")
+            params.append(_timestamp_ns(end))
+
+        if accounts is not None:
+            # Two index lookups instead of an OR over the table
+            ids = "SELECT id FROM accounts WHERE account_id IN (SELECT account_id FROM query_accounts)"
+            where.append(
+                f"t.rowid IN (SELECT rowid FROM transactions WHERE sender IN ({ids}) "
+                f"UNION SELECT rowid FROM transactions WHERE receiver IN ({ids}))"
+            )
+
+        sql = (
+            "SELECT t.transaction_id, s.account_id, r.account_id, t.amount, t.timestamp "
+            "FROM transactions t "
+            "JOIN accounts s ON s.id = t.sender "
+            "JOIN accounts r ON r.id = t.receiver"
+        )
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY t.rowid"
+
+        conn = self._connect()
+        try:
+            if accounts is not None:
+                conn.execute("CREATE TEMP TABLE query_accounts (account_id TEXT)")
+                conn.executemany("INSERT INTO query_accounts VALUES (?)", ((acc,) for acc in accounts))
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        df = pd.DataFrame(
+            rows, columns=["transaction_id", "sender_id", "receiver_id", "amount", "timestamp"]
+        )
+        df["amount"] = df["amount"].astype(np.float64)
+        df["timestamp"] = df["timestamp"].astype(np.int64).values.view("datetime64[ns]")
+
+        return df
+
+    def stats(self):
+        conn = self._connect()
+        try:
+            transactions, first, last = conn.execute(
+                "SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM transactions"
+            ).fetchone()
+            accounts = conn.execute("SELECT COUNT(*) FROM accounts").fetchone()[0]
+        finally:
+            conn.close()
+
+        return {
+            "path": self.path,
+            "transactions": transactions,
+            "accounts": accounts,
+            "first_timestamp": str(pd.Timestamp(first)) if first is not None else None,
+            "last_timestamp": str(pd.Timestamp(last)) if last is not None else None,
+        }
+
+
+transaction_store = TransactionStore()
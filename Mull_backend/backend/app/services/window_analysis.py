@@ -0,0 +1,372 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from ..config import (
+    ANALYSIS_WINDOW_HOURS,
+    ANALYSIS_WINDOW_STEP_HOURS,
+    WINDOW_WORKERS,
+    MAX_WINDOWS,
+    MAX_SCORE,
+    PRUNE_HUBS,
+)
+from .graph_builder import graph_from_arrays
+from .detection_orchestrator import detect, SharedArrays
+from .detector_registry import resolve_detectors
+from .hub_pruning import load_allowlist, prune_hubs as prune_graph
+from .scoring_engine import AccountScores, score_accounts
+from .ring_manager import rings_from_findings
+from .json_formatter import format_response
+from .pipeline import stage_callback, count_response, with_timeouts, final_rings
+
+HOUR_NS = 3600 * 10**9
+
+_executor = None
+_executor_workers = None
+
+
+def _get_executor(workers):
+    # One spawn pool shared by windowed analyses, created on first use (and
+    # replaced when a caller asks for another size, e.g. the CLI's --workers)
+    global _executor, _executor_workers
+    if _executor is not None and _executor_workers != workers:
+        _executor.shutdown(wait=False)
+        _executor = None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        _executor_workers = workers
+    return _executor
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# -------------------------
+# Windows
+# -------------------------
+def window_bounds(timestamps, window_hours, step_hours):
+    """
+    Windows [start, start + window) every `step_hours` over sorted int64 ns
+    `timestamps`, aligned to the step (daily steps start at midnight UTC)
+    and ending with the first window that reaches the last transaction.
+    Returns (starts, ends, row lo, row hi); empty windows are dropped.
+    """
+
+    if window_hours <= 0 or step_hours <= 0:
+        raise ValueError("window_hours and step_hours must be positive")
+    if not len(timestamps):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty
+
+    window = int(window_hours * HOUR_NS)
+    step = int(step_hours * HOUR_NS)
+
+    first = timestamps[0] // step * step
+    last = timestamps[-1]
+    count = max(0, -(-(last - first - window + 1) // step)) + 1
+    if count > MAX_WINDOWS:
+        raise ValueError(
+            f"{count} windows of {window_hours}h every {step_hours}h; at most {MAX_WINDOWS} allowed"
+        )
+
+    starts = first + step * np.arange(count, dtype=np.int64)
+    ends = starts + window
+
+    lo = np.searchsorted(timestamps, starts, side="left")
+    hi = np.searchsorted(timestamps, ends, side="left")
+    keep = hi > lo
+
+    return starts[keep], ends[keep], lo[keep], hi[keep]
+
+
+def _window_result(src, dst, timestamps, amounts, lo, detectors, budget, parallel, allowlist):
+    """
+    Detection and scoring of one window's (time-sorted) transactions on its
+    own graph. Accounts are global indices throughout; the window graph's
+    "IDs" are those indices and its transaction IDs are sorted row numbers.
+    Hubs are pruned per window when `allowlist` (global indices) is a set.
+    """
+
+    start = time.perf_counter()
+    n = len(src)
+
+    accounts, codes = np.unique(np.concatenate((src, dst)), return_inverse=True)
+    codes = codes.astype(np.int32)
+    G = graph_from_arrays(accounts, codes[:n], codes[n:], timestamps, amounts, np.arange(lo, lo + n))
+
+    detectors = resolve_detectors(detectors)
+    df = G.transactions() if any("transactions" in d.inputs for d in detectors) else None
+
+    pruned, pruning = prune_graph(G, allowlist) if allowlist is not None else (None, None)
+
+    return {
+        **_detection_result(G, df, detectors, budget, parallel, pruned, accounts),
+        "accounts": len(accounts),
+        "hub_pruning": pruning,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _detection_result(G, df, detectors, budget, parallel, pruned, accounts):
+    # Rings and scored accounts of `detectors` on G, as indices into
+    # `accounts` (the global index of each of G's accounts)
+    accounts = accounts.astype(np.int64, copy=False)
+    results, timings, timed_out = detect(G, df, detectors, budget, parallel, pruned)
+    scores = score_accounts(G, results)
+    flagged = np.flatnonzero(scores.score > 0)
+
+    return {
+        "rings": [
+            {**ring, "members": accounts[ring["members"]]} for ring in rings_from_findings(results)
+        ],
+        "scored": accounts[flagged],
+        "score": scores.score[flagged],
+        "patterns": scores.patterns[flagged],
+        "pattern_types": scores.pattern_types,
+        "detector_timings": timings,
+        "timed_out": timed_out,
+    }
+
+
+def _pool_window(descriptors, lo, hi, detectors, budget, allowlist):
+    # Pool entry point: map the sorted columns, analyse rows [lo, hi)
+    blocks = []
+    arrays = {}
+
+    for name, (shm_name, shape, dtype) in descriptors.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+    try:
+        # Windows already run side by side; detection inside one stays serial
+        return _window_result(
+            *(arrays[name][lo:hi] for name in ("src", "dst", "timestamps", "amounts")),
+            lo,
+            detectors,
+            budget,
+            False,
+            allowlist,
+        )
+    finally:
+        arrays.clear()
+        for shm in blocks:
+            shm.close()
+
+
+# -------------------------
+# Merge
+# -------------------------
+def _timestamp(ns):
+    return str(pd.Timestamp(int(ns)))
+
+
+def _pattern_bits(result, scores):
+    # A result's pattern bitmasks over scores.pattern_types (extended)
+    patterns = np.zeros(len(result["patterns"]), dtype=np.uint64)
+    for bit, pattern_type in enumerate(result["pattern_types"]):
+        if pattern_type not in scores.pattern_types:
+            scores.pattern_types.append(pattern_type)
+        to_bit = np.uint64(scores.pattern_types.index(pattern_type))
+        patterns |= ((result["patterns"] >> np.uint64(bit)) & np.uint64(1)) << to_bit
+    return patterns
+
+
+def _merge_scores(G, windows, history):
+    # Each account keeps its highest-scoring window (score and patterns),
+    # plus what the whole-history detectors gave it
+    scores = AccountScores(
+        G.accounts,
+        np.zeros(G.number_of_nodes(), dtype=np.float64),
+        np.zeros(G.number_of_nodes(), dtype=np.uint64),
+        [],
+    )
+
+    for window in windows:
+        patterns = _pattern_bits(window, scores)
+        better = window["score"] > scores.score[window["scored"]]
+        scores.score[window["scored"][better]] = window["score"][better]
+        scores.patterns[window["scored"][better]] = patterns[better]
+
+    if history is not None:
+        scores.score[history["scored"]] += history["score"]
+        scores.patterns[history["scored"]] |= _pattern_bits(history, scores)
+        np.minimum(scores.score, MAX_SCORE, out=scores.score)
+
+    return scores
+
+
+def _merge_rings(windows, starts, ends, history):
+    # Rings in window order; a member set seen again extends its ring's
+    # window_end and window count. Rings of the whole-history detectors
+    # follow, spanning all windows.
+    rings, seen = [], {}
+
+    for window, start, end in zip(windows, starts.tolist(), ends.tolist()):
+        for ring in window["rings"]:
+            key = ring["members"].tobytes()
+            merged = seen.get(key)
+            if merged is None:
+                merged = {**ring, "window_start": _timestamp(start), "windows": 0}
+                seen[key] = merged
+                rings.append(merged)
+            merged["window_end"] = _timestamp(end)
+            merged["windows"] += 1
+
+    for ring in history["rings"] if history is not None else []:
+        key = ring["members"].tobytes()
+        if key not in seen:
+            seen[key] = ring
+            rings.append(
+                {**ring, "window_start": _timestamp(starts[0]), "window_end": _timestamp(ends[-1])}
+            )
+
+    for i, ring in enumerate(rings, start=1):
+        ring["ring_id"] = f"RING_{i:03d}"
+
+    return rings
+
+
+def analyze_windows(
+    df,
+    G,
+    window_hours=ANALYSIS_WINDOW_HOURS,
+    step_hours=ANALYSIS_WINDOW_STEP_HOURS,
+    start_time=None,
+    detectors=None,
+    budget=None,
+    recorder=None,
+    workers=WINDOW_WORKERS,
+    consolidate=None,
+    prune_hubs=None,
+):
+    """
+    analyze over overlapping time windows instead of the whole history:
+    every `step_hours` a window of `window_hours` gets its own graph,
+    detection (`budget` applies per window) and scores, by a shared pool of
+    `workers` processes. Transactions are sorted by time once; each window is a
+    slice of the sorted columns, which pool workers map from shared memory.
+    Detectors that are not `windowed` (shells) run once on G instead.
+
+    Rings are merged across windows by member set and carry the start of
+    the first and the end of the last window that found them; an account
+    keeps its highest-scoring window, plus its whole-history score. The
+    summary lists every window, with its hub_pruning report when hubs are
+    pruned (per window).
+    """
+
+    on_stage = stage_callback(None, recorder)
+    start_time = start_time or time.time()
+
+    detectors = resolve_detectors(detectors)
+    windowed = [d.name for d in detectors if d.windowed]
+    history = [d for d in detectors if not d.windowed]
+    if not windowed:
+        raise ValueError(
+            f"{', '.join(d.name for d in history)} only run over the whole history; "
+            "windowed analysis needs another detector"
+        )
+
+    on_stage("detection")
+    order = np.argsort(G.txn_timestamps, kind="stable")
+    src, dst = G.transaction_endpoints()
+    columns = {
+        "src": src[order],
+        "dst": dst[order],
+        "timestamps": G.txn_timestamps[order],
+        "amounts": G.txn_amounts[order],
+    }
+    del src, dst, order
+
+    starts, ends, lo, hi = window_bounds(columns["timestamps"], window_hours, step_hours)
+    bounds = list(zip(lo.tolist(), hi.tolist()))
+
+    if prune_hubs is None:
+        prune_hubs = PRUNE_HUBS
+
+    # Window graphs know accounts by global index
+    allowlist = None
+    if prune_hubs:
+        positions = pd.Index(G.accounts).get_indexer(list(load_allowlist()))
+        allowlist = set(positions[positions >= 0].tolist())
+
+    if workers > 1 and len(bounds) > 1:
+        shared = SharedArrays(columns)
+        try:
+            executor = _get_executor(workers)
+            futures = [
+                executor.submit(_pool_window, shared.descriptors, a, b, windowed, budget, allowlist)
+                for a, b in bounds
+            ]
+            windows = [future.result() for future in futures]
+        finally:
+            shared.release()
+    else:
+        windows = [
+            _window_result(
+                *(columns[name][a:b] for name in ("src", "dst", "timestamps", "amounts")),
+                a,
+                windowed,
+                budget,
+                None,
+                allowlist,
+            )
+            for a, b in bounds
+        ]
+
+    whole = None
+    if history:
+        pruned = prune_graph(G)[0] if prune_hubs else None
+        needs_df = any("transactions" in d.inputs for d in history)
+        whole = _detection_result(
+            G,
+            df if needs_df else None,
+            history,
+            budget,
+            None,
+            pruned,
+            np.arange(G.number_of_nodes()),
+        )
+
+    on_stage("scoring")
+    scores = _merge_scores(G, windows, whole)
+
+    timings, timed_out = {}, []
+    for window in windows + ([whole] if whole else []):
+        for name, seconds in window["detector_timings"].items():
+            timings[name] = round(timings.get(name, 0.0) + seconds, 3)
+        timed_out.extend(name for name in window["timed_out"] if name not in timed_out)
+
+    on_stage("format")
+    response = format_response(
+        scores,
+        G,
+        time.time() - start_time,
+        detector_timings=timings,
+        rings=final_rings(_merge_rings(windows, starts, ends, whole), consolidate),
+    )
+    count_response(recorder, df, G, response)
+
+    response["summary"]["window_hours"] = window_hours
+    response["summary"]["step_hours"] = step_hours
+    response["summary"]["windows"] = [
+        {
+            "start": _timestamp(start),
+            "end": _timestamp(end),
+            "transactions": b - a,
+            "accounts": window["accounts"],
+            "fraud_rings": len(window["rings"]),
+            "seconds": window["seconds"],
+            **({"hub_pruning": window["hub_pruning"]} if window["hub_pruning"] else {}),
+        }
+        for start, end, (a, b), window in zip(starts.tolist(), ends.tolist(), bounds, windows)
+    ]
+
+    return with_timeouts(response, timed_out)
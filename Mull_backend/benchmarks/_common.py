@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BACKEND_DIR = os.path.join(ROOT_DIR, "backend")
+DATASET_10K = os.path.join(ROOT_DIR, "test_10000_transactions.csv")
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)  # generate_dataset
+
+
+class UploadedFile:
+    # Minimal stand-in for fastapi.UploadFile (parse_csv reads `.file`)
+    def __init__(self, path):
+        self.filename = os.path.basename(path)
+        self.file = open(path, "rb")
+
+
+def _proc_status_mib(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def peak_rss_mib():
+    # VmHWM resets on exec; ru_maxrss would inherit the parent's peak
+    try:
+        return _proc_status_mib("VmHWM")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rss_mib():
+    try:
+        return _proc_status_mib("VmRSS")
+    except OSError:
+        return 0.0
+
+
+def reset_peak_rss():
+    # Linux: restart VmHWM from the current RSS so the next peak is a
+    # single stage's own. Returns False where that is not supported.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def timed(label, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:>10.3f}s")
+    return result, elapsed
+
+
+def random_transactions(num_rows, num_accounts, seed=0, hub_fraction=0.0):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+
+    senders = rng.integers(0, num_accounts, num_rows)
+    receivers = rng.integers(0, num_accounts, num_rows)
+
+    if hub_fraction:
+        # Route a share of the traffic through a handful of hub accounts
+        hubs = rng.integers(0, max(1, num_accounts // 1000), num_rows)
+        mask = rng.random(num_rows) < hub_fraction
+        receivers[mask] = hubs[mask]
+
+    return pd.DataFrame(
+        {
+            "transaction_id": np.char.add("TXN", np.arange(num_rows).astype(str)),
+            "sender_id": np.char.add("ACC_", senders.astype(str)).astype(object),
+            "receiver_id": np.char.add("ACC_", receivers.astype(str)).astype(object),
+            "amount": rng.uniform(10, 20000, num_rows).round(2),
+            "timestamp": pd.Timestamp("2026-01-01")
+            + pd.to_timedelta(rng.integers(0, 30 * 86400, num_rows), unit="s"),
+        }
+    )
+
+
+def legacy_networkx_graph(df):
+    # The DiGraph the pre-CSR build_graph produced (last transaction wins)
+    import networkx as nx
+
+    G = nx.DiGraph()
+    G.add_edges_from(zip(df["sender_id"], df["receiver_id"]))
+    return G
@@ -0,0 +1,72 @@
+"""
+Cycle search benchmark.
+
+Compares the bounded enumerator in services/cycle_detector against the
+previous `list(nx.simple_cycles(G))` + length filter on the 10k dataset,
+then times the bounded search alone on large synthetic graphs (the
+unbounded search does not finish on those) next to the temporal engine,
+which only follows time-ordered transfers within CYCLE_WINDOW_HOURS.
+
+    python benchmarks/bench_cycles.py --edges 1000000
+"""
+import argparse
+
+import _common  # noqa: F401  (puts backend/ on sys.path)
+from _common import (
+    DATASET_10K,
+    UploadedFile,
+    legacy_networkx_graph,
+    random_transactions,
+    timed,
+)
+
+import networkx as nx
+
+from app.config import CYCLE_MIN_LENGTH, CYCLE_MAX_LENGTH
+from app.services.csv_parser import parse_csv
+from app.services.graph_builder import build_graph
+from app.services.cycle_detector import iter_cycle_indices, iter_temporal_cycle_indices
+
+
+def bounded_cycles(G):
+    return list(iter_cycle_indices(G))
+
+
+def legacy_detect_cycles(G):
+    return [
+        cycle
+        for cycle in nx.simple_cycles(G)
+        if CYCLE_MIN_LENGTH <= len(cycle) <= CYCLE_MAX_LENGTH
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--nodes", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print("== 10k generator dataset")
+    df = parse_csv(UploadedFile(DATASET_10K))
+    G = build_graph(df)
+    legacy, _ = timed(
+        "nx.simple_cycles + filter", legacy_detect_cycles, legacy_networkx_graph(df)
+    )
+    bounded, _ = timed("bounded enumerator", bounded_cycles, G)
+    print(f"cycles: legacy={len(legacy)} bounded={len(bounded)}")
+
+    for hub_fraction in (0.0, 0.05):
+        print(
+            f"== synthetic: {args.nodes} accounts, {args.edges} transactions, "
+            f"hub_fraction={hub_fraction}"
+        )
+        df = random_transactions(args.edges, args.nodes, args.seed, hub_fraction)
+        G = build_graph(df)
+        cycles, _ = timed("bounded enumerator", bounded_cycles, G)
+        temporal, _ = timed("temporal enumerator", lambda: list(iter_temporal_cycle_indices(G)))
+        print(f"cycles: static={len(cycles)} temporal={len(temporal)}")
+
+
+if __name__ == "__main__":
+    main()
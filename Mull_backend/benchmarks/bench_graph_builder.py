@@ -0,0 +1,61 @@
+"""
+Graph construction benchmark: the previous iterrows() + nx.DiGraph builder
+versus the columnar CSR TransactionGraph, wall time and peak traced memory.
+
+    python benchmarks/bench_graph_builder.py --rows 1000000
+"""
+import argparse
+import tracemalloc
+
+import _common  # noqa: F401  (puts backend/ on sys.path)
+from _common import random_transactions, timed
+
+import networkx as nx
+
+from app.services.graph_builder import build_graph
+
+
+def legacy_build_graph(df):
+    G = nx.DiGraph()
+
+    for _, row in df.iterrows():
+        G.add_edge(
+            row["sender_id"],
+            row["receiver_id"],
+            amount=row["amount"],
+            timestamp=row["timestamp"],
+            transaction_id=row["transaction_id"]
+        )
+
+    return G
+
+
+def measure(label, fn, df):
+    tracemalloc.start()
+    result, _ = timed(label, fn, df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'':<40} peak {peak / 2**20:>8.1f} MiB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    df = random_transactions(args.rows, args.accounts)
+    print(f"== {args.rows} transactions, {args.accounts} accounts")
+
+    if not args.skip_legacy:
+        G = measure("legacy iterrows + nx.DiGraph", legacy_build_graph, df)
+        print(f"edges kept: {G.number_of_edges()}")
+
+    G = measure("columnar CSR build_graph", build_graph, df)
+    print(f"edges: {G.number_of_edges()}  transactions: {len(G.txn_ids)}")
+
+
+if __name__ == "__main__":
+    main()
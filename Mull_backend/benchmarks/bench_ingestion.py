@@ -0,0 +1,105 @@
+"""
+Ingestion benchmark: whole-file parse_csv + build_graph versus chunked
+iter_csv_chunks -> GraphBuilder (C and pyarrow engines), then the same
+transactions as gzip/zstd CSV, Parquet and Feather through input_reader
+(whole-file and chunked, read from a memory-mapped local path).
+
+Each mode runs in a fresh subprocess so the reported peak RSS is its own.
+
+    python benchmarks/bench_ingestion.py --rows 2000000
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import _common  # noqa: F401  (puts backend/ on sys.path)
+from _common import peak_rss_mib, random_transactions
+
+import pyarrow as pa
+
+MODES = ["full", "chunked-c", "chunked-pyarrow"]
+FORMATS = ["csv.gz", "csv.zst", "parquet", "feather"]
+FORMAT_MODES = ["full", "chunked"]
+COMPRESSED = {"csv.gz": "gzip", "csv.zst": "zstd"}
+
+
+def run_mode(mode, path, chunksize, fmt="csv"):
+    from app.services.csv_parser import parse_csv, iter_csv_chunks
+    from app.services.input_reader import read_transactions, iter_transaction_chunks
+    from app.services.graph_builder import build_graph, build_graph_from_chunks
+
+    start = time.perf_counter()
+
+    if fmt != "csv":
+        if mode == "full":
+            G = build_graph(read_transactions(path))
+        else:
+            G = build_graph_from_chunks(iter_transaction_chunks(path, chunksize))
+        mode = f"{mode} {fmt}"
+    else:
+        with open(path, "rb") as f:
+            if mode == "full":
+                G = build_graph(parse_csv(f))
+            else:
+                engine = mode.split("-", 1)[1]
+                G = build_graph_from_chunks(iter_csv_chunks(f, chunksize, engine))
+
+    elapsed = time.perf_counter() - start
+    peak_mib = peak_rss_mib()
+    size_mib = os.path.getsize(path) / 2**20
+
+    print(
+        f"{mode:<18} {elapsed:>8.2f}s  {size_mib / elapsed:>8.1f} MiB/s  "
+        f"peak RSS {peak_mib:>8.1f} MiB  ({len(G.txn_ids)} rows)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--accounts", type=int, default=200_000)
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--mode", choices=MODES + FORMAT_MODES)
+    parser.add_argument("--format", default="csv", choices=["csv"] + FORMATS)
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.path, args.chunksize, args.format)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transactions.csv")
+        df = random_transactions(args.rows, args.accounts)
+
+        # Binary formats keep the typed timestamp column
+        paths = {fmt: os.path.join(tmp, f"transactions.{fmt}") for fmt in FORMATS}
+        df.to_parquet(paths["parquet"], index=False)
+        df.to_feather(paths["feather"])
+
+        df["timestamp"] = df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        df.to_csv(path, index=False)
+        del df
+
+        for fmt in COMPRESSED:
+            with open(path, "rb") as src, pa.output_stream(paths[fmt], compression=COMPRESSED[fmt]) as dst:
+                shutil.copyfileobj(src, dst)
+
+        print(f"== {args.rows} rows, {os.path.getsize(path) / 2**20:.1f} MiB CSV")
+
+        runs = [(mode, "csv", path) for mode in MODES]
+        runs += [(mode, fmt, paths[fmt]) for fmt in FORMATS for mode in FORMAT_MODES]
+
+        for mode, fmt, source in runs:
+            cmd = [sys.executable, __file__, "--mode", mode, "--format", fmt, "--path", source]
+            if args.chunksize:
+                cmd += ["--chunksize", str(args.chunksize)]
+            subprocess.run(cmd, check=False)
+
+
+if __name__ == "__main__":
+    main()
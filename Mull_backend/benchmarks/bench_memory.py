@@ -0,0 +1,97 @@
+"""
+Memory benchmark: the whole /upload pipeline (parse, graph, detection,
+scoring, format) on one large CSV, with per-stage peak RSS, for
+
+    strings   frame keeps one Python string per account cell (no interning)
+    interned  load_transactions: account columns become categoricals over
+              G.accounts, detectors and rings carry int32 indices
+    chunked   chunked ingestion (compact frame rebuilt from the graph)
+
+Each mode runs in a fresh subprocess so its peaks are its own.
+
+    python benchmarks/bench_memory.py --rows 5000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import _common  # noqa: F401  (puts backend/ on sys.path)
+from _common import peak_rss_mib, rss_mib, random_transactions
+
+MODES = ["strings", "interned", "chunked"]
+
+
+def _column_mib(df):
+    return df[["sender_id", "receiver_id"]].memory_usage(deep=True, index=False).sum() / 2**20
+
+
+def run_mode(mode, path, detectors):
+    from app.services.graph_builder import build_graph
+    from app.services.input_reader import read_transactions
+    from app.services.metrics import StageRecorder
+    from app.services.pipeline import analyze, load_transactions
+
+    recorder = StageRecorder()
+    start = time.perf_counter()
+
+    if mode == "strings":
+        recorder.stage("parse")
+        df = read_transactions(path)
+        recorder.stage("build_graph")
+        G = build_graph(df)
+    else:
+        df, G = load_transactions(path, chunked=mode == "chunked", recorder=recorder)
+
+    columns = _column_mib(df)
+    response = analyze(df, G, detectors=detectors, recorder=recorder)
+    elapsed = time.perf_counter() - start
+    report = recorder.finish()
+
+    # StageRecorder restarts the peak per stage, so the run's peak is the
+    # highest stage peak
+    peaks = {name: stage["peak_rss_mib"] for name, stage in report["stages"].items()}
+    stages = "  ".join(f"{name} {peak:.0f}" for name, peak in peaks.items())
+    print(
+        f"{mode:<9} {elapsed:>7.2f}s  ID columns {columns:>7.1f} MiB  "
+        f"RSS after {rss_mib():>7.1f} MiB  peak {max(max(peaks.values()), peak_rss_mib()):>7.1f} MiB  "
+        f"({response['summary']['fraud_rings_detected']} rings)"
+    )
+    print(f"{'':<9} stage peaks (MiB): {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--detectors", help="comma-separated registry names")
+    parser.add_argument("--mode", choices=MODES)
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    detectors = args.detectors.split(",") if args.detectors else None
+
+    if args.mode:
+        run_mode(args.mode, args.path, detectors)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transactions.csv")
+        df = random_transactions(args.rows, args.accounts)
+        df["timestamp"] = df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+        df.to_csv(path, index=False)
+        del df
+
+        print(f"== {args.rows} rows, {args.accounts} accounts, {os.path.getsize(path) / 2**20:.1f} MiB CSV")
+
+        for mode in MODES:
+            cmd = [sys.executable, __file__, "--mode", mode, "--path", path]
+            if args.detectors:
+                cmd += ["--detectors", args.detectors]
+            subprocess.run(cmd, check=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Incremental session benchmark.
+
+Feeds a time-ordered synthetic history to an AnalysisSession in fixed-size
+batches and prints, every few batches, the cost of one append against a
+full rebuild + detection over the history so far. The append cost should
+stay flat while the full recompute grows with the history.
+
+    python benchmarks/bench_sessions.py --batches 40 --batch-size 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import _common  # noqa: F401  (puts backend/ on sys.path)
+from _common import random_transactions
+
+from app.services.graph_builder import build_graph
+from app.services.detection_orchestrator import detect
+from app.services.detector_registry import resolve_detectors
+from app.services.session_manager import AnalysisSession
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batches", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--nodes", type=int, default=200_000)
+    parser.add_argument("--every", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    total = args.batches * args.batch_size
+    df = random_transactions(total, args.nodes, args.seed)
+    df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    session = AnalysisSession("bench")
+    # The session's detectors, for the full recompute
+    detectors = resolve_detectors(["cycles", "smurfing", "shells"])
+
+    print(f"{'batch':>6} {'history':>10} {'append':>10} {'response':>10} {'full':>10}")
+
+    for batch in range(args.batches):
+        end = (batch + 1) * args.batch_size
+        rows = df.iloc[batch * args.batch_size:end]
+
+        start = time.perf_counter()
+        session.add_transactions(rows)
+        append = time.perf_counter() - start
+
+        start = time.perf_counter()
+        session.response()
+        response = time.perf_counter() - start
+
+        if batch % args.every and batch != args.batches - 1:
+            continue
+
+        start = time.perf_counter()
+        detect(build_graph(df.iloc[:end]), None, detectors, parallel=False)
+        full = time.perf_counter() - start
+
+        print(
+            f"{batch + 1:>6} {end:>10} {append:>9.3f}s {response:>9.3f}s {full:>9.3f}s"
+        )
+
+    print(f"cycles={len(session.cycles)} smurfing_hubs={len(session.smurf_peers)} "
+          f"shell_components={len(session.shells)}")
+
+
+if __name__ == "__main__":
+    main()
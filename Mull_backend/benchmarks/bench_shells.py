@@ -0,0 +1,79 @@
+"""
+Shell detection benchmark.
+
+Times and measures peak traced memory (tracemalloc, separate run) of the previous
+networkx detector (degree filter, subgraph, to_undirected, connected
+components), the CSR component detector and the directed chain detector on
+a synthetic graph. The networkx DiGraph build is reported separately.
+
+    python benchmarks/bench_shells.py --edges 1000000 --nodes 1000000
+"""
+import argparse
+import tracemalloc
+
+import networkx as nx
+
+import _common  # noqa: F401  (puts backend/ on sys.path)
+from _common import legacy_networkx_graph, random_transactions, timed
+
+from app.config import SHELL_MAX_DEGREE
+from app.services.graph_builder import build_graph
+from app.services.shell_detector import shell_components, shell_chains
+
+
+def legacy_detect_shells(G):
+    shell_nodes = {node for node in G.nodes() if G.degree(node) <= SHELL_MAX_DEGREE}
+    subgraph = G.subgraph(shell_nodes)
+    return [
+        list(component)
+        for component in nx.connected_components(subgraph.to_undirected())
+        if len(component) >= 3
+    ]
+
+
+def measured(label, fn, *args):
+    # Timed untraced (tracing slows Python loops), then re-run for memory
+    result, _ = timed(label, fn, *args)
+
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{'':<40} peak {peak / 1e6:>8.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    df = random_transactions(args.edges, args.nodes, args.seed)
+    G = build_graph(df)
+    print(f"== {G.number_of_nodes()} accounts, {G.number_of_edges()} links")
+
+    if not args.skip_legacy:
+        legacy_graph, _ = timed("networkx DiGraph build", legacy_networkx_graph, df)
+        legacy = measured("networkx components (previous)", legacy_detect_shells, legacy_graph)
+        print(f"{'':<40} {len(legacy)} groups")
+        del legacy_graph
+
+    components = measured("CSR components", shell_components, G.indptr, G.indices)
+    print(f"{'':<40} {len(components)} groups")
+
+    chains = measured(
+        "directed chains",
+        shell_chains,
+        G.indptr,
+        G.indices,
+        G.edge_first_ts,
+        G.edge_last_ts,
+    )
+    print(f"{'':<40} {len(chains)} chains")
+
+
+if __name__ == "__main__":
+    main()
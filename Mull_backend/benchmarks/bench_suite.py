@@ -0,0 +1,264 @@
+"""
+Stage benchmark and detection-quality suite.
+
+Generates a dataset with planted rings (generate_dataset.py) or loads one
+with its .truth.json, writes it as CSV, then times every stage:
+parse_csv, build_graph, each selected detector, score_accounts,
+format_response and a full /upload through TestClient. Each stage reports
+wall time and peak RSS (VmHWM is reset per stage on Linux).
+
+The /upload result is checked against the ground truth: per pattern ring
+recall and precision (a ring matches at Jaccard >= --match) and account
+precision/recall. The run fails when a ring recall is below --min-recall,
+or when a quality metric (or, with --max-slowdown, a stage time) regresses
+against a --baseline saved earlier with --save, so speedups cannot
+silently change what gets detected.
+
+    python benchmarks/bench_suite.py --rows 1000000 --accounts 200000 --save base.json
+    python benchmarks/bench_suite.py --rows 1000000 --accounts 200000 --baseline base.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import _common  # noqa: F401  (puts backend/ on sys.path)
+from _common import peak_rss_mib, reset_peak_rss, rss_mib
+
+from fastapi.testclient import TestClient
+
+from generate_dataset import generate, write_dataset, truth_path
+from app.main import app
+from app.services.csv_parser import parse_csv
+from app.services.graph_builder import build_graph
+from app.services.detector_registry import (
+    DETECTORS,
+    parse_detector_names,
+    resolve_detectors,
+)
+from app.services.detection_orchestrator import run_detector
+from app.services.scoring_engine import score_accounts
+from app.services.ring_manager import rings_from_findings
+from app.services.json_formatter import format_response
+from app.services.result_cache import result_cache
+
+
+def stage(stages, name, fn, *args):
+    reset_peak_rss()
+    before = rss_mib()
+
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+
+    peak = peak_rss_mib()
+    stages[name] = {
+        "seconds": round(elapsed, 3),
+        "peak_rss_mib": round(peak, 1),
+        "rss_growth_mib": round(peak - before, 1),
+    }
+    print(f"{name:<32} {elapsed:>9.3f}s  peak RSS {peak:>9.1f} MiB (+{peak - before:.1f})")
+    return result
+
+
+# -------------------------
+# Detection quality
+# -------------------------
+def _ratio(hits, total):
+    return round(hits / total, 4) if total else 1.0
+
+
+def ring_quality(planted, detected, match):
+    """
+    Planted rings recalled by a detected ring of the same pattern type
+    (Jaccard >= match), and detected rings that match a planted one.
+    Candidates are found through shared accounts, not all pairs.
+    """
+
+    owners = {}
+    for i, ring in enumerate(planted):
+        for acc in ring:
+            owners.setdefault(acc, []).append(i)
+
+    recalled = set()
+    matched = 0
+
+    for ring in detected:
+        candidates = {i for acc in ring for i in owners.get(acc, ())}
+        hits = [
+            i for i in candidates
+            if len(ring & planted[i]) / len(ring | planted[i]) >= match
+        ]
+        recalled.update(hits)
+        matched += bool(hits)
+
+    return {
+        "planted": len(planted),
+        "detected": len(detected),
+        "recall": _ratio(len(recalled), len(planted)),
+        "precision": _ratio(matched, len(detected)),
+    }
+
+
+def quality(response, truth, detectors, match):
+    patterns = [detector.pattern_type for detector in detectors]
+    truth = [ring for ring in truth if ring["pattern_type"] in patterns]
+
+    report = {}
+    for pattern in patterns:
+        report[pattern] = ring_quality(
+            [set(r["members"]) for r in truth if r["pattern_type"] == pattern],
+            [set(r["member_accounts"]) for r in response["fraud_rings"] if r["pattern_type"] == pattern],
+            match,
+        )
+
+    flagged = {acc["account_id"] for acc in response["suspicious_accounts"]}
+    members = {acc for ring in truth for acc in ring["members"]}
+    expected = {acc for ring in truth for acc in ring["scored"]}
+
+    report["accounts"] = {
+        "flagged": len(flagged),
+        "expected": len(expected),
+        "recall": _ratio(len(flagged & expected), len(expected)),
+        "precision": _ratio(len(flagged & members), len(flagged)),
+    }
+
+    return report
+
+
+def regressions(run, baseline, tolerance, max_slowdown):
+    found = []
+
+    for name, metrics in baseline["quality"].items():
+        for key in ("recall", "precision"):
+            now = run["quality"].get(name, {}).get(key)
+            if now is not None and now < metrics[key] - tolerance:
+                found.append(f"{name} {key} {metrics[key]} -> {now}")
+
+    if max_slowdown:
+        for name, timing in baseline["stages"].items():
+            now = run["stages"].get(name)
+            if now and timing["seconds"] > 0.05 and now["seconds"] > timing["seconds"] * max_slowdown:
+                found.append(f"{name} {timing['seconds']}s -> {now['seconds']}s")
+
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", help="existing CSV with a .truth.json next to it")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--accounts", type=int, default=50_000)
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--smurfing", type=int, default=100)
+    parser.add_argument("--shells", type=int, default=200)
+    parser.add_argument("--pass-through", type=int, default=100)
+    parser.add_argument("--round-amounts", type=int, default=100)
+    parser.add_argument("--hubs", type=int, default=20)
+    parser.add_argument("--hub-fraction", type=float, default=0.02)
+    parser.add_argument("--noise", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--detectors", help="comma-separated names (default: all registered)")
+    parser.add_argument("--match", type=float, default=0.5, help="Jaccard for a ring match")
+    parser.add_argument("--min-recall", type=float, default=0.9)
+    parser.add_argument("--baseline", help="results JSON from an earlier --save")
+    parser.add_argument("--tolerance", type=float, default=0.005)
+    parser.add_argument("--max-slowdown", type=float, help="e.g. 1.5: fail stages 50%% slower")
+    parser.add_argument("--save", help="write this run's results JSON here")
+    args = parser.parse_args()
+
+    detectors = resolve_detectors(parse_detector_names(args.detectors) or list(DETECTORS))
+    names = ",".join(detector.name for detector in detectors)
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.input:
+            path = args.input
+            with open(truth_path(path)) as f:
+                truth = json.load(f)["rings"]
+        else:
+            df, truth = stage(
+                stages,
+                "generate",
+                generate,
+                args.rows,
+                args.accounts,
+                args.cycles,
+                args.smurfing,
+                args.shells,
+                args.pass_through,
+                args.round_amounts,
+                args.hubs,
+                args.hub_fraction,
+                args.noise,
+                args.seed,
+            )
+            path = os.path.join(tmp, "transactions.csv")
+            stage(stages, "write_csv", write_dataset, df, path)
+            del df
+
+        print(f"== {os.path.getsize(path) / 2**20:.1f} MiB CSV, {len(truth)} planted rings")
+
+        with open(path, "rb") as f:
+            df = stage(stages, "parse_csv", parse_csv, f)
+        G = stage(stages, "build_graph", build_graph, df)
+
+        inputs = {"graph": G, "transactions": df}
+        results = [
+            (detector, stage(stages, f"detect:{detector.name}", lambda d=detector: list(run_detector(d, inputs))))
+            for detector in detectors
+        ]
+
+        scores = stage(stages, "score_accounts", score_accounts, G, results)
+        stage(
+            stages,
+            "format_response",
+            lambda: format_response(scores, G, 0.0, rings=rings_from_findings(results)),
+        )
+        del df, G, inputs, results, scores
+
+        result_cache.clear()
+        client = TestClient(app)
+
+        def upload():
+            with open(path, "rb") as f:
+                return client.post(
+                    f"/upload?transactions=none&detectors={names}",
+                    files={"file": ("transactions.csv", f, "text/csv")},
+                )
+
+        response = stage(stages, "upload (TestClient)", upload)
+        response.raise_for_status()
+
+    report = quality(response.json(), truth, detectors, args.match)
+
+    print("== detection quality")
+    for name, metrics in report.items():
+        print(f"{name:<16} " + "  ".join(f"{key} {value}" for key, value in metrics.items()))
+
+    run = {"parameters": vars(args), "stages": stages, "quality": report}
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(run, f, indent=2)
+
+    failures = [
+        f"{name} ring recall {metrics['recall']} < {args.min_recall}"
+        for name, metrics in report.items()
+        if name != "accounts" and metrics["planted"] and metrics["recall"] < args.min_recall
+    ]
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += regressions(run, json.load(f), args.tolerance, args.max_slowdown)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
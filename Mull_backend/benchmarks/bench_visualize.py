@@ -0,0 +1,54 @@
+"""
+/visualize rendering benchmark.
+
+Builds a synthetic graph, runs the analysis and times each rendering step
+for the level-of-detail view: k-hop neighbourhood + layout (build_view),
+pyvis HTML generation in memory, and the JSON data payload. The previous
+renderer pushed every account into pyvis with client-side physics; the
+node/edge counts it would have drawn are printed for comparison.
+
+    python benchmarks/bench_visualize.py --nodes 100000 --edges 300000
+"""
+import argparse
+
+import _common  # noqa: F401  (puts backend/ on sys.path)
+from _common import random_transactions, timed
+
+from app.services.graph_builder import build_graph
+from app.services.pipeline import analyze
+from app.services.graph_visualizer import build_view, generate_interactive_graph
+from app.services.response_encoder import encode_json
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--edges", type=int, default=300_000)
+    parser.add_argument("--hops", type=int, default=1)
+    parser.add_argument("--max-nodes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    df = random_transactions(args.edges, args.nodes, args.seed, hub_fraction=0.02)
+    G = build_graph(df)
+    response, _ = timed("analysis", analyze, df, G)
+
+    print(
+        f"full graph: {G.number_of_nodes()} accounts, {G.number_of_edges()} links, "
+        f"{len(response['fraud_rings'])} rings"
+    )
+
+    view, build = timed(
+        "build_view (k-hop + layout)", build_view, G, response, args.hops, args.max_nodes
+    )
+    net, render = timed("pyvis network", generate_interactive_graph, view)
+    html, generate = timed("generate_html", net.generate_html)
+    payload, encode = timed("JSON data payload", encode_json, view)
+
+    print(f"view: {view['summary']}")
+    print(f"html: {len(html) / 1e6:.1f} MB, data: {len(payload) / 1e6:.1f} MB")
+    print(f"render total: {build + render + generate:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.config import CYCLE_MIN_LENGTH, CYCLE_MAX_LENGTH
+from app.services.graph_builder import build_graph
+from app.services.cycle_detector import (
+    iter_cycle_indices,
+    cycle_parts,
+    iter_cycle_part_results,
+    merge_cycle_parts,
+)
+
+
+def random_transactions(nodes, edges, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "transaction_id": [f"T{i}" for i in range(edges)],
+            "sender_id": [f"A{i}" for i in rng.integers(0, nodes, edges)],
+            "receiver_id": [f"A{i}" for i in rng.integers(0, nodes, edges)],
+            "amount": rng.uniform(10, 1000, edges).round(2),
+            "timestamp": pd.Timestamp("2026-01-01")
+            + pd.to_timedelta(rng.integers(0, 30 * 86400, edges), unit="s"),
+        }
+    )
+    return df[df["sender_id"] != df["receiver_id"]].reset_index(drop=True)
+
+
+def canonical(cycle):
+    low = cycle.index(min(cycle))
+    return tuple(cycle[low:] + cycle[:low])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("nodes,edges", [(30, 90), (200, 500), (1000, 3000)])
+def test_cycles_match_networkx(seed, nodes, edges):
+    df = random_transactions(nodes, edges, seed)
+    G = build_graph(df)
+
+    reference = nx.DiGraph()
+    reference.add_edges_from(zip(df["sender_id"], df["receiver_id"]))
+    expected = {
+        canonical([G.index[account] for account in cycle])
+        for cycle in nx.simple_cycles(reference, length_bound=CYCLE_MAX_LENGTH)
+        if len(cycle) >= CYCLE_MIN_LENGTH
+    }
+
+    found = list(iter_cycle_indices(G))
+
+    # Each ring once, starting at its lowest member
+    assert all(cycle[0] == min(cycle) for cycle in found)
+    assert len(found) == len(expected)
+    assert {tuple(cycle) for cycle in found} == expected
+
+
+@pytest.mark.parametrize("parts", [1, 3, 8])
+def test_split_search_matches_serial_order(parts):
+    G = build_graph(random_transactions(200, 600, 7))
+
+    split = cycle_parts(G, parts, "static")
+    merged = merge_cycle_parts(split, [list(iter_cycle_part_results(G, part)) for part in split])
+
+    assert [cycle for cycle, _ in merged] == list(iter_cycle_indices(G))
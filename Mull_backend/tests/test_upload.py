@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.result_cache import result_cache
+
+from conftest import ROOT_DIR, TESTS_DIR
+
+DATASET_10K = os.path.join(ROOT_DIR, "test_10000_transactions.csv")
+FIXTURE_10K = os.path.join(TESTS_DIR, "fixtures", "upload_10000_response.json")
+
+# Vary from run to run
+VOLATILE_SUMMARY = ["processing_time_seconds", "detector_timings"]
+
+
+def stable_response(response):
+    response = dict(response, summary=dict(response["summary"]))
+    for field in VOLATILE_SUMMARY:
+        response["summary"].pop(field, None)
+    response.pop("analysis_id", None)
+    return response
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Always run the analysis instead of serving an earlier response
+    monkeypatch.setattr(result_cache, "get", lambda key: None)
+    return TestClient(app)
+
+
+def test_upload_10k_matches_fixture(client):
+    with open(DATASET_10K, "rb") as f:
+        r = client.post(
+            "/upload?transactions=flagged",
+            files={"file": ("test_10000_transactions.csv", f, "text/csv")},
+        )
+
+    assert r.status_code == 200
+
+    with open(FIXTURE_10K) as f:
+        expected = json.load(f)
+
+    assert stable_response(r.json()) == expected